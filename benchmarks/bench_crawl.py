@@ -0,0 +1,232 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fake_spacebar import SiteConfig, start_server  # noqa: E402
+from spacebar_ratelimit import RateLimiter  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- Constants & Configuration ---
+SCENARIOS = ["run", "run_sitemap", "scrape_news"]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+CATEGORY = "politics"
+
+
+class TimedLimiter(RateLimiter):
+    """RateLimiter that also records how long every request took (budget wait included).
+
+    The latency target is disabled so a slow stand-in server does not make the
+    limiter back off mid-run and blur the numbers.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__(rate=rate, burst=max(1, int(rate)), max_rate=rate, target_latency=float("inf"))
+        self.latencies: Dict[str, float] = {}
+        self._timing_lock = threading.Lock()
+
+    def get(self, client: Any, url: str, stop_event: Optional[threading.Event] = None, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return super().get(client, url, stop_event=stop_event, **kwargs)
+        finally:
+            with self._timing_lock:
+                self.latencies[url] = time.perf_counter() - started
+
+
+class ParseTimer:
+    """Wraps parse functions and sums the time spent in them (thread-safe)."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, func):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.seconds += elapsed
+                    self.calls += 1
+        return timed
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_scenario(scenario: str, base_url: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one crawl in this (fresh) process and returns its measurements."""
+    limiter = TimedLimiter(options["rate"])
+    timer = ParseTimer()
+    pages = options["pages"]
+
+    if scenario in ("run", "run_sitemap"):
+        import spacebar_core
+        import spacebar_parsing
+        from spacebar_core import SpacebarScraper
+
+        spacebar_core.parse_listing_page = timer.wrap(spacebar_core.parse_listing_page)
+        spacebar_parsing.scan_article = timer.wrap(spacebar_parsing.scan_article)  # used by extract_article
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "bench.jsonl")
+            msg_queue: "queue.Queue" = queue.Queue()
+            scraper = SpacebarScraper(msg_queue, max_workers=options["workers"], prefetch_pages=options["prefetch"],
+                                      rate_limiter=limiter, parser=options["parser"], stream=True, base_url=base_url,
+                                      discovery="sitemap" if scenario == "run_sitemap" else "listing")
+            started = time.perf_counter()
+            scraper.run(CATEGORY, 1, pages, out)
+            elapsed = time.perf_counter() - started
+            articles = sum(1 for _ in open(out, encoding="utf-8")) if os.path.exists(out) else 0
+    elif scenario == "scrape_news":
+        import spacebar_scraper_advanced as adv
+
+        adv.parse_listing_page = timer.wrap(adv.parse_listing_page)
+        adv.scan_article = timer.wrap(adv.scan_article)
+        started = time.perf_counter()
+        result = adv.scrape_news(CATEGORY, 1, pages, lambda msg: None, lambda val, maxval: None,
+                                 prefetch_pages=options["prefetch"], rate_limiter=limiter, parser=options["parser"], base_url=base_url)
+        elapsed = time.perf_counter() - started
+        articles = len(result)
+    else:
+        raise ValueError(f"unknown scenario {scenario!r}")
+
+    article_latencies = [t for url, t in limiter.latencies.items() if "/bench-" in url]
+    return {
+        "articles": articles,
+        "requests": len(limiter.latencies),  # Listing pages / sitemaps included
+        "seconds": round(elapsed, 4),
+        "articles_per_sec": round(articles / elapsed, 2) if elapsed else None,
+        "latency_p50_ms": round(percentile(article_latencies, 50) * 1000, 2) if article_latencies else None,
+        "latency_p95_ms": round(percentile(article_latencies, 95) * 1000, 2) if article_latencies else None,
+        "parse_seconds": round(timer.seconds, 4),
+        "parse_ms_per_page": round(timer.seconds / timer.calls * 1000, 3) if timer.calls else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1) if resource is not None else None,
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median of every numeric measurement over the repeats."""
+    summary = {}
+    for key in runs[0]:
+        values = [r[key] for r in runs if isinstance(r.get(key), (int, float))]
+        summary[key] = round(statistics.median(values), 4) if values else None
+    return summary
+
+
+def compare(current: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline.get('timestamp')}):")
+    for scenario, result in current["results"].items():
+        before = baseline.get("results", {}).get(scenario)
+        if not before:
+            continue
+        parts = []
+        for key in ("articles_per_sec", "requests", "latency_p50_ms", "latency_p95_ms", "parse_seconds", "peak_rss_mb"):
+            old, new = before["median"].get(key), result["median"].get(key)
+            if old and new is not None:
+                parts.append(f"{key} {old} -> {new} ({(new - old) / old * 100:+.1f}%)")
+        print(f"  {scenario}: " + " | ".join(parts))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Spacebar crawlers against a local synthetic site.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--pages", type=int, default=5, help="Listing pages to crawl (and serve)")
+    parser.add_argument("--per-page", type=int, default=20, help="Articles per listing page")
+    parser.add_argument("--paragraphs", type=int, default=20, help="Paragraphs per article")
+    parser.add_argument("--paragraph-chars", type=int, default=400, help="Characters per paragraph")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per response (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- latency (s)")
+    parser.add_argument("--workers", type=int, default=4, help="SpacebarScraper article workers")
+    parser.add_argument("--prefetch", type=int, default=2, help="Listing pages fetched ahead")
+    parser.add_argument("--parser", default=None, help="BeautifulSoup backend (default: fastest installed)")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Rate limiter budget (req/s); high = measure the pipeline only")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (the median is reported)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="Earlier result file to compare with")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            parser.error(f"unknown scenario {scenario!r}")
+
+    config = SiteConfig(args.pages, args.per_page, args.paragraphs, args.paragraph_chars, args.latency, args.jitter)
+    server, base_url = start_server(config)
+    options = {"pages": args.pages, "workers": args.workers, "prefetch": args.prefetch, "parser": args.parser, "rate": args.rate}
+
+    report: Dict[str, Any] = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {**vars(args), "scenarios": scenarios},
+        "results": {},
+    }
+
+    # Every run gets a fresh process so peak RSS and import state are per scenario
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        for scenario in scenarios:
+            runs = []
+            for i in range(args.repeat):
+                with ctx.Pool(1) as pool:
+                    result = pool.apply(run_scenario, (scenario, base_url, options))
+                runs.append(result)
+                print(f"[{scenario} #{i + 1}] {result['articles']} articles in {result['seconds']:.2f}s ({result['requests']} requests) | "
+                      f"{result['articles_per_sec']} art/s | p50 {result['latency_p50_ms']} ms | p95 {result['latency_p95_ms']} ms | "
+                      f"parse {result['parse_seconds']:.3f}s | RSS {result['peak_rss_mb']} MB")
+            report["results"][scenario] = {"runs": runs, "median": summarize(runs)}
+    finally:
+        server.shutdown()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nSaved: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
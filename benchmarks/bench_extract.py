@@ -0,0 +1,104 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fake_spacebar import SiteConfig, article_page  # noqa: E402
+from spacebar_parsing import (  # noqa: E402
+    CONTENT_TAGS, DATE_CLASS, LEGACY_CONTENT_TAGS, extract_article_dom, make_soup, scan_article,
+)
+
+# --- Constants & Configuration ---
+# (content tags, separator) used by SpacebarScraper and by the legacy scrapers
+STYLES = [("core", CONTENT_TAGS, ""), ("legacy", LEGACY_CONTENT_TAGS, " ")]
+
+_HEAD = f'<html><body><h1 class="article-title x">  T &amp; <b>bold</b> </h1><p class="{DATE_CLASS}">1 ม.ค. 2568</p>'
+# Markup the real site does not produce but browsers (and both backends) repair
+EDGE_CASES = [
+    _HEAD + '<div class="payload-richtext"><p>a <!-- c --> b</p><ul><li><p>nested</p> tail</li><li>two<li>three</ul>'
+            '<blockquote><p>q1</p><p>q2</p></blockquote><p></p><h2>H</h2><script>var x=1</script>'
+            '<p>x<br>y&nbsp;z</p><p>un<p>closed</div><p>after</p>',
+    _HEAD + f'<div class="payload-richtext"><p>a<div>block in p</div>b</p><p>c<style>.x{{}}</style>d</p>'
+            f'<h3>hh</h3><p class="{DATE_CLASS}">dup date</p></div>',
+    _HEAD + '<div class="payload-richtext"><table><tr><td><p>cell</td></tr></table>'
+            '<p>  spaced   words  </p><li>orphan li</li></div>',
+    '<div class="payload-richtext"><p>no title</p>',
+    '<html><body><p>nothing</p></body></html>',
+]
+
+
+def load_pages(pages_dir: Optional[str], generated: int) -> List[Tuple[str, str]]:
+    """(name, markup) pairs: stand-in articles, the edge cases and any saved ``*.html`` pages."""
+    config = SiteConfig()
+    pages = [(f"generated-{i}", article_page(config, "politics", 1 + i // config.per_page, i % config.per_page))
+             for i in range(generated)]
+    pages += [(f"edge-{i}", markup) for i, markup in enumerate(EDGE_CASES)]
+    if pages_dir:
+        for path in sorted(glob.glob(os.path.join(pages_dir, "*.html"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def check_parity(pages: List[Tuple[str, str]], parsers: List[str]) -> int:
+    """Compares scan_article with the DOM extraction on every page; prints and counts the differences."""
+    mismatches = 0
+    for parser in parsers:
+        for style, tags, separator in STYLES:
+            for name, markup in pages:
+                expected = extract_article_dom(markup, parser, tags, separator)
+                actual = scan_article(markup, parser, tags, separator)
+                if actual != expected:
+                    mismatches += 1
+                    print(f"MISMATCH {parser}/{style} {name}\n  dom:  {expected!r}\n  scan: {actual!r}")
+    return mismatches
+
+
+def time_per_page(extract: Callable[..., Any], pages: List[str], *args: Any, repeat: int = 3) -> float:
+    """Best-of-``repeat`` milliseconds per page."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for markup in pages:
+            extract(markup, *args)
+        best = min(best, time.perf_counter() - started)
+    return best / len(pages) * 1000
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the streaming article extractor against the DOM path and time both.")
+    parser.add_argument("--pages-dir", help="Directory of saved article pages (*.html) to include")
+    parser.add_argument("--generated", type=int, default=40, help="Stand-in article pages to generate")
+    parser.add_argument("--parsers", default="lxml,html.parser", help="Comma separated BeautifulSoup backends")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs (the best is reported)")
+    args = parser.parse_args(argv)
+
+    parsers = []
+    for name in args.parsers.split(","):
+        try:
+            make_soup("<p></p>", name)
+        except Exception as e:
+            print(f"[Skip] {name}: {e}")
+            continue
+        parsers.append(name)
+
+    pages = load_pages(args.pages_dir, args.generated)
+    mismatches = check_parity(pages, parsers)
+    print(f"parity: {mismatches} mismatches over {len(pages) * len(parsers) * len(STYLES)} extractions")
+
+    markups = [markup for _, markup in pages]
+    for name in parsers:
+        dom = time_per_page(extract_article_dom, markups, name, repeat=args.repeat)
+        scan = time_per_page(scan_article, markups, name, repeat=args.repeat)
+        print(f"{name:<12} dom {dom:7.3f} ms/page   scan {scan:7.3f} ms/page   {dom / scan:4.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# --- Constants & Configuration ---
+THAI_MONTHS = ["ม.ค.", "ก.พ.", "มี.ค.", "เม.ย.", "พ.ค.", "มิ.ย.", "ก.ค.", "ส.ค.", "ก.ย.", "ต.ค.", "พ.ย.", "ธ.ค."]
+FILLER = "ข่าวสารการเมืองเศรษฐกิจสังคม Spacebar รายงานว่า "  # Mixed Thai/ASCII, like the real pages
+HEADLINE_CLASS = "w-full text-base font-semibold text-gray-700 hover:text-accentual-blue-main mb-2 line-clamp-3"
+DATE_CLASS = "text-gray-400 text-subheadsm mb-4 md:mb-0"
+
+_LISTING_RE = re.compile(r"^/category/([\w-]+)(?:/page/(\d+))?/?$")
+_ARTICLE_RE = re.compile(r"^/([\w-]+)/bench-(\d+)-(\d+)$")
+_SITEMAP_RE = re.compile(r"^/sitemap-([\w-]+)\.xml$")
+_FEED_RE = re.compile(r"^/category/([\w-]+)/feed/?$")
+CATEGORIES = ("politics", "business", "social", "world")
+FEED_ITEMS = 20  # Newest articles per RSS feed
+
+
+class SiteConfig:
+    """Shape and speed of the synthetic site."""
+
+    def __init__(self, pages: int = 5, per_page: int = 20, paragraphs: int = 20, paragraph_chars: int = 400,
+                 latency: float = 0.05, jitter: float = 0.0, newest: Optional[date] = None, seed: int = 1,
+                 error_rate: float = 0.0, error_repeats: int = 1, error_status: int = 500):
+        self.pages = pages                      # Listing pages per category; later pages are empty
+        self.per_page = per_page                # Articles per listing page
+        self.paragraphs = paragraphs            # Rich-text paragraphs per article
+        self.paragraph_chars = paragraph_chars  # Characters per paragraph
+        self.latency = latency                  # Seconds added to every response
+        self.jitter = jitter                    # +/- random seconds on top of latency
+        self.newest = newest or date(2025, 1, 31)  # Date of the first article of page 1 (one day older per page)
+        self.seed = seed
+        # Flaky articles: this share of article URLs answers ``error_status`` to its first ``error_repeats`` requests
+        self.error_rate = error_rate
+        self.error_repeats = error_repeats
+        self.error_status = error_status
+        self.requests: Dict[str, int] = {}      # Requests seen per path of a flaky article
+        self.hits: Dict[str, int] = {}          # Requests seen per path, all of them (outages included)
+        self.down = threading.Event()           # While set, every request gets ``down_status`` (outage)
+        self.down_status = 503
+        self.lock = threading.Lock()
+
+
+def thai_date(d: date) -> str:
+    """Formats a date the way article pages show it (``27 ม.ค. 2568``)."""
+    return f"{d.day} {THAI_MONTHS[d.month - 1]} {d.year + 543}"
+
+
+def listing_page(config: SiteConfig, category: str, page: int) -> str:
+    links = []
+    if page <= config.pages:
+        for i in range(config.per_page):
+            links.append(
+                f'<a aria-label="articleLink" href="/{category}/bench-{page}-{i}">'
+                f'<img src="/img/{page}-{i}.jpg" alt=""><div class="{HEADLINE_CLASS}">หัวข้อข่าว {category} {page}-{i}</div></a>'
+            )
+    # Daily highlights block: the scrapers must skip it (it repeats articles of other pages)
+    highlight = (
+        '<div class="w-full"><h2>เรื่องเด่นประจำวัน</h2>'
+        f'<a aria-label="articleLink" href="/{category}/bench-1-0"><h3>เรื่องเด่น</h3></a></div>'
+    )
+    nav = "".join(f'<li><a href="/category/{c}">{c}</a></li>' for c in CATEGORIES)
+    return (
+        f"<!DOCTYPE html><html lang=\"th\"><head><meta charset=\"utf-8\"><title>{category} - Spacebar</title>"
+        f"<script>window.__DATA__={{\"page\":{page}}}</script></head><body><nav><ul>{nav}</ul></nav>"
+        f"<main>{highlight}<div class=\"grid\">{''.join(links)}</div></main><footer>Spacebar</footer></body></html>"
+    )
+
+
+def published_on(config: SiteConfig, page: int) -> date:
+    return config.newest - timedelta(days=page - 1)
+
+
+def robots_txt(base_url: str) -> str:
+    return f"User-agent: *\nAllow: /\n\nSitemap: {base_url}/sitemap.xml\n"
+
+
+def sitemap_index(config: SiteConfig, base_url: str) -> str:
+    """Sitemap index with one child sitemap per category (``lastmod`` = its newest article)."""
+    entries = "".join(
+        f"<sitemap><loc>{base_url}/sitemap-{c}.xml</loc><lastmod>{config.newest.isoformat()}</lastmod></sitemap>"
+        for c in CATEGORIES
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+
+
+def category_sitemap(config: SiteConfig, base_url: str, category: str) -> str:
+    """Every article of a category, newest first, with its publication day as ``lastmod``."""
+    entries = "".join(
+        f"<url><loc>{base_url}/{category}/bench-{page}-{i}</loc><lastmod>{published_on(config, page).isoformat()}T08:00:00+07:00</lastmod></url>"
+        for page in range(1, config.pages + 1) for i in range(config.per_page)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+
+
+def category_feed(config: SiteConfig, base_url: str, category: str) -> str:
+    """RSS 2.0 feed of the newest ``FEED_ITEMS`` articles of a category."""
+    items = []
+    for n in range(min(FEED_ITEMS, config.pages * config.per_page)):
+        page, i = n // config.per_page + 1, n % config.per_page
+        published = datetime.combine(published_on(config, page), datetime.min.time())
+        items.append(
+            f"<item><title>หัวข้อข่าว {category} {page}-{i}</title><link>{base_url}/{category}/bench-{page}-{i}</link>"
+            f"<pubDate>{format_datetime(published)}</pubDate></item>"
+        )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Spacebar {category}</title>'
+            f"<link>{base_url}/category/{category}</link>{''.join(items)}</channel></rss>")
+
+
+def article_page(config: SiteConfig, category: str, page: int, index: int) -> str:
+    rng = random.Random(f"{config.seed}-{category}-{page}-{index}")
+    published = published_on(config, page)
+    paragraphs = []
+    for p in range(config.paragraphs):
+        start = rng.randrange(len(FILLER))
+        text = (FILLER * (config.paragraph_chars // len(FILLER) + 2))[start:start + config.paragraph_chars]
+        if p % 7 == 3:
+            paragraphs.append(f"<blockquote>{text}</blockquote>")
+        elif p % 5 == 4:
+            paragraphs.append(f"<ul><li>{text[:80]}</li><li>{text[80:160]}</li></ul>")
+        else:
+            paragraphs.append(f"<p>{text} <b>{index}</b> <a href=\"/tag/{p}\">#{p}</a></p>")
+    related = "".join(f'<a aria-label="relatedLink" href="/{category}/bench-{page}-{(index + k) % config.per_page}">related {k}</a>' for k in range(1, 6))
+    return (
+        f"<!DOCTYPE html><html lang=\"th\"><head><meta charset=\"utf-8\"><title>ข่าว {page}-{index}</title></head><body>"
+        f"<nav><a href=\"/\">Spacebar</a></nav><article>"
+        f"<h1 class=\"article-title\">ข่าว {category} {page}-{index}</h1>"
+        f"<p class=\"{DATE_CLASS}\">{thai_date(published)}</p>"
+        f"<div class=\"payload-richtext\">{''.join(paragraphs)}</div></article>"
+        f"<aside>{related}</aside><footer>Spacebar</footer></body></html>"
+    )
+
+
+def _fails(config: SiteConfig, path: str) -> bool:
+    """Whether this request of a flaky article (chosen by ``error_rate``, stable per path) gets an error."""
+    if int(hashlib.md5(f"{config.seed}{path}".encode()).hexdigest()[:8], 16) / 0xFFFFFFFF >= config.error_rate:
+        return False
+    with config.lock:
+        seen = config.requests[path] = config.requests.get(path, 0) + 1
+    return seen <= config.error_repeats
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+    config: SiteConfig = SiteConfig()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        config = self.config
+        with config.lock:
+            config.hits[self.path] = config.hits.get(self.path, 0) + 1
+        delay = config.latency + (random.uniform(-config.jitter, config.jitter) if config.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if config.down.is_set():
+            self.send_response(config.down_status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        base_url = f"http://{self.headers.get('Host')}"
+        content_type = "text/html; charset=utf-8"
+        m = _LISTING_RE.match(self.path)
+        sitemap = _SITEMAP_RE.match(self.path)
+        feed = _FEED_RE.match(self.path)
+        if m:
+            body = listing_page(config, m.group(1), int(m.group(2) or 1))
+        elif self.path == "/robots.txt":
+            body, content_type = robots_txt(base_url), "text/plain; charset=utf-8"
+        elif self.path == "/sitemap.xml":
+            body, content_type = sitemap_index(config, base_url), "application/xml"
+        elif sitemap:
+            body, content_type = category_sitemap(config, base_url, sitemap.group(1)), "application/xml"
+        elif feed:
+            body, content_type = category_feed(config, base_url, feed.group(1)), "application/rss+xml"
+        else:
+            m = _ARTICLE_RE.match(self.path)
+            if not m:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if config.error_rate and _fails(config, self.path):
+                self.send_response(config.error_status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = article_page(config, m.group(1), int(m.group(2)), int(m.group(3)))
+
+        data = body.encode("utf-8")
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_server(config: SiteConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Serves the synthetic site on a background thread. Returns the server and its base URL."""
+    handler = type("SpacebarHandler", (_Handler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic Spacebar-shaped site for benchmarks and manual testing.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--paragraph-chars", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of article URLs that fail at first")
+    parser.add_argument("--error-repeats", type=int, default=1, help="Failed requests per flaky article")
+    args = parser.parse_args()
+
+    config = SiteConfig(args.pages, args.per_page, args.paragraphs, args.paragraph_chars, args.latency, args.jitter,
+                        error_rate=args.error_rate, error_repeats=args.error_repeats)
+    server, url = start_server(config, port=args.port)
+    print(f"Serving synthetic Spacebar on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import argparse
+import gzip
+import os
+import sys
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from spacebar_store import category_from_url
+
+# --- Constants & Configuration ---
+DEFAULT_ARCHIVE_PATH = "spacebar_pages.warc.gz"
+ARCHIVE_CONTENT_TYPES = ("text/html",)  # Listing and article pages; sitemaps, feeds and robots.txt are not archived
+EXTRACT_BATCH = 256  # Pages handed to the worker processes at a time (bounds memory on large archives)
+# Headers describing the wire format; the archive stores the decoded body
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+_READ_SIZE = 64 * 1024
+_GZIP_MAGIC = b"\x1f\x8b\x08"
+
+
+class ArchiveRecord(NamedTuple):
+    url: str
+    date: str        # WARC-Date (UTC, ISO 8601)
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+def _http_block(status: int, reason: str, headers: Dict[str, str], body: bytes) -> bytes:
+    lines = [f"HTTP/1.1 {status} {reason or ''}".rstrip()]
+    lines += [f"{k}: {v}" for k, v in headers.items() if k.lower() not in _HOP_HEADERS]
+    lines.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8") + body
+
+
+class WarcWriter:
+    """
+    Append-only archive of raw HTTP responses in WARC 1.1 ``response`` records.
+
+    Every record is compressed as its own gzip member, the usual ``.warc.gz``
+    layout: the file can be appended to across runs, read by standard WARC
+    tools, and a record torn by a crash only loses that record. Bodies are
+    stored decoded (as ``resp.content``), so the stored HTTP headers omit
+    ``Content-Encoding`` and carry the decoded ``Content-Length``.
+
+    :meth:`hook` plugs into ``session.hooks["response"]``; :meth:`write_response`
+    is thread-safe.
+    """
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_PATH, compresslevel: int = 6):
+        self.path = path
+        self.compresslevel = compresslevel
+        self.count = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+        self._file = open(path, "ab")
+
+    def write_response(self, url: str, status: int, reason: str, headers: Dict[str, str], body: bytes) -> None:
+        """Appends one response record and flushes it to the OS."""
+        block = _http_block(status, reason, headers, body)
+        warc_headers = (
+            "WARC/1.1\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(block)}\r\n\r\n"
+        ).encode("utf-8")
+        member = gzip.compress(warc_headers + block + b"\r\n\r\n", self.compresslevel)
+        with self._lock:
+            self._file.write(member)
+            self._file.flush()
+            self.count += 1
+            self.bytes_written += len(member)
+
+    def hook(self, resp: Any, *args: Any, **kwargs: Any) -> Any:
+        """
+        ``requests`` response hook: archives successful HTML GET responses.
+
+        Responses answered from the HTTP cache without touching the network
+        (``from_cache``) and streamed responses (sitemaps, feeds) are skipped.
+        """
+        # ``kwargs`` are those of ``Session.send``; reading a streamed body here would consume it
+        if (resp.status_code == 200 and resp.request is not None and resp.request.method == "GET"
+                and not kwargs.get("stream") and not getattr(resp, "from_cache", False)
+                and resp.headers.get("Content-Type", "").split(";")[0].strip().lower() in ARCHIVE_CONTENT_TYPES):
+            self.write_response(resp.url, resp.status_code, resp.reason, dict(resp.headers), resp.content)
+        return resp
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self) -> "WarcWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _next_member(f: BinaryIO, start: int) -> Optional[int]:
+    """Offset of the next gzip header at or after ``start``, or None."""
+    f.seek(start)
+    position, tail = start, b""
+    while True:
+        chunk = f.read(_READ_SIZE)
+        if not chunk:
+            return None
+        data = tail + chunk
+        found = data.find(_GZIP_MAGIC)
+        if found >= 0:
+            return position - len(tail) + found
+        tail = data[-(len(_GZIP_MAGIC) - 1):]
+        position += len(chunk)
+
+
+def _read_members(f: BinaryIO) -> Iterator[bytes]:
+    """
+    Decompresses concatenated gzip members one at a time.
+
+    A truncated last member ends the stream; a corrupt one (a record torn by
+    a crash, with later runs appending after it) is skipped up to the next
+    gzip header.
+    """
+    offset = 0  # File offset of the current member
+    fed = 0     # Bytes of it given to the inflater so far
+    buffer = b""
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    parts: List[bytes] = []
+    while True:
+        if not buffer:
+            buffer = f.read(_READ_SIZE)
+            if not buffer:
+                return
+        try:
+            parts.append(inflater.decompress(buffer))
+        except zlib.error:
+            next_offset = _next_member(f, offset + 1)
+            if next_offset is None:
+                return
+            f.seek(next_offset)
+            offset, fed, buffer, parts = next_offset, 0, b"", []
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            continue
+        fed += len(buffer)
+        if inflater.eof:
+            yield b"".join(parts)
+            buffer = inflater.unused_data
+            offset += fed - len(buffer)
+            fed, parts = 0, []
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            buffer = b""
+
+
+def _parse_headers(block: bytes) -> Tuple[str, Dict[str, str]]:
+    first, _, rest = block.decode("utf-8", "replace").partition("\r\n")
+    headers: Dict[str, str] = {}
+    for line in rest.split("\r\n"):
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip()] = value.strip()
+    return first, headers
+
+
+def iter_records(path: str) -> Iterator[ArchiveRecord]:
+    """Yields the response records of an archive in the order they were written (one record in memory at a time)."""
+    with open(path, "rb") as f:
+        for member in _read_members(f):
+            head, sep, rest = member.partition(b"\r\n\r\n")
+            if not sep:
+                continue
+            _, warc = _parse_headers(head)
+            if warc.get("WARC-Type") != "response":
+                continue
+            block = rest[:int(warc.get("Content-Length", len(rest)))]
+            http_head, _, body = block.partition(b"\r\n\r\n")
+            status_line, headers = _parse_headers(http_head)
+            try:
+                status = int(status_line.split()[1])
+            except (IndexError, ValueError):
+                continue
+            yield ArchiveRecord(warc.get("WARC-Target-URI", ""), warc.get("WARC-Date", ""), status, headers, body)
+
+
+def is_article_url(url: str) -> bool:
+    """True for article pages (not listing pages, sitemaps or feeds)."""
+    return category_from_url(url) is not None and "/category/" not in url
+
+
+def _extract(job: Tuple[str, bytes, Optional[str]]) -> Tuple[str, Tuple[Optional[str], Optional[str], str]]:
+    from spacebar_parsing import extract_article
+
+    url, body, parser = job
+    return url, extract_article(body, parser)
+
+
+def reextract(archive_path: str, output: str, workers: Optional[int] = None, parser: Optional[str] = None,
+              category: Optional[str] = None, log: Any = print) -> int:
+    """
+    Runs the current extractors over the article pages of an archive and writes the rows to ``output``.
+
+    The archive is read twice: first to find the newest record of every URL,
+    then to hand those pages to ``workers`` processes (all cores by default)
+    in batches of :data:`EXTRACT_BATCH`. No network access. ``output`` can be
+    any streaming format (``.csv``, ``.jsonl``, ``.parquet``, ``.sqlite``); a
+    file is replaced, a SQLite store has the articles upserted.
+    Returns the number of articles written.
+    """
+    from spacebar_core import ARTICLE_FIELDS, CATEGORY_FIELD, make_record
+    from spacebar_export import open_stream_writer, stream_format_for
+
+    if stream_format_for(output) is None:
+        raise ValueError(f"cannot write {output}: use a .csv, .jsonl, .parquet or .sqlite name")
+
+    # Pass 1: the newest successful record of every article URL
+    latest: Dict[str, int] = {}
+    for number, record in enumerate(iter_records(archive_path)):
+        if record.status == 200 and is_article_url(record.url) and (category is None or category_from_url(record.url) == category):
+            latest[record.url] = number
+    log(f"[Archive] {archive_path}: {len(latest)} article pages")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open_stream_writer(output, [CATEGORY_FIELD] + ARTICLE_FIELDS) as writer:
+
+        def flush(batch: List[Tuple[str, bytes, Optional[str]]]) -> None:
+            for url, fields in pool.map(_extract, batch, chunksize=max(1, len(batch) // (4 * (workers or os.cpu_count() or 1)))):
+                record = make_record(fields, "", url)
+                writer.write({CATEGORY_FIELD: category_from_url(url), **record})
+
+        batch: List[Tuple[str, bytes, Optional[str]]] = []
+        for number, record in enumerate(iter_records(archive_path)):
+            if latest.get(record.url) != number:
+                continue
+            batch.append((record.url, record.body, parser))
+            if len(batch) >= EXTRACT_BATCH:
+                flush(batch)
+                batch = []
+                log(f"  {writer.count}/{len(latest)} articles ({writer.count / (time.perf_counter() - started):.0f}/s)")
+        if batch:
+            flush(batch)
+    elapsed = time.perf_counter() - started
+    log(f"[Done] {writer.count} articles -> {output} in {elapsed:.1f}s ({writer.count / max(elapsed, 1e-9):.0f} articles/s)")
+    return writer.count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect Spacebar page archives and re-extract articles from them offline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_extract = sub.add_parser("extract", help="Re-run the article extractor over an archive (no network)")
+    p_extract.add_argument("archive", help="Archive file (.warc.gz)")
+    p_extract.add_argument("-o", "--output", required=True, help="Output file (.csv, .jsonl, .parquet or .sqlite store to upsert into)")
+    p_extract.add_argument("-w", "--workers", type=int, help="Worker processes (default: all cores)")
+    p_extract.add_argument("-c", "--category", metavar="SLUG", help="Only articles of this category")
+    p_extract.add_argument("--parser", help="BeautifulSoup backend: lxml or html.parser (default: fastest installed)")
+    p_list = sub.add_parser("list", help="Print the records of an archive")
+    p_list.add_argument("archive", help="Archive file (.warc.gz)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.archive):
+        parser.error(f"archive not found: {args.archive}")
+    if args.command == "list":
+        for record in iter_records(args.archive):
+            print(f"{record.date}\t{record.status}\t{len(record.body)}\t{record.url}")
+        return 0
+    try:
+        reextract(args.archive, args.output, args.workers, args.parser, args.category)
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# --- Constants & Configuration ---
+DEFAULT_CACHE_PATH = "spacebar_http_cache.sqlite3"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+LISTING_TTL = 10 * 60        # Listing pages change whenever a story is published
+ARTICLE_TTL = 24 * 60 * 60   # Published articles almost never change
+# Headers describing the wire format; the cache stores the decoded body
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url           TEXT PRIMARY KEY,
+    headers       TEXT NOT NULL,
+    body          BLOB NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    stored_at     REAL NOT NULL,
+    last_access   REAL NOT NULL,
+    size          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access);
+"""
+
+
+class HttpCache:
+    """
+    Persistent SQLite store of successful GET responses.
+
+    Entries younger than their TTL are served without touching the network;
+    older entries are revalidated with ``If-None-Match`` / ``If-Modified-Since``.
+    Listing pages (``/category/...``) and articles have separate TTLs. When the
+    stored bodies exceed ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 listing_ttl: float = LISTING_TTL, article_ttl: float = ARTICLE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.listing_ttl = listing_ttl
+        self.article_ttl = article_ttl
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def ttl_for(self, url: str) -> float:
+        """Returns the freshness lifetime for a URL (listing page or article)."""
+        return self.listing_ttl if "/category/" in url else self.article_ttl
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored entry for ``url`` (marking it recently used), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT headers, body, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+        headers, body, etag, last_modified, stored_at = row
+        return {
+            "headers": json.loads(headers),
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": stored_at,
+        }
+
+    def is_fresh(self, url: str, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["stored_at"] < self.ttl_for(url)
+
+    def store(self, url: str, headers: Dict[str, str], body: bytes) -> None:
+        """Saves a 200 response and evicts old entries if the cache is over its size cap."""
+        headers = {k: v for k, v in headers.items() if k.lower() not in _HOP_HEADERS}
+        lowered = {k.lower(): v for k, v in headers.items()}
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(headers), body, lowered.get("etag"), lowered.get("last-modified"), now, now, len(body)),
+            )
+            self._total += len(body) - (old[0] if old else 0)
+            self._evict()
+
+    def touch(self, url: str, headers: Dict[str, str]) -> None:
+        """Marks an entry as revalidated (304) and picks up new validators."""
+        lowered = {k.lower(): v for k, v in headers.items()}
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, last_access = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, lowered.get("etag"), lowered.get("last-modified"), url),
+            )
+
+    def _evict(self) -> None:
+        """Drops least recently used entries until the cache fits ``max_bytes`` (lock held)."""
+        while self._total > self.max_bytes:
+            rows = self._conn.execute("SELECT url, size FROM responses ORDER BY last_access LIMIT 64").fetchall()
+            if not rows:
+                self._total = 0
+                return
+            for url, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self._total -= size
+                if self._total <= self.max_bytes:
+                    return
+
+    def count(self, status: str) -> None:
+        with self._lock:
+            self.stats[status] += 1
+
+    def size(self) -> int:
+        """Total size of the stored bodies in bytes."""
+        with self._lock:
+            return self._total
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Transport adapter that answers GET requests from an :class:`HttpCache`.
+
+    Mount it on a ``requests.Session``; every response it returns carries
+    ``cache_status`` (``"hit"``, ``"revalidated"`` or ``"miss"``) and
+    ``from_cache`` (True only when the network was not used at all).
+    """
+
+    def __init__(self, cache: HttpCache, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        if request.method != "GET" or kwargs.get("stream"):
+            return super().send(request, **kwargs)
+
+        url = request.url
+        entry = self.cache.lookup(url)
+        if entry is not None and self.cache.is_fresh(url, entry):
+            return self._mark(self._build_response(request, entry), "hit")
+
+        if entry is not None:
+            if entry["etag"]:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        resp = super().send(request, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            self.cache.touch(url, dict(resp.headers))
+            resp.content  # drain so the connection can be reused
+            resp.close()
+            return self._mark(self._build_response(request, entry), "revalidated")
+
+        if resp.status_code == 200:
+            self.cache.store(url, dict(resp.headers), resp.content)
+        return self._mark(resp, "miss")
+
+    def _mark(self, resp: Response, status: str) -> Response:
+        resp.cache_status = status
+        resp.from_cache = status == "hit"
+        self.cache.count(status)
+        return resp
+
+    def _build_response(self, request: PreparedRequest, entry: Dict[str, Any]) -> Response:
+        resp = Response()
+        resp.status_code = 200
+        resp.reason = "OK"
+        resp.url = request.url
+        resp.request = request
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp._content = entry["body"]
+        return resp
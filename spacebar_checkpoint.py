@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+# --- Constants & Configuration ---
+JOURNAL_SUFFIX = ".journal"
+
+
+def journal_path_for(output_path: str) -> str:
+    """Returns the journal path of a crawl output (``news.csv`` -> ``news.csv.journal``)."""
+    return output_path + JOURNAL_SUFFIX
+
+
+class CrawlState:
+    """What an interrupted crawl had finished, as read back from its journal."""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = params            # Arguments of the original run (category, pages, output...)
+        self.urls: Set[str] = set()     # Articles already written to the output
+        self.rows = 0                   # Number of rows already written
+        self.last_page: Optional[int] = None  # Last listing page whose articles were all handled
+        self.offset = 0                 # Output size (bytes) after the last journaled row
+
+    @property
+    def next_page(self) -> int:
+        """The listing page the crawl should continue from."""
+        if self.last_page is None:
+            return self.params["start_page"]
+        return self.last_page + 1
+
+
+class CrawlJournal:
+    """
+    Append-only JSON Lines journal of a streaming crawl.
+
+    Every article is journaled together with the output size right after its
+    row was flushed, and every finished listing page is journaled too. After
+    a crash the output is truncated back to the last journaled offset (a
+    half-written row is dropped and refetched), journaled URLs are skipped
+    and the walk continues after the last finished page.
+    """
+
+    def __init__(self, path: str, mode: str = "a"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, mode, encoding="utf-8")
+
+    @classmethod
+    def start(cls, output_path: str, **params: Any) -> "CrawlJournal":
+        """Starts a fresh journal for ``output_path`` (replacing any previous one)."""
+        journal = cls(journal_path_for(output_path), mode="w")
+        journal._append({"type": "start", "output": output_path, **params})
+        return journal
+
+    @classmethod
+    def resume(cls, output_path: str) -> "CrawlJournal":
+        """Reopens the journal of ``output_path`` to continue appending to it."""
+        return cls(journal_path_for(output_path), mode="a")
+
+    @staticmethod
+    def load(output_path: str) -> Optional[CrawlState]:
+        """Reads the journal of ``output_path``; None when there is nothing to resume."""
+        path = journal_path_for(output_path)
+        if not os.path.exists(path):
+            return None
+
+        state: Optional[CrawlState] = None
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # Torn last line from a crash
+                kind = record.get("type")
+                if kind == "start":
+                    state = CrawlState({k: v for k, v in record.items() if k != "type"})
+                    state.offset = state.params.get("base_offset", 0)  # Appending runs start after the existing rows
+                elif state is None:
+                    continue
+                elif kind == "article":
+                    state.urls.add(record["url"])
+                    state.rows += 1
+                    state.offset = record["offset"]
+                elif kind == "page":
+                    state.last_page = record["page"]
+        return state
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def article_done(self, url: str, offset: int) -> None:
+        """Records an article whose row ends at byte ``offset`` of the output."""
+        self._append({"type": "article", "url": url, "offset": offset})
+
+    def page_done(self, page: int) -> None:
+        """Records a listing page whose articles have all been handled."""
+        self._append({"type": "page", "page": page})
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def finish(self) -> None:
+        """The crawl completed: nothing left to resume."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def describe(state: CrawlState) -> List[str]:
+    """Human readable summary of an interrupted crawl."""
+    params = state.params
+    end_page = params.get("end_page") or "จนจบ"
+    lines = [
+        f"Output: {params.get('output')}",
+        f"Category: {params.get('category')} (หน้า {params.get('start_page')} - {end_page})",
+    ]
+    if params.get("date_start") or params.get("date_end"):
+        lines.append(f"Date range: {(params.get('date_start') or '-')[:10]} - {(params.get('date_end') or '-')[:10]}")
+    lines += [
+        f"Articles written: {state.rows}",
+        f"Resume from page: {state.next_page}",
+    ]
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect the checkpoint of an interrupted Spacebar crawl.")
+    parser.add_argument("output", help="Output file of the interrupted crawl (e.g. spacebar_news.csv)")
+    args = parser.parse_args(argv)
+
+    state = CrawlJournal.load(args.output)
+    if state is None:
+        print(f"[Info] No checkpoint found for {args.output}")
+        return 1
+    for line in describe(state):
+        print(line)
+    print(f"Resume with: python spacebar_cli.py --resume -o {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+import argparse
+import importlib.util
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from spacebar_export import PARQUET_COMPRESSIONS, DEFAULT_PARQUET_COMPRESSION, DEFAULT_ROW_GROUP_SIZE
+from spacebar_discovery import DISCOVERY_MODES, DEFAULT_DISCOVERY
+
+# Only the standard library (plus spacebar_export and spacebar_discovery,
+# which need nothing else until a Parquet file is written) is imported at
+# module level so that ``--help`` and argument errors return instantly; the scraping stack
+# (requests, bs4, lxml) is loaded once the arguments are valid, and
+# pandas/openpyxl/pyarrow only if an export needs them.
+
+# --- Constants & Configuration ---
+OUTPUT_FORMATS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet", "sqlite": ".sqlite"}
+DEFAULT_OUTPUT = "spacebar_news.csv"
+ERROR_PREFIXES = ("[Error]", "[CRITICAL ERROR]", "  [Error]", "  [Skip]")
+EXIT_OK, EXIT_FAILED, EXIT_INTERRUPTED = 0, 1, 130  # argparse exits with 2 on usage errors
+EXIT_SITE_DOWN = 3  # The circuit breaker ended the crawl (partial results were saved)
+
+
+def parse_day(value: str) -> datetime:
+    """argparse type of the ``--since``/``--until`` options (``yyyy-mm-dd``)."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, expected yyyy-mm-dd")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Scrape Spacebar news headlessly (cron / containers).",
+        epilog="Examples:\n"
+               "  python spacebar_cli.py -c politics --start 1 --end 5\n"
+               "  python spacebar_cli.py -c all --end 0 --since 2025-01-01 -o news.jsonl --split\n"
+               "  python spacebar_cli.py -c politics --end 3 --append -o archive.parquet\n"
+               "  python spacebar_cli.py -c politics --discovery sitemap --since 2025-01-01 -o backfill.jsonl\n"
+               "  python spacebar_cli.py -c all --end 5 -o corpus.sqlite   # then: python spacebar_store.py search corpus.sqlite <terms>\n"
+               "  python spacebar_cli.py -c all --end 0 --archive pages.warc.gz   # re-parse later: python spacebar_archive.py extract pages.warc.gz -o news.jsonl\n"
+               "  python spacebar_cli.py -c all --end 0 -o news.jsonl --recover-after 60   # keep probing through outages\n"
+               "  python spacebar_cli.py --resume -o news.csv",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    crawl = parser.add_argument_group("crawl")
+    crawl.add_argument("-c", "--category", action="append", metavar="SLUG",
+                       help="Category slug, repeatable or comma separated, or 'all' (see --list-categories)")
+    crawl.add_argument("--start", type=int, default=1, help="First listing page (default: 1)")
+    crawl.add_argument("--end", type=int, default=1, help="Last listing page, 0 = until the end (default: 1)")
+    crawl.add_argument("--since", type=parse_day, metavar="YYYY-MM-DD", help="Only keep articles published on or after this day")
+    crawl.add_argument("--until", type=parse_day, metavar="YYYY-MM-DD", help="Only keep articles published on or before this day")
+    crawl.add_argument("--discovery", choices=DISCOVERY_MODES, default=DEFAULT_DISCOVERY,
+                       help="Find articles by walking listing pages, or from the site's sitemaps / RSS feeds "
+                            "(page range ignored; --since skips old sitemap entries) (default: listing)")
+    crawl.add_argument("--resume", action="store_true", help="Continue the interrupted crawl of --output from its checkpoint")
+    crawl.add_argument("--trip-after", type=int, metavar="N",
+                       help="End a category after N listing pages in a row failed, each after 2 retries "
+                            "(default: 3, i.e. 9 requests; exit status 3)")
+    crawl.add_argument("--recover-after", type=float, default=0.0, metavar="SECONDS",
+                       help="Instead of ending, wait SECONDS and probe the site again until it recovers "
+                            "(doubling up to 10 minutes; for long-running crawls)")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help=f"Output file (default: {DEFAULT_OUTPUT})")
+    output.add_argument("-f", "--format", choices=sorted(OUTPUT_FORMATS), help="Output format (default: from the --output extension)")
+    output.add_argument("--split", action="store_true", help="One file per category (<output>_<category>.<ext>) instead of a combined file")
+    output.add_argument("--no-stream", action="store_true", help="Write the output at the end instead of row by row (no checkpoint)")
+    output.add_argument("--append", action="store_true",
+                        help="Add new rows to an existing output instead of replacing it, skipping articles it already has")
+    output.add_argument("--compression", choices=PARQUET_COMPRESSIONS, default=DEFAULT_PARQUET_COMPRESSION,
+                        help=f"Parquet compression codec (default: {DEFAULT_PARQUET_COMPRESSION})")
+    output.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE, metavar="ROWS",
+                        help=f"Rows per Parquet row group (default: {DEFAULT_ROW_GROUP_SIZE})")
+    output.add_argument("--archive", metavar="FILE.warc.gz",
+                        help="Also append the raw HTML of every downloaded page to this archive, "
+                             "for offline re-extraction (pages served from the cache are not re-archived)")
+
+    tuning = parser.add_argument_group("performance")
+    tuning.add_argument("-w", "--workers", type=int, help="Concurrent article downloads (default: 4)")
+    tuning.add_argument("--parse-workers", type=int, default=0, help="Parse processes, 0 = parse on the download threads (default: 0)")
+    tuning.add_argument("--prefetch", type=int, help="Listing pages fetched ahead (default: 2)")
+    tuning.add_argument("--parser", help="BeautifulSoup backend: lxml or html.parser (default: html.parser; lxml is faster but may differ on broken markup)")
+    tuning.add_argument("--no-cache", action="store_true", help="Do not use the on-disk HTTP cache")
+    tuning.add_argument("--retries", type=int, metavar="N",
+                        help="Retries per article/sitemap request on connection errors and 5xx, with exponential backoff "
+                             "(default: 3; listing pages are retried twice by the page walk)")
+
+    monitoring = parser.add_argument_group("monitoring")
+    monitoring.add_argument("--metrics-port", type=int, metavar="PORT",
+                            help="Serve Prometheus metrics on http://HOST:PORT/metrics while crawling")
+    monitoring.add_argument("--metrics-host", default="127.0.0.1", metavar="HOST", help="Interface of the metrics endpoint (default: 127.0.0.1)")
+
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print errors and the final summary")
+    parser.add_argument("--list-categories", action="store_true", help="Print the available category slugs and exit")
+    return parser
+
+
+def resolve_categories(values: Optional[List[str]], known: List[str]) -> List[str]:
+    """Expands ``-c`` values (repeated, comma separated or ``all``) into category slugs, in order."""
+    selected: List[str] = []
+    for value in values or []:
+        for slug in value.split(","):
+            slug = slug.strip().lower()
+            if not slug:
+                continue
+            if slug == "all":
+                slugs = known
+            elif slug in known:
+                slugs = [slug]
+            else:
+                raise ValueError(f"unknown category {slug!r} (choose from: {', '.join(known)})")
+            selected.extend(s for s in slugs if s not in selected)
+    return selected
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.list_categories:
+        from spacebar_core import CATEGORIES
+        for name, slug in CATEGORIES.items():
+            print(f"{slug}\t{name}")
+        return EXIT_OK
+
+    output = args.output
+    if args.format:
+        output = os.path.splitext(output)[0] + OUTPUT_FORMATS[args.format]
+    elif os.path.splitext(output)[1].lower() not in OUTPUT_FORMATS.values():
+        parser.error(f"cannot tell the format of {output!r}; use a .csv/.jsonl/.parquet/.sqlite name or --format")
+
+    # Heavy imports start here
+    import queue
+    from spacebar_core import SpacebarScraper, CATEGORIES, DEFAULT_WORKERS
+    from spacebar_pipeline import DEFAULT_PREFETCH_PAGES, DEFAULT_TRIP_AFTER
+    from spacebar_parsing import available_parsers, DEFAULT_PARSER
+    from spacebar_ratelimit import DEFAULT_RETRIES
+
+    try:
+        categories = resolve_categories(args.category, list(CATEGORIES.values()))
+    except ValueError as e:
+        parser.error(str(e))
+    if not categories and not args.resume:
+        parser.error("at least one --category is required (or --resume)")
+    if args.start < 1 or (args.end != 0 and args.end < args.start):
+        parser.error("--start must be >= 1 and --end >= --start (or 0)")
+    if args.parser and args.parser not in available_parsers():
+        parser.error(f"parser {args.parser!r} is not installed (available: {', '.join(available_parsers())})")
+    if args.retries is not None and args.retries < 0:
+        parser.error("--retries must be >= 0")
+    if (args.trip_after is not None and args.trip_after < 1) or args.recover_after < 0:
+        parser.error("--trip-after must be >= 1 and --recover-after >= 0")
+    if args.resume and len(categories) > 1:
+        parser.error("--resume cannot continue a crawl of several categories (they keep no checkpoint); "
+                     "resume one category at a time")
+    if args.resume and args.no_stream:
+        parser.error("--resume needs streaming output")
+    if output.lower().endswith(".parquet"):
+        if args.row_group_size < 1:
+            parser.error("--row-group-size must be >= 1")
+        if importlib.util.find_spec("pyarrow") is None:
+            parser.error("Parquet output needs pyarrow (pip install pyarrow)")
+
+    cache = None
+    if not args.no_cache:
+        from spacebar_cache import HttpCache, DEFAULT_CACHE_PATH
+        cache = HttpCache(DEFAULT_CACHE_PATH)
+    archive = None
+    if args.archive:
+        from spacebar_archive import WarcWriter
+        archive = WarcWriter(args.archive)
+
+    msg_queue: "queue.Queue" = queue.Queue()
+    scraper = SpacebarScraper(
+        msg_queue,
+        max_workers=args.workers or DEFAULT_WORKERS,
+        prefetch_pages=DEFAULT_PREFETCH_PAGES if args.prefetch is None else args.prefetch,
+        cache=cache,
+        parser=args.parser or DEFAULT_PARSER,
+        stream=not args.no_stream,
+        compression=args.compression,
+        row_group_size=args.row_group_size,
+        append=args.append,
+        discovery=args.discovery,
+        parse_workers=args.parse_workers,
+        date_start=args.since,
+        date_end=args.until,
+        archive=archive,
+        retries=DEFAULT_RETRIES if args.retries is None else args.retries,
+        trip_after=args.trip_after or DEFAULT_TRIP_AFTER,
+        recover_after=args.recover_after,
+    )
+    metrics_server = None
+    if args.metrics_port is not None:
+        from spacebar_metrics import MetricsServer
+        try:
+            metrics_server = MetricsServer(scraper.metrics, args.metrics_host, args.metrics_port).start()
+        except OSError as e:
+            parser.error(f"cannot serve metrics on {args.metrics_host}:{args.metrics_port}: {e}")
+        if not args.quiet:
+            print(f"Metrics: http://{args.metrics_host}:{metrics_server.address[1]}/metrics")
+
+    if args.resume:
+        target, target_args = scraper.resume, (output,)
+    elif len(categories) > 1:
+        target, target_args = scraper.run_many, (categories, args.start, args.end, output, args.split)
+    else:
+        target, target_args = scraper.run, (categories[0], args.start, args.end, output)
+
+    worker = threading.Thread(target=target, args=target_args, daemon=True)
+    worker.start()
+
+    exit_code = EXIT_FAILED
+    interrupted = False
+    while True:
+        try:
+            msg_type, data = msg_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        except KeyboardInterrupt:
+            # Let the scraper finalize its output (and keep the checkpoint)
+            if not interrupted:
+                interrupted = True
+                scraper.stop_event.set()
+                print(">>> Stopping... please wait", file=sys.stderr)
+            continue
+
+        if msg_type == "LOG":
+            if data.startswith(ERROR_PREFIXES):
+                print(data, file=sys.stderr)
+            elif not args.quiet:
+                print(data)
+        elif msg_type == "CATEGORY":
+            category, page, count, state = data
+            if state != "running" and not args.quiet:
+                print(f"[{category}] {state}: {count} articles (last page {page})")
+        elif msg_type == "DONE":
+            success, summary = data
+            print(summary, file=sys.stdout if success else sys.stderr)
+            exit_code = EXIT_OK if success else EXIT_FAILED
+            break
+
+    worker.join()
+    if metrics_server is not None:
+        metrics_server.close()
+    if cache is not None:
+        cache.close()
+    if archive is not None:
+        archive.close()
+        if not args.quiet:
+            print(f"Archived {archive.count} pages to {archive.path}")
+    if interrupted:
+        return EXIT_INTERRUPTED
+    return EXIT_SITE_DOWN if scraper.tripped else exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
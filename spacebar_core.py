@@ -0,0 +1,944 @@
+import os
+import threading
+import queue
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from urllib.parse import urljoin
+from typing import List, Dict, Set, Optional, Tuple, Any, Callable, Container, Iterator, Union
+
+import requests
+from bs4 import BeautifulSoup
+
+from spacebar_pipeline import ListingPrefetcher, CircuitBreaker, DEFAULT_PREFETCH_PAGES, DEFAULT_TRIP_AFTER, find_first_page
+from spacebar_ratelimit import RateLimiter, RateLimitCancelled, DEFAULT_RETRIES
+from spacebar_cache import HttpCache
+from spacebar_http import make_session, is_transient, RetryQueue
+from spacebar_archive import WarcWriter
+from spacebar_export import (
+    StreamingWriter, ParquetStreamWriter, open_stream_writer, stream_format_for,
+    DEFAULT_PARQUET_COMPRESSION, DEFAULT_ROW_GROUP_SIZE,
+)
+from spacebar_checkpoint import CrawlJournal, CrawlState
+from spacebar_urlindex import KnownUrls, UrlIndex, index_path_for
+from spacebar_dates import date_position, iso_date, ISO_DATE_FIELD, OLDER, NEWER
+from spacebar_parsing import parse_listing_page, extract_article_timed, available_parsers, DEFAULT_PARSER
+from spacebar_metrics import CrawlMetrics, summarize
+from spacebar_discovery import DiscoveredUrl, discover, DEFAULT_DISCOVERY, CHUNK_SIZE
+
+# --- Constants & Configuration ---
+CATEGORIES = {
+    "การเมือง (Politics)": "politics",
+    "ธุรกิจ (Business)": "business",
+    "สังคม (Social)": "social",
+    "โลก (World)": "world",
+    "วัฒนธรรม (Culture)": "culture",
+    "ไลฟ์สไตล์ (Lifestyle)": "lifestyle",
+    "กีฬา (Sport)": "sport",
+    "Deep Space (บทความพิเศษ)": "deep-space"
+}
+
+BASE_URL = "https://spacebar.th"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+ARTICLE_FIELDS = ["หัวข้อ", "เนื้อหา", "วันที่", ISO_DATE_FIELD, "URL"]
+CATEGORY_FIELD = "หมวด"  # Extra first column of combined multi-category outputs
+DEFAULT_WORKERS = 4  # Concurrent article downloads per listing page
+MAX_WORKERS = 16
+MAX_PARSE_WORKERS = os.cpu_count() or 1  # Parse processes; 0 = parse on the download threads
+DISCOVERY_BATCH = 20  # Sitemap/feed URLs handed to the article workers at a time (one "page")
+TRIPPED_NOTE = "Stopped early: the site kept failing (partial results)"
+UP_TO_DATE_MSG = "Up to date (no new articles)"  # Append run whose outputs already hold everything found
+# run_many keeps no checkpoint journal: only single-category streamed runs can be resumed
+NO_MULTI_RESUME_MSG = "Crawls of several categories are not checkpointed and cannot be resumed; resume works for one category at a time"
+
+ArticleFields = Tuple[Optional[str], Optional[str], str]  # (title, date, content) from extract_article
+TimedFields = Tuple[ArticleFields, Dict[str, float]]  # (fields, phase timings) from extract_article_timed
+
+def category_output_path(output_path: str, category: str) -> str:
+    """Per-category output of a multi-category run (``news.csv`` -> ``news_politics.csv``)."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}_{category}{ext}"
+
+def make_record(fields: ArticleFields, headline: str, news_url: str) -> Dict[str, Optional[str]]:
+    """
+    Builds the output row of an article, falling back to the listing headline when the page has no title.
+
+    Only a missing title tag (None) falls back to the headline, and only a
+    missing date tag becomes ``"-"``; an empty tag is kept as ``""``, as in
+    the original scraper. The date is stored both as shown on the page and
+    normalized (``YYYY-MM-DD``, None when unparseable) for filtering and sorting.
+    """
+    title, date, content = fields
+    return {
+        "หัวข้อ": title if title is not None else headline,
+        "เนื้อหา": content,
+        "วันที่": date if date is not None else "-",
+        ISO_DATE_FIELD: iso_date(date),
+        "URL": news_url,
+    }
+
+
+# --- Logic Layer: Scraper ---
+class SpacebarScraper:
+    """
+    Business Logic Layer: Handles the web scraping process.
+    """
+    def __init__(self, msg_queue: queue.Queue, max_workers: int = DEFAULT_WORKERS, prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+                 rate_limiter: Optional[RateLimiter] = None, cache: Optional[HttpCache] = None, parser: str = DEFAULT_PARSER,
+                 stream: bool = False, parse_workers: int = 0, date_start: Optional[datetime] = None,
+                 date_end: Optional[datetime] = None, base_url: str = BASE_URL, metrics: Optional[CrawlMetrics] = None,
+                 compression: str = DEFAULT_PARQUET_COMPRESSION, row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 append: bool = False, discovery: str = DEFAULT_DISCOVERY, archive: Optional[WarcWriter] = None,
+                 retries: int = DEFAULT_RETRIES, trip_after: int = DEFAULT_TRIP_AFTER, recover_after: float = 0.0):
+        self.msg_queue = msg_queue
+        self.stop_event = threading.Event()
+        self.max_workers = max(1, min(int(max_workers), MAX_WORKERS))
+        self.prefetch_pages = max(0, int(prefetch_pages))  # 0 = fetch listing pages in lockstep
+        # Politeness: adaptive per-host budget shared by the prefetch thread and all workers
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # Optional on-disk HTTP cache (conditional GET); None downloads everything
+        self.cache = cache
+        # Optional raw-page archive (WARC), so the articles can be re-extracted offline later
+        self.archive = archive
+        # Retries of each request (connection errors, 5xx) before an article goes to the retry queue; made by
+        # the rate limiter, so they wait for the host's budget and end as soon as the crawl is stopped
+        self.retries = max(0, int(retries))
+        # Circuit breaker of the listing walk: consecutive failed pages that end a category, and
+        # optionally the seconds after which a tripped walk probes the site again instead of ending
+        self.trip_after = trip_after
+        self.recover_after = recover_after
+        self.tripped: Set[str] = set()  # Categories of the last run whose walk the breaker ended
+        self.parser = parser  # BeautifulSoup tree builder ("lxml" or "html.parser")
+        # Write each article to disk as it is scraped instead of keeping them all in memory
+        self.stream = stream
+        # Optional process pool for the CPU-bound extraction, so parsing does not hold the GIL the downloads need
+        self.parse_workers = max(0, min(int(parse_workers), MAX_PARSE_WORKERS))
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+        # Optional publication date range; articles outside it are fetched but not saved
+        self.date_start = date_start
+        self.date_end = date_end
+        # Parquet outputs (``.parquet`` paths): codec and rows per row group
+        self.compression = compression
+        self.row_group_size = row_group_size
+        # Add new rows to an existing output (CSV, JSON Lines, Parquet) and skip the URLs it already has
+        self.append = append
+        # Where article URLs come from: "listing" pages, or the site's "sitemap" / "rss" feeds
+        self.discovery = discovery
+        self.base_url = base_url  # Site root; overridden to crawl a local stand-in (benchmarks)
+        # Phase timings and counters, sent as METRICS messages (and optionally served to Prometheus)
+        self.metrics = metrics or CrawlMetrics()
+
+    def log(self, message: str) -> None:
+        """Sends a log message to the front end (GUI or CLI)."""
+        self.msg_queue.put(("LOG", message))
+
+    def progress(self, value: int, maximum: Optional[int] = None) -> None:
+        """Sends a progress update to the front end."""
+        self.msg_queue.put(("PROGRESS", (value, maximum)))
+    
+    def status_update(self, message: str) -> None:
+        """Sends a status line update to the front end."""
+        self.msg_queue.put(("STATUS", message))
+
+    def report_metrics(self) -> None:
+        """Sends a snapshot of the crawl metrics to the front end."""
+        self.msg_queue.put(("METRICS", self.metrics.snapshot()))
+
+    def done(self, success: bool, summary: str) -> None:
+        """Signals completion or failure (after the final metrics)."""
+        self.log_metrics()
+        self.msg_queue.put(("DONE", (success, summary)))
+
+    def get_normal_news_links(self, soup: BeautifulSoup) -> List[Any]:
+        """Extracts standard article links from the soup object, avoiding highlights if needed."""
+        # Remove highlight block to avoid duplicates if necessary
+        highlight_header = soup.find("h2", string="เรื่องเด่นประจำวัน")
+        if highlight_header:
+            highlight_block = highlight_header.find_parent("div", class_="w-full")
+            if highlight_block:
+                highlight_block.decompose()
+        # Find all article links
+        news_links = soup.find_all("a", attrs={"aria-label": ["articleLink", "latestArticleLink"]})
+        return news_links
+
+    def parse_link(self, link: Any, base_url: str) -> Tuple[str, str]:
+        """Extracts the listing headline and absolute article URL from a link tag (or a sitemap/feed entry)."""
+        if isinstance(link, DiscoveredUrl):
+            return link.title or "No Headline", urljoin(base_url, link.url)
+        headline_div = link.find("div", class_="w-full text-base font-semibold text-gray-700 hover:text-accentual-blue-main mb-2 line-clamp-3")
+        if headline_div:
+            headline = headline_div.get_text(strip=True)
+        else:
+            headline_tag = link.find("h3")
+            headline = headline_tag.get_text(strip=True) if headline_tag else "No Headline"
+
+        raw_url = link.get("href", "")
+        return headline, urljoin(base_url, raw_url)
+
+    def fetch_article(self, session: requests.Session, news_url: str, headline: str) -> Union[ArticleFields, "Future[TimedFields]", None]:
+        """
+        Downloads a single article page and extracts its fields.
+
+        Runs on a worker thread, so it must not touch any state shared with
+        the crawl loop other than the (thread-safe) session and stop event.
+        With ``parse_workers`` > 0 the raw page is handed to the parse
+        process pool instead and the thread is free for the next download.
+
+        Returns:
+            ``(title, date, content)`` (when parsing in processes, a Future of
+            ``(fields, timings)``; see :meth:`article_result`), or None if the
+            crawl was stopped before the request was made.
+        """
+        if self.stop_event.is_set():
+            return None
+
+        started = time.perf_counter()
+        try:
+            news_resp = self.rate_limiter.get(session, news_url, stop_event=self.stop_event, retries=self.retries, timeout=15)
+        except RateLimitCancelled:
+            return None
+        elapsed = time.perf_counter() - started
+        waited = getattr(news_resp, "rate_limit_wait", 0.0)
+        self.metrics.observe_phases({"wait": waited, "download": elapsed - waited})
+        self.metrics.response("article", news_resp)
+        news_resp.raise_for_status()
+
+        # Only the title, date and content subtrees are built
+        if self.parse_pool is not None:
+            return self.parse_pool.submit(extract_article_timed, news_resp.content, self.parser)
+        fields, timings = extract_article_timed(news_resp.content, self.parser)
+        self.metrics.observe_phases(timings)
+        return fields
+
+    def article_result(self, future: "Future[Union[ArticleFields, Future[TimedFields], None]]") -> Optional[ArticleFields]:
+        """Waits for a :meth:`fetch_article` job (and its parse process, if any) and returns the article fields."""
+        fields = future.result()
+        if isinstance(fields, Future):
+            fields, timings = fields.result()  # parsed in a worker process
+            self.metrics.observe_phases(timings)
+        return fields
+
+    def date_window(self, fields: ArticleFields, news_url: str, log_prefix: str = "") -> Optional[int]:
+        """
+        Position of an article's date relative to ``[date_start, date_end]``.
+
+        Returns None when the page has no date or it cannot be parsed; such
+        articles are kept (and logged), not dropped, and say nothing about
+        where the walk is relative to the range.
+        """
+        position = date_position(fields[1] or "", self.date_start, self.date_end)
+        if position is None:
+            problem = f"Unreadable date {fields[1]!r}" if fields[1] else "No date"
+            self.log(f"  [Warn] {log_prefix}{problem}, kept outside the date filter: {news_url}")
+        return position
+
+    @contextmanager
+    def parse_processes(self) -> Iterator[Optional[ProcessPoolExecutor]]:
+        """Runs the parse process pool (``parse_workers`` > 0) for the duration of a run."""
+        if not self.parse_workers:
+            yield None
+            return
+        self.parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        try:
+            yield self.parse_pool
+        finally:
+            self.parse_pool.shutdown(wait=True)
+            self.parse_pool = None
+
+    def listing_url(self, category: str, page: int) -> str:
+        """Builds the URL of a category listing page."""
+        if page == 1:
+            return urljoin(self.base_url, f"/category/{category}")
+        return urljoin(self.base_url, f"/category/{category}/page/{page}")
+
+    def fetch_listing(self, session: requests.Session, category: str, page: int, retries: int = 0) -> List[Any]:
+        """
+        Downloads and parses one listing page.
+
+        Called from the prefetch thread when look-ahead is enabled. The walk
+        retries failed pages itself (:class:`ListingPrefetcher`), so by default
+        the request is not retried again by :meth:`RateLimiter.get`.
+
+        Returns:
+            The article link tags of the page (empty when the category has no more pages).
+        """
+        category_url = self.listing_url(category, page)
+        self.log(f"Loading Page: {category_url}")
+
+        started = time.perf_counter()
+        resp = self.rate_limiter.get(session, category_url, stop_event=self.stop_event, retries=retries, timeout=20)
+        self.metrics.response("listing", resp)
+        resp.raise_for_status()
+
+        resp.encoding = "utf-8"
+        soup = parse_listing_page(resp.text, self.parser)
+        links = self.get_normal_news_links(soup)
+        self.metrics.observe("listing", time.perf_counter() - started)
+        return links
+
+    def fetch_document(self, session: requests.Session, url: str) -> Iterator[bytes]:
+        """Streams a sitemap, feed or robots.txt in chunks, so large sitemaps are parsed while they download."""
+        self.log(f"Loading: {url}")
+        resp = self.rate_limiter.get(session, url, stop_event=self.stop_event, retries=self.retries, timeout=30, stream=True)
+        size = 0
+        try:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                yield chunk
+        finally:
+            self.metrics.response("discovery", resp, size=size)
+            resp.close()
+
+    def page_reaches_date_end(self, session: requests.Session, category: str, page: int) -> bool:
+        """
+        Whether a listing page already holds articles published on or before ``date_end``.
+
+        Only the last (oldest) article of the page is downloaded. Pages past the
+        end, and dates that cannot be read, count as reached: starting too early
+        only costs time, starting too late would lose articles.
+        """
+        urls = [url for _, url in (self.parse_link(link, self.base_url) for link in self.fetch_listing(session, category, page, self.retries))
+                if f"/{category}/" in url]
+        if not urls:
+            return True
+        fields = self.fetch_article(session, urls[-1], "")
+        if isinstance(fields, Future):
+            fields, _ = fields.result()  # parsed in a worker process
+        return fields is None or date_position(fields[1] or "", None, self.date_end) != NEWER
+
+    def find_date_page(self, session: requests.Session, category: str, start_page: int, end_page: int, log_prefix: str = "") -> int:
+        """
+        First listing page that reaches ``date_end``, found by exponential then
+        binary search over page numbers (see :func:`find_first_page`), so a
+        historical date range does not walk every newer page.
+        """
+        def on_probe(page: int, reached: bool) -> None:
+            self.log(f"[Search] {log_prefix}Page {page}: {'reaches' if reached else 'newer than'} {self.date_end:%Y-%m-%d}")
+
+        try:
+            first_page = find_first_page(lambda page: self.page_reaches_date_end(session, category, page), start_page, end_page, on_probe)
+        except Exception as e:
+            self.metrics.error(e)
+            self.log(f"[Error] {log_prefix}Page search failed ({e}); starting at page {start_page}")
+            return start_page
+        if first_page > start_page:
+            self.log(f"[Search] {log_prefix}Starting at page {first_page} (pages {start_page}-{first_page - 1} are newer than {self.date_end:%Y-%m-%d})")
+        return first_page
+
+    def discovered_batches(self, session: requests.Session, category: str) -> Callable[[int], List[DiscoveredUrl]]:
+        """
+        Returns a ``fetch_page`` for :class:`ListingPrefetcher` that hands out
+        sitemap/feed entries ``DISCOVERY_BATCH`` at a time instead of listing pages.
+        """
+        entries = discover(lambda url: self.fetch_document(session, url), self.base_url, category, self.discovery,
+                           date_start=self.date_start, date_end=self.date_end, log=self.log)
+
+        def fetch_batch(batch: int) -> List[DiscoveredUrl]:
+            started = time.perf_counter()
+            urls = list(islice(entries, DISCOVERY_BATCH))
+            self.metrics.observe("listing", time.perf_counter() - started)
+            return urls
+
+        return fetch_batch
+
+    def open_session(self, listing_threads: int = 1) -> requests.Session:
+        """
+        Creates the keep-alive session shared by every request of a run.
+
+        The pool holds one connection per article worker plus one per thread
+        that fetches listing pages, so no request waits for a free socket.
+        Requests are retried by :meth:`RateLimiter.get` (``retries`` times,
+        with exponential backoff), not by the session itself; listing pages
+        are retried as a whole by the walk instead.
+        """
+        return make_session(self.max_workers + listing_threads, headers=HEADERS, cache=self.cache, archive=self.archive)
+
+    def crawl_category(self, session: requests.Session, executor: ThreadPoolExecutor, category: str, start_page: int, end_page: int,
+                       on_article: Callable[[Dict[str, str]], None], on_page: Optional[Callable[[int], None]] = None,
+                       on_page_done: Optional[Callable[[int], None]] = None, skip_urls: Optional[Container[str]] = None,
+                       log_prefix: str = "") -> int:
+        """
+        Walks the listing pages of one category and fetches their articles.
+
+        Listing pages are fetched up to ``prefetch_pages`` pages ahead on a
+        background thread; the articles found on each page are fetched
+        concurrently on ``executor`` and handed to ``on_article`` in listing
+        order, on the calling thread. With ``discovery`` set to ``"sitemap"``
+        or ``"rss"`` the URLs come from the site's sitemaps or feeds instead
+        (see :meth:`discovered_batches`) and the page range is ignored.
+
+        With ``date_end`` the walk starts at the first page that reaches it
+        (see :meth:`find_date_page`); with ``date_start`` it stops after the
+        first page whose articles are all older. Articles whose date cannot be
+        read are kept and logged (see :meth:`date_window`). Discovery batches are walked
+        to the end: their order says nothing about publication dates.
+
+        Articles that still fail with a transient error (connection error,
+        timeout, 429, 5xx) after the per-request retries are queued and fetched
+        again once the walk is done (see :class:`spacebar_http.RetryQueue`).
+        A failed listing page is attempted again with backoff; after
+        ``trip_after`` failed pages in a row the walk ends (the category is
+        added to :attr:`tripped`), or with ``recover_after`` waits and probes
+        the site until it answers again (see :class:`CircuitBreaker`).
+
+        Args:
+            session: Shared HTTP session (see :meth:`open_session`).
+            executor: Shared pool of article workers.
+            category: The category slug to scrape.
+            start_page: Page number to start from.
+            end_page: Page number to end at (0 for until end).
+            on_article: Receives every scraped article record.
+            on_page: Called with each listing page number before it is processed.
+            on_page_done: Called with each listing page whose articles have all been handled. From
+                the first page with articles in the retry queue on, pages are only reported once
+                the retry pass has fetched all of them (so a resumed crawl revisits them).
+            skip_urls: Articles already in the output (interrupted or appended-to run); not fetched,
+                but they keep their page from looking empty.
+            log_prefix: Prepended to the per-page log lines (e.g. ``"[politics] "``).
+
+        Returns:
+            The number of articles handed to ``on_article``.
+        """
+        base_url = self.base_url
+        seen_urls: Set[str] = set()
+        skip_urls = skip_urls or set()
+        found_total = 0
+        retry_queue = RetryQueue()
+        retry_from: Optional[int] = None  # First page with articles in the retry queue
+        held_page: Optional[int] = None   # Last finished page not reported to on_page_done because of it
+
+        if self.discovery == "listing":
+            fetch_page: Callable[[int], List[Any]] = lambda page: self.fetch_listing(session, category, page)
+            if self.date_end is not None:
+                start_page = self.find_date_page(session, category, start_page, end_page, log_prefix)
+        else:
+            # Sitemap/feed entries in batches; page numbers count batches, so the whole feed is walked
+            fetch_page = self.discovered_batches(session, category)
+            start_page, end_page = 1, 0
+
+        def on_trip(page: int, probe_in: Optional[float]) -> None:
+            if probe_in is None:
+                self.log(f"[Error] {log_prefix}Listing pages failed {self.trip_after} times in a row (last: page {page}). Stopping.")
+            else:
+                self.log(f"[Error] {log_prefix}Listing pages keep failing (page {page}); probing again in {probe_in:.0f}s")
+
+        listing = ListingPrefetcher(
+            fetch_page,
+            start_page, end_page,
+            lookahead=self.prefetch_pages,
+            is_last=lambda links: not links,
+            stop_event=self.stop_event,
+            should_retry=is_transient,
+            breaker=CircuitBreaker(self.trip_after, self.recover_after),
+            on_trip=on_trip,
+        )
+
+        with listing:
+            for page, news_links, error in listing:
+                if on_page:
+                    on_page(page)
+
+                if error is not None:
+                    self.metrics.error(error)
+                    self.log(f"[Error] {log_prefix}Failed page {page}: {error}")
+                    continue
+
+                if not news_links:
+                    self.log(f"[Info] {log_prefix}No more news at page {page}. Stopping.")
+                    break
+
+                # 1. Collect the new article URLs of this page (listing order)
+                jobs: List[Tuple[int, str, str]] = []
+                already_saved = 0
+                for idx, link in enumerate(news_links, start=1):
+                    try:
+                        headline, news_url = self.parse_link(link, base_url)
+                    except Exception as inner_e:
+                        self.metrics.error(inner_e)
+                        self.log(f"  [Error] {log_prefix}Parsing item {idx}: {inner_e}")
+                        continue
+
+                    # Filter
+                    if f"/{category}/" not in news_url and not news_url.endswith(f"/{category}"):
+                        continue
+                    if news_url in skip_urls:
+                        already_saved += 1  # already in the output
+                        continue
+                    if news_url in seen_urls:
+                        continue
+
+                    seen_urls.add(news_url)
+                    jobs.append((idx, news_url, headline))
+
+                # 2. Fetch all articles of the page in parallel
+                futures = [executor.submit(self.fetch_article, session, news_url, headline) for _, news_url, headline in jobs]
+
+                # 3. Collect results in listing order
+                found_this_page = 0
+                older = newer = 0  # Articles before / after the date range: not saved, but the page is not empty either
+                queued = 0  # Failed articles waiting for the retry pass, neither is the page empty
+                for (idx, news_url, headline), future in zip(jobs, futures):
+                    if self.stop_event.is_set():
+                        # Drop everything that has not started yet
+                        for pending in futures:
+                            pending.cancel()
+                        break
+
+                    try:
+                        fields = self.article_result(future)
+                    except requests.RequestException as e:
+                        self.metrics.error(e)
+                        if is_transient(e):
+                            retry_queue.add(news_url, headline, e)
+                            queued += 1
+                            self.log(f"  [Retry] {log_prefix}Queued for a later retry: {news_url} ({e})")
+                        else:
+                            self.log(f"  [Skip] Content load failed: {news_url} ({e})")
+                        continue
+                    except Exception as inner_e:
+                        self.metrics.error(inner_e)
+                        self.log(f"  [Error] {log_prefix}Parsing item {idx}: {inner_e}")
+                        continue
+
+                    if fields is None:
+                        continue
+                    if self.date_start or self.date_end:
+                        position = self.date_window(fields, news_url, log_prefix)
+                        if position == OLDER:
+                            older += 1
+                            continue
+                        if position == NEWER:
+                            newer += 1
+                            continue
+
+                    on_article(make_record(fields, headline, news_url))
+                    self.metrics.article_saved()
+                    found_this_page += 1
+                    found_total += 1
+
+                self.log(f"[Summary] {log_prefix}Page {page}: Found {found_this_page} new articles | Rate: {self.rate_limiter.current_rate():.2f} req/s")
+                self.report_metrics()
+                if queued and retry_from is None:
+                    retry_from = page
+                if on_page_done and not self.stop_event.is_set():
+                    if retry_from is None:
+                        on_page_done(page)
+                    else:
+                        held_page = page
+
+                if self.discovery != "listing":
+                    # Sitemap/feed batches are not in date order: the walk ends with the last batch,
+                    # and discover() has already dropped the entries dated outside the range
+                    continue
+                if found_this_page == 0 and not already_saved and not older and not newer and not queued:
+                    self.log(f"[Info] {log_prefix}No items matched criteria on page {page}.")
+                    break
+                # Newest-first listing: once a whole page predates the range, so does everything after it
+                if older and not found_this_page and not newer:
+                    self.log(f"[Info] {log_prefix}Page {page} is older than {self.date_start:%Y-%m-%d}. Stopping.")
+                    break
+        if listing.breaker.is_open:
+            self.tripped.add(category)
+            retry_queue.abandon()  # the site is down, a retry pass would only wait
+
+        if len(retry_queue):
+            # A stopped crawl gives up on them at once
+            self.log(f"[Retry] {log_prefix}Fetching {len(retry_queue)} failed articles again")
+            fetch = lambda url, headline: self.article_result(executor.submit(self.fetch_article, session, url, headline))
+            for news_url, headline, fields in retry_queue.drain(fetch, self.stop_event):
+                if fields is None:
+                    continue
+                if (self.date_start or self.date_end) and self.date_window(fields, news_url, log_prefix) in (OLDER, NEWER):
+                    continue
+                on_article(make_record(fields, headline, news_url))
+                self.metrics.article_saved()
+                found_total += 1
+            self.log(f"[Retry] {log_prefix}Recovered {retry_queue.recovered} articles, {len(retry_queue.lost)} lost")
+        for item in retry_queue.lost:
+            self.log(f"  [Skip] {log_prefix}Content load failed after {item.attempts} attempts: {item.url} ({item.error})")
+        if on_page_done and held_page is not None and not retry_queue.lost and not self.stop_event.is_set():
+            on_page_done(held_page)
+
+        return found_total
+
+    def log_cache_stats(self, cache_before: Dict[str, int]) -> None:
+        if self.cache is not None:
+            stats = {k: v - cache_before.get(k, 0) for k, v in self.cache.stats.items()}
+            self.log(f"[Cache] hits: {stats['hit']} | 304 revalidated: {stats['revalidated']} | downloaded: {stats['miss']}")
+
+    def log_metrics(self) -> None:
+        """Logs the metrics summary and sends the final METRICS snapshot."""
+        snapshot = self.metrics.snapshot()
+        self.log(f"[Metrics] {summarize(snapshot)}")
+        self.msg_queue.put(("METRICS", snapshot))
+
+    def save_articles(self, articles: List[Dict[str, str]], path: str) -> None:
+        """
+        Writes collected articles in one go (non-streaming runs): JSON Lines or Parquet by extension, CSV otherwise.
+
+        In ``append`` mode (and for Parquet and SQLite) the rows go through the
+        streaming writer, which adds them to an existing ``path`` instead of
+        replacing it (a SQLite store upserts them).
+        """
+        if self.append or stream_format_for(path) in ("parquet", "sqlite"):
+            started = time.perf_counter()
+            with open_stream_writer(path, list(articles[0]), self.compression, self.row_group_size, append=self.append) as writer:
+                for article in articles:
+                    writer.write(article)
+            self.metrics.observe("write", time.perf_counter() - started)
+            return
+
+        import pandas as pd  # Only loaded when a non-streamed export needs it
+
+        df = pd.DataFrame(articles)
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+
+        started = time.perf_counter()
+        if stream_format_for(path) == "jsonl":
+            df.to_json(path, orient="records", lines=True, force_ascii=False)
+        else:
+            df.to_csv(path, index=False, encoding="utf-8-sig")
+        self.metrics.observe("write", time.perf_counter() - started)
+
+    def run(self, category: str, start_page: int, end_page: int, csv_path: str, resume_state: Optional[CrawlState] = None) -> None:
+        """
+        Main scraping loop.
+
+        Listing pages are fetched up to ``prefetch_pages`` pages ahead on a
+        background thread; the articles found on each page are fetched
+        concurrently by a pool of ``max_workers`` threads and collected back
+        in listing order.
+
+        With ``stream`` enabled, articles are appended to ``<csv_path>.part``
+        as they arrive (CSV, JSON Lines for ``.jsonl`` paths or Parquet row
+        groups for ``.parquet`` paths) and the file is renamed to ``csv_path``
+        when the run ends, is stopped or fails. Streamed CSV and JSON Lines
+        runs also keep a checkpoint journal (``<csv_path>.journal``)
+        that is removed once the crawl completes; see :meth:`resume`.
+
+        With ``append`` the new rows are added to the end of an existing
+        ``csv_path`` and articles whose URL is already in its sidecar URL
+        index are not fetched again.
+        
+        Args:
+            category: The category slug to scrape.
+            start_page: Page number to start from.
+            end_page: Page number to end at (0 for until end).
+            csv_path: File path to save the CSV (or ``.jsonl`` when streaming).
+            resume_state: Checkpoint of an interrupted streamed run of the same crawl to continue.
+        """
+        articles: List[Dict[str, str]] = []
+        resumed_urls: Set[str] = resume_state.urls if resume_state is not None else set()
+        total_scraped = resume_state.rows if resume_state is not None else 0
+        first_page = resume_state.next_page if resume_state is not None else start_page
+        start_time = time.time()
+        cache_before = dict(self.cache.stats) if self.cache is not None else {}
+        # An append run that finds nothing new against an existing output is up to date, not a failure
+        refreshing = self.append and os.path.exists(csv_path)
+        writer: Optional[Union[StreamingWriter, ParquetStreamWriter]] = None
+        journal: Optional[CrawlJournal] = None
+        url_index: Optional[UrlIndex] = None
+        skip_urls: Container[str] = resumed_urls
+        
+        self.tripped = set()
+        self.log(f"--- เริ่มต้นดึงข้อมูล: {category} (หน้า {first_page} - {end_page if end_page > 0 else 'จนจบ'}) | Workers: {self.max_workers} | Prefetch: {self.prefetch_pages} | Parser: {self.parser} | Parse Procs: {self.parse_workers} | Discovery: {self.discovery} ---")
+        
+        def save(article: Dict[str, str]) -> None:
+            nonlocal total_scraped
+            # Write out immediately, or keep for the final export
+            if writer is not None:
+                started = time.perf_counter()
+                writer.write(article)
+                if journal is not None:
+                    journal.article_done(article["URL"], writer.offset)
+                self.metrics.observe("write", time.perf_counter() - started)
+            else:
+                articles.append(article)
+            total_scraped += 1
+            self.log(f"  + [{total_scraped}] {article['หัวข้อ'][:40]}... | {article['วันที่']}")
+
+        def show_page(page: int) -> None:
+            # Update Status
+            self.status_update(f"กำลังประมวลผลหน้าที่ {page}... ({self.rate_limiter.current_rate():.1f} req/s)")
+
+            # Update Progress Bar (Page based; sitemap/feed batches have no known total)
+            if end_page != 0 and self.discovery == "listing":
+                self.progress(page - start_page, end_page - start_page + 1)
+            else:
+                self.progress(0, 0) # Indeterminate mode
+
+        def index_saved(urls: List[str]) -> None:
+            # Keep the URL index in step with the rows just added to the output
+            if url_index is not None:
+                url_index.add_many(urls)
+                url_index.sync(csv_path)
+
+        try:
+            if self.append:
+                # A resumed output already holds rows the index does not know yet (journaled URLs cover them)
+                if resume_state is not None:
+                    url_index = UrlIndex(index_path_for(csv_path))
+                    url_index.add_many(resumed_urls)
+                else:
+                    url_index = UrlIndex.open_for(csv_path)
+                skip_urls = KnownUrls(resumed_urls, url_index)
+                self.log(f"Appending to: {csv_path} ({len(url_index)} articles already saved)")
+
+            if self.stream:
+                if resume_state is not None:
+                    writer = StreamingWriter(csv_path, ARTICLE_FIELDS, resume_offset=resume_state.offset, resume_rows=resume_state.rows,
+                                             append=self.append)
+                    journal = CrawlJournal.resume(csv_path)
+                    self.log(f"Resuming after {resume_state.rows} articles from page {first_page}: {writer.part_path}")
+                else:
+                    writer = open_stream_writer(csv_path, ARTICLE_FIELDS, self.compression, self.row_group_size, append=self.append)
+                    if writer.resumable:
+                        journal = CrawlJournal.start(csv_path, category=category, start_page=start_page, end_page=end_page,
+                                                     append=self.append, base_offset=writer.base_offset, discovery=self.discovery,
+                                                     date_start=self.date_start.isoformat() if self.date_start else None,
+                                                     date_end=self.date_end.isoformat() if self.date_end else None,
+                                                     parser=self.parser)
+                    self.log(f"Streaming rows to: {writer.part_path}")
+
+            # The parse pool is entered first so it outlives the download threads that feed it
+            with self.open_session() as session, self.parse_processes(), ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                self.crawl_category(session, executor, category, first_page, end_page, save, on_page=show_page,
+                                    on_page_done=journal.page_done if journal is not None else None, skip_urls=skip_urls)
+
+            self.log_cache_stats(cache_before)
+
+            # Keep the checkpoint only if there is something left to resume
+            if journal is not None:
+                if (self.stop_event.is_set() or self.tripped) and writer.count:
+                    journal.close()
+                    self.log(f"[Checkpoint] {'Stopped' if self.stop_event.is_set() else 'Site unavailable'}; resume later from {journal.path}")
+                else:
+                    journal.finish()
+
+            # Save to CSV
+            elapsed = time.time() - start_time
+            note = f"\n{TRIPPED_NOTE}" if self.tripped else ""
+            if writer is not None and writer.count:
+                writer.close()
+                index_saved(writer.urls)
+                msg = f"Saved successfully: {csv_path}\nTotal Articles: {total_scraped}\nTime: {elapsed:.2f}s{note}"
+                self.log(">>> " + msg.replace("\n", " | "))
+                self.done(True, msg)
+            elif articles:
+                self.save_articles(articles, csv_path)
+                index_saved([a["URL"] for a in articles])
+                msg = f"Saved successfully: {csv_path}\nTotal Articles: {total_scraped}\nTime: {elapsed:.2f}s{note}"
+                self.log(">>> " + msg.replace("\n", " | "))
+                self.done(True, msg)
+            else:
+                if writer is not None:
+                    writer.discard()
+                if refreshing and not self.tripped:
+                    msg = f"{UP_TO_DATE_MSG}: {csv_path}\nTime: {elapsed:.2f}s"
+                    self.log(">>> " + msg.replace("\n", " | "))
+                    self.done(True, msg)
+                else:
+                    msg = f"No articles found.\nTime: {elapsed:.2f}s{note}"
+                    self.log(msg)
+                    self.done(False, msg)
+
+        except Exception as e:
+            self.log(f"[CRITICAL ERROR] {e}")
+            # Keep whatever was already streamed
+            if writer is not None and writer.count:
+                try:
+                    writer.close()
+                    index_saved(writer.urls)
+                    self.log(f">>> Partial results saved: {csv_path} ({writer.count} articles)")
+                except Exception as close_e:
+                    self.log(f"[Error] Could not finalize {writer.part_path}: {close_e}")
+            if journal is not None:
+                self.log(f"[Checkpoint] Resume later from {journal.path}")
+            self.done(False, f"Critical Error: {e}")
+        finally:
+            if journal is not None:
+                journal.close()
+            if url_index is not None:
+                url_index.close()
+
+    def run_many(self, categories: List[str], start_page: int, end_page: int, output_path: str, split_outputs: bool = False) -> None:
+        """
+        Crawls several categories in one run.
+
+        Every category walks its listing pages on its own thread, while the
+        HTTP session (connection pool), the article worker pool and the rate
+        limiter are shared, so the run takes about as long as the slowest
+        category rather than the sum of all of them. Per-category progress is
+        reported with ``CATEGORY`` messages: ``(category, page, count, state)``
+        where state is ``"running"``, ``"done"`` or ``"error"``.
+
+        Args:
+            categories: Category slugs to scrape.
+            start_page: Page number to start from (every category).
+            end_page: Page number to end at (0 for until end).
+            output_path: Combined output with a ``หมวด`` column, or the name
+                pattern of the per-category files when ``split_outputs`` is set.
+            split_outputs: Write ``<name>_<category><ext>`` files instead of one combined file.
+
+        With ``append`` every output gets its new rows added at the end and
+        skips the articles already in its URL index, like :meth:`run`.
+
+        Unlike :meth:`run`, no checkpoint journal is kept, so an interrupted
+        run cannot be continued with :meth:`resume` (:data:`NO_MULTI_RESUME_MSG`).
+        """
+        start_time = time.time()
+        self.tripped = set()
+        cache_before = dict(self.cache.stats) if self.cache is not None else {}
+        fields = ARTICLE_FIELDS if split_outputs else [CATEGORY_FIELD] + ARTICLE_FIELDS
+        outputs = {cat: category_output_path(output_path, cat) if split_outputs else output_path for cat in categories}
+        # Up to date (not a failure) when an append run finds nothing new and every output already exists
+        refreshing = self.append and all(os.path.exists(path) for path in outputs.values())
+        writers: Dict[str, Union[StreamingWriter, ParquetStreamWriter]] = {}
+        indexes: Dict[str, UrlIndex] = {}
+        collected: Dict[str, List[Dict[str, str]]] = {path: [] for path in set(outputs.values())}
+        counts: Dict[str, int] = {cat: 0 for cat in categories}
+        write_lock = threading.Lock()
+        pages_done = [0]
+        total_pages = len(categories) * (end_page - start_page + 1) if end_page != 0 and self.discovery == "listing" else 0
+
+        self.log(f"--- เริ่มต้นดึงข้อมูล {len(categories)} หมวด: {', '.join(categories)} (หน้า {start_page} - {end_page if end_page > 0 else 'จนจบ'}) | Workers: {self.max_workers} | Output: {'แยกไฟล์' if split_outputs else output_path} ---")
+        if self.stream:
+            self.log(f"[Info] {NO_MULTI_RESUME_MSG}")
+
+        def crawl(category: str) -> None:
+            path = outputs[category]
+            current_page = [start_page]
+
+            def save(article: Dict[str, str]) -> None:
+                row = article if split_outputs else {CATEGORY_FIELD: category, **article}
+                with write_lock:
+                    if self.stream:
+                        started = time.perf_counter()
+                        writers[path].write(row)
+                        self.metrics.observe("write", time.perf_counter() - started)
+                    else:
+                        collected[path].append(row)
+                    counts[category] += 1
+                    count = counts[category]
+                self.msg_queue.put(("CATEGORY", (category, current_page[0], count, "running")))
+                self.log(f"  + [{category} {count}] {article['หัวข้อ'][:40]}... | {article['วันที่']}")
+
+            def show_page(page: int) -> None:
+                current_page[0] = page
+                self.msg_queue.put(("CATEGORY", (category, page, counts[category], "running")))
+
+            def page_done(page: int) -> None:
+                with write_lock:
+                    pages_done[0] += 1
+                    done_pages = pages_done[0]
+                if total_pages:
+                    self.progress(done_pages, total_pages)
+
+            try:
+                self.crawl_category(session, executor, category, start_page, end_page, save, on_page=show_page,
+                                    on_page_done=page_done, skip_urls=indexes.get(path), log_prefix=f"[{category}] ")
+            except Exception as e:
+                self.log(f"[Error] [{category}] {e}")
+                self.msg_queue.put(("CATEGORY", (category, current_page[0], counts[category], "error")))
+                return
+            self.msg_queue.put(("CATEGORY", (category, current_page[0], counts[category], "done")))
+
+        try:
+            if self.append:
+                for path in collected:
+                    indexes[path] = UrlIndex.open_for(path)
+                    self.log(f"Appending to: {path} ({len(indexes[path])} articles already saved)")
+            if self.stream:
+                for path in collected:
+                    writers[path] = open_stream_writer(path, fields, self.compression, self.row_group_size, append=self.append)
+                self.log(f"Streaming rows to: {', '.join(w.part_path for w in writers.values())}")
+
+            self.status_update(f"กำลังดึง {len(categories)} หมวดพร้อมกัน...")
+            if not total_pages:
+                self.progress(0, 0) # Indeterminate mode
+
+            with self.open_session(listing_threads=len(categories)) as session, \
+                    self.parse_processes(), \
+                    ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                    ThreadPoolExecutor(max_workers=len(categories)) as crawlers:
+                for future in [crawlers.submit(crawl, cat) for cat in categories]:
+                    future.result()
+
+            self.log_cache_stats(cache_before)
+
+            for path, rows in collected.items():
+                if rows:
+                    self.save_articles(rows, path)
+                    if path in indexes:
+                        indexes[path].add_many(row["URL"] for row in rows)
+                        indexes[path].sync(path)
+        except Exception as e:
+            self.log(f"[CRITICAL ERROR] {e}")
+            self.done(False, f"Critical Error: {e}")
+            return
+        finally:
+            # Keep whatever was already streamed
+            for path, writer in writers.items():
+                if writer.count:
+                    writer.close()
+                    if path in indexes:
+                        indexes[path].add_many(writer.urls)
+                        indexes[path].sync(path)
+                else:
+                    writer.discard()
+            for index in indexes.values():
+                index.close()
+
+        saved = list(dict.fromkeys(outputs[cat] for cat in categories if counts[cat]))
+
+        elapsed = time.time() - start_time
+        total = sum(counts.values())
+        per_category = " | ".join(f"{cat}: {counts[cat]}" for cat in categories)
+        note = f"\n{TRIPPED_NOTE} ({', '.join(sorted(self.tripped))})" if self.tripped else ""
+        if total:
+            msg = f"Saved successfully: {', '.join(saved)}\nTotal Articles: {total} ({per_category})\nTime: {elapsed:.2f}s{note}"
+            self.log(">>> " + msg.replace("\n", " | "))
+            self.done(True, msg)
+        elif refreshing and not self.tripped:
+            msg = f"{UP_TO_DATE_MSG}: {', '.join(dict.fromkeys(outputs.values()))}\nTime: {elapsed:.2f}s"
+            self.log(">>> " + msg.replace("\n", " | "))
+            self.done(True, msg)
+        else:
+            msg = f"No articles found.\nTime: {elapsed:.2f}s{note}"
+            self.log(msg)
+            self.done(False, msg)
+
+    def resume(self, csv_path: str) -> None:
+        """
+        Continues an interrupted streamed run of ``csv_path`` from its checkpoint journal.
+
+        Rows already in the output are kept (a row torn by a crash is dropped),
+        their articles are not downloaded again and the crawl restarts after
+        the last completed listing page. The options that decide which
+        articles are saved (append, discovery, date range, parser) are taken
+        from the journal, not from this scraper.
+        """
+        state = CrawlJournal.load(csv_path)
+        if state is None:
+            msg = f"No checkpoint found for {csv_path} (crawls of several categories are not checkpointed)"
+            self.log(f"[Info] {msg}")
+            self.done(False, msg)
+            return
+
+        self.stream = True  # Only streamed runs are journaled
+        params = state.params
+        self.append = params.get("append", False)
+        self.discovery = params.get("discovery", DEFAULT_DISCOVERY)
+        # The date range and parser of the original run (journals of older versions have none)
+        if "date_start" in params:
+            self.date_start = datetime.fromisoformat(params["date_start"]) if params["date_start"] else None
+            self.date_end = datetime.fromisoformat(params["date_end"]) if params["date_end"] else None
+        if params.get("parser") in available_parsers():
+            self.parser = params["parser"]
+        self.run(params["category"], params["start_page"], params["end_page"], csv_path, resume_state=state)
@@ -0,0 +1,144 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# --- Constants & Configuration ---
+ISO_DATE_FIELD = "วันที่ ISO"  # Export column with the parsed date as YYYY-MM-DD (empty when unparseable)
+DATE_CACHE_SIZE = 4096       # Distinct date strings remembered; a crawl sees about one per day
+BUDDHIST_ERA_OFFSET = 543    # พ.ศ. = ค.ศ. + 543
+BUDDHIST_ERA_MIN = 2400      # Four-digit years from here on are Buddhist era
+
+THAI_MONTH_ABBRS = ["ม.ค.", "ก.พ.", "มี.ค.", "เม.ย.", "พ.ค.", "มิ.ย.", "ก.ค.", "ส.ค.", "ก.ย.", "ต.ค.", "พ.ย.", "ธ.ค."]
+THAI_MONTH_NAMES = ["มกราคม", "กุมภาพันธ์", "มีนาคม", "เมษายน", "พฤษภาคม", "มิถุนายน",
+                    "กรกฎาคม", "สิงหาคม", "กันยายน", "ตุลาคม", "พฤศจิกายน", "ธันวาคม"]
+ENGLISH_MONTH_NAMES = ["january", "february", "march", "april", "may", "june",
+                       "july", "august", "september", "october", "november", "december"]
+
+
+def _month_key(token: str) -> str:
+    """Month lookup key: dots and spaces dropped, lower case (``ม.ค.``, ``มค``, ``Jan.`` -> ``มค``, ``jan``)."""
+    return token.replace(".", "").replace(" ", "").lower()
+
+
+_THAI_MONTHS: Dict[str, int] = {}
+for _number, (_abbr, _name) in enumerate(zip(THAI_MONTH_ABBRS, THAI_MONTH_NAMES), 1):
+    _THAI_MONTHS[_month_key(_abbr)] = _THAI_MONTHS[_name] = _number
+_MONTHS: Dict[str, int] = dict(_THAI_MONTHS)
+for _number, _name in enumerate(ENGLISH_MONTH_NAMES, 1):
+    _MONTHS[_name] = _MONTHS[_name[:3]] = _number
+_MONTHS["sept"] = 9
+
+_THAI_DIGITS = str.maketrans("๐๑๒๓๔๕๖๗๘๙", "0123456789")
+
+# Tried in order; the first one that matches (with a known month name) decides.
+# Each yields (day, month, year) groups; extra text around the date is ignored.
+DATE_PATTERNS = [
+    re.compile(r"(?<!\d)(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})(?!\d)"),               # 2025-01-27
+    re.compile(r"(?<!\d)(?P<day>\d{1,2})/(?P<month>\d{1,2})/(?P<year>\d{4})(?!\d)"),               # 27/01/2025
+    re.compile(r"(?<!\d)(?P<day>\d{1,2})\s*(?P<month>[^\s\d,/.-][^\s\d,]*),?\s*(?P<year>\d{4}|\d{2})(?!\d)"),  # 27 ม.ค. 2568, 27 Jan. 2025
+    re.compile(r"(?P<month>[A-Za-z]+)\.?\s+(?P<day>\d{1,2}),?\s+(?P<year>\d{4})(?!\d)"),            # Jan 27, 2025
+]
+
+
+def _full_year(year: int, digits: int, thai: bool) -> int:
+    """Christian-era year: two-digit years are taken as 25xx (Thai month) or 20xx, Buddhist-era years converted."""
+    if digits == 2:
+        year += 2500 if thai else 2000
+    return year - BUDDHIST_ERA_OFFSET if year >= BUDDHIST_ERA_MIN else year
+
+
+def _match_date(text: str) -> Optional[Tuple[int, int, int]]:
+    for pattern in DATE_PATTERNS:
+        m = pattern.search(text)
+        if not m:
+            continue
+        month_token = m.group("month")
+        if month_token.isdigit():
+            month, thai = int(month_token), False
+        else:
+            key = _month_key(month_token)
+            if key not in _MONTHS:
+                continue
+            month, thai = _MONTHS[key], key in _THAI_MONTHS
+        year = m.group("year")
+        return _full_year(int(year), len(year), thai), month, int(m.group("day"))
+    return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(date_str: str) -> Optional[datetime]:
+    """
+    Parses the date line of an article page; None when no known format matches.
+
+    Recognizes Thai month names and abbreviations (``27 ม.ค. 2568``, with
+    Buddhist-era or two-digit years and Thai digits), English month names
+    (``27 Jan. 2025``, ``Jan 27, 2025``), ``2025-01-27`` and ``27/01/2025``;
+    see :data:`DATE_PATTERNS`. Results are memoized: the articles of a day
+    share one date string.
+    """
+    if not date_str:
+        return None
+    parts = _match_date(date_str.translate(_THAI_DIGITS))
+    if parts is None:
+        return None
+    try:
+        return datetime(*parts)
+    except ValueError:  # e.g. 31 ก.พ.
+        return None
+
+
+def iso_date(date_str: Optional[str]) -> Optional[str]:
+    """The date of an article as ``YYYY-MM-DD`` (the :data:`ISO_DATE_FIELD` value), None when unparseable."""
+    d = parse_date(date_str) if date_str else None
+    return d.strftime("%Y-%m-%d") if d else None
+
+
+def parse_date_column(values: Any) -> Any:
+    """
+    Vectorized :func:`parse_date` for a whole column (e.g. ``df["วันที่"]``).
+
+    The column is factorized so every distinct string is parsed once (the
+    articles of a day share one), then the dates are spread back over the
+    rows with a single ``take``. Returns a ``datetime64`` Series with the
+    same index, NaT where :func:`parse_date` gives None.
+    """
+    import pandas as pd  # Only needed for DataFrame exports
+
+    column = pd.Series(values, copy=False)
+    codes, uniques = pd.factorize(column)
+    parsed = pd.DatetimeIndex([parse_date(value) if isinstance(value, str) else None for value in uniques])
+    return pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=column.index)
+
+
+def iso_date_column(values: Any) -> Any:
+    """Vectorized :func:`iso_date`: a Series of ``YYYY-MM-DD`` strings, None where unparseable."""
+    dates = parse_date_column(values)
+    return dates.dt.strftime("%Y-%m-%d").astype(object).where(dates.notna(), None)
+
+
+# Where an article date lies relative to a date range (see date_position)
+OLDER, IN_RANGE, NEWER = -1, 0, 1
+
+
+def date_position(date_str: str, date_start: Optional[datetime], date_end: Optional[datetime]) -> Optional[int]:
+    """
+    Compares an article date with ``[date_start, date_end]`` (either bound may be None).
+
+    Returns:
+        ``OLDER`` (before ``date_start``), ``IN_RANGE``, ``NEWER`` (after
+        ``date_end``), or None when the date cannot be parsed.
+    """
+    d = parse_date(date_str)
+    if not d:
+        return None
+    if date_start and d < date_start:
+        return OLDER
+    if date_end and d > date_end:
+        return NEWER
+    return IN_RANGE
+
+
+def in_date_range(date_str: str, date_start: Optional[datetime], date_end: Optional[datetime]) -> bool:
+    """True if the article date lies within ``[date_start, date_end]`` (either bound may be None)."""
+    return date_position(date_str, date_start, date_end) == IN_RANGE
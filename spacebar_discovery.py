@@ -0,0 +1,218 @@
+import re
+import zlib
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Set
+from urllib.parse import urljoin, urlparse
+
+# --- Constants & Configuration ---
+DISCOVERY_MODES = ["listing", "sitemap", "rss"]
+DEFAULT_DISCOVERY = "listing"
+SITEMAP_PATHS = ["/sitemap.xml"]  # Tried when robots.txt lists no sitemap
+FEED_PATHS = ["/category/{category}/feed", "/feed"]  # Category feed first, then the site-wide feed
+MAX_SITEMAP_DEPTH = 3  # Nested sitemap indexes followed at most this deep
+CHUNK_SIZE = 64 * 1024
+
+# Fetches a document and yields its body in chunks (raises on HTTP errors)
+FetchChunks = Callable[[str], Iterable[bytes]]
+
+_SITEMAP_LINE_RE = re.compile(r"^\s*sitemap\s*:\s*(\S+)", re.IGNORECASE | re.MULTILINE)
+
+
+class DiscoveredUrl(NamedTuple):
+    """An article URL found in a sitemap or feed."""
+
+    url: str
+    lastmod: Optional[datetime] = None    # Last modification (sitemap ``lastmod``)
+    published: Optional[datetime] = None  # Publication time (RSS ``pubDate``, Atom ``published``, news sitemap)
+    title: Optional[str] = None
+
+
+def parse_xml_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parses a W3C datetime (``2025-01-31``, ``2025-01-31T08:00:00+07:00``) or an
+    RFC 822 date (RSS). The timezone is dropped, keeping the site's local wall
+    clock, so it compares with the naive day bounds of a date filter.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
+def _local(tag: str) -> str:
+    """Tag name without its XML namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(elem: ET.Element, name: str) -> Optional[str]:
+    for child in elem.iter():
+        if child is not elem and _local(child.tag) == name and child.text:
+            return child.text.strip()
+    return None
+
+
+def _decompressed(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Passes chunks through, gunzipping ``.xml.gz`` bodies (served without Content-Encoding)."""
+    inflater = None
+    for chunk in chunks:
+        if inflater is None:
+            if not chunk:
+                continue
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == b"\x1f\x8b" else False
+        if inflater:
+            yield inflater.decompress(chunk)
+        else:
+            yield chunk
+    if inflater:
+        yield inflater.flush()
+
+
+def iter_elements(chunks: Iterable[bytes], tags: Set[str]) -> Iterator[ET.Element]:
+    """
+    Streams an XML document and yields every complete element named in ``tags``.
+
+    The document is parsed as it is downloaded; yielded elements are cleared
+    afterwards, so memory stays flat however many entries a sitemap has.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    for chunk in _decompressed(chunks):
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if _local(elem.tag) in tags:
+                yield elem
+                elem.clear()
+    parser.close()
+    for _, elem in parser.read_events():
+        if _local(elem.tag) in tags:
+            yield elem
+
+
+def sitemaps_from_robots(text: str, base_url: str) -> List[str]:
+    """The ``Sitemap:`` URLs listed in a robots.txt."""
+    return [urljoin(base_url, url) for url in _SITEMAP_LINE_RE.findall(text)]
+
+
+def names_category(url: str, category: str) -> bool:
+    """True when a sitemap file name mentions ``category`` (``sitemap-politics.xml``, ``politics_2.xml``)."""
+    name = urlparse(url).path.rsplit("/", 1)[-1].lower()
+    return re.search(rf"(?<![a-z0-9]){re.escape(category.lower())}(?![a-z0-9])", name) is not None
+
+
+def iter_sitemap(fetch: FetchChunks, url: str, since: Optional[datetime] = None, category: Optional[str] = None,
+                 depth: int = 0) -> Iterator[DiscoveredUrl]:
+    """
+    Yields the entries of a sitemap, following sitemap indexes.
+
+    Child sitemaps whose ``lastmod`` is older than ``since`` are not fetched:
+    nothing in them can have changed since then. When some child sitemaps are
+    named after ``category``, only those are fetched.
+    """
+    children: List[str] = []
+    for elem in iter_elements(fetch(url), {"url", "sitemap"}):
+        loc = _child_text(elem, "loc")
+        if not loc:
+            continue
+        lastmod = parse_xml_date(_child_text(elem, "lastmod"))
+        if _local(elem.tag) == "sitemap":
+            if since is None or lastmod is None or lastmod >= since:
+                children.append(loc)
+            continue
+        # Google News sitemaps carry the publication date and title
+        yield DiscoveredUrl(loc, lastmod, parse_xml_date(_child_text(elem, "publication_date")), _child_text(elem, "title"))
+
+    # Children are read after the index so only one response is open at a time
+    if category is not None:
+        children = [child for child in children if names_category(child, category)] or children
+    if depth < MAX_SITEMAP_DEPTH:
+        for child in children:
+            yield from iter_sitemap(fetch, child, since, category, depth + 1)
+
+
+def iter_feed(fetch: FetchChunks, url: str) -> Iterator[DiscoveredUrl]:
+    """Yields the items of an RSS 2.0 or Atom feed."""
+    for elem in iter_elements(fetch(url), {"item", "entry"}):
+        if _local(elem.tag) == "item":
+            link = _child_text(elem, "link")
+            published = parse_xml_date(_child_text(elem, "pubDate"))
+            updated = None
+        else:
+            link = next((c.get("href") for c in elem if _local(c.tag) == "link" and c.get("rel", "alternate") == "alternate"), None)
+            published = parse_xml_date(_child_text(elem, "published"))
+            updated = parse_xml_date(_child_text(elem, "updated"))
+        if link:
+            yield DiscoveredUrl(link.strip(), updated, published or updated, _child_text(elem, "title"))
+
+
+def in_category(url: str, category: str) -> bool:
+    """True for article URLs of ``category`` (``https://spacebar.th/<category>/<slug>``)."""
+    return urlparse(url).path.startswith(f"/{category}/")
+
+
+def may_be_in_range(entry: DiscoveredUrl, date_start: Optional[datetime], date_end: Optional[datetime]) -> bool:
+    """
+    False only when the entry certainly lies outside ``[date_start, date_end]``.
+
+    A modification date older than ``date_start`` rules an article out (it was
+    published even earlier), but a recent one does not: old articles get edited.
+    Only a publication date can rule out articles newer than ``date_end``.
+    """
+    known = entry.published or entry.lastmod
+    if date_start is not None and known is not None and known < date_start:
+        return False
+    if date_end is not None and entry.published is not None and entry.published.date() > date_end.date():
+        return False
+    return True
+
+
+def discover(fetch: FetchChunks, base_url: str, category: str, mode: str, date_start: Optional[datetime] = None,
+             date_end: Optional[datetime] = None, log: Callable[[str], None] = lambda message: None) -> Iterator[DiscoveredUrl]:
+    """
+    Yields the article URLs of ``category`` found in the site's sitemaps or RSS feeds.
+
+    Sitemaps are taken from ``robots.txt`` (falling back to :data:`SITEMAP_PATHS`)
+    and their indexes are followed (see :func:`iter_sitemap`);
+    feeds are :data:`FEED_PATHS`. Documents are streamed, entries are filtered
+    by category path and date range as they are parsed and every URL is yielded
+    once. A document that cannot be fetched is logged and skipped.
+
+    Args:
+        fetch: Downloads a document, yielding its body in chunks.
+        base_url: Site root.
+        category: Category slug; only URLs under ``/<category>/`` are kept.
+        mode: ``"sitemap"`` or ``"rss"``.
+        date_start: Optional oldest publication day.
+        date_end: Optional newest publication day.
+        log: Receives progress and error messages.
+    """
+    if mode == "sitemap":
+        roots: List[str] = []
+        try:
+            roots = sitemaps_from_robots(b"".join(fetch(urljoin(base_url, "/robots.txt"))).decode("utf-8", "replace"), base_url)
+        except Exception as e:
+            log(f"[Info] robots.txt unavailable ({e}); trying {', '.join(SITEMAP_PATHS)}")
+        documents = roots or [urljoin(base_url, path) for path in SITEMAP_PATHS]
+    elif mode == "rss":
+        documents = [urljoin(base_url, path.format(category=category)) for path in FEED_PATHS]
+    else:
+        raise ValueError(f"unknown discovery mode {mode!r} (choose from: sitemap, rss)")
+
+    seen: Set[str] = set()
+    for url in documents:
+        entries = iter_sitemap(fetch, url, since=date_start, category=category) if mode == "sitemap" else iter_feed(fetch, url)
+        try:
+            for entry in entries:
+                if entry.url in seen or not in_category(entry.url, category) or not may_be_in_range(entry, date_start, date_end):
+                    continue
+                seen.add(entry.url)
+                yield entry
+        except Exception as e:
+            log(f"[Skip] {mode} {url}: {e}")
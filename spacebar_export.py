@@ -0,0 +1,361 @@
+import csv
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# --- Constants & Configuration ---
+PART_SUFFIX = ".part"
+STREAM_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet", ".sqlite": "sqlite"}
+APPEND_FORMATS = {"csv", "jsonl", "parquet", "sqlite"}  # Outputs new rows can be added to without rewriting the file as text
+FSYNC_EVERY = 50  # Rows between fsyncs; every row is flushed to the OS immediately
+
+PARQUET_COMPRESSIONS = ["zstd", "snappy", "gzip", "brotli", "none"]
+DEFAULT_PARQUET_COMPRESSION = "zstd"  # Best size/speed trade-off for long Thai article bodies
+DEFAULT_ROW_GROUP_SIZE = 1000         # Rows per Parquet row group (buffered in memory until written)
+
+
+def stream_format_for(path: str) -> Optional[str]:
+    """Returns the streaming format of an output path ("csv" / "jsonl" / "parquet" / "sqlite"), or None if it cannot be streamed."""
+    return STREAM_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def can_append(path: str) -> bool:
+    """Whether new rows can be merged into an existing ``path`` (see ``append`` of the writers)."""
+    return stream_format_for(path) in APPEND_FORMATS
+
+
+def open_stream_writer(path: str, fieldnames: List[str], compression: str = DEFAULT_PARQUET_COMPRESSION,
+                       row_group_size: int = DEFAULT_ROW_GROUP_SIZE, append: bool = False) -> Union["StreamingWriter", "ParquetStreamWriter", Any]:
+    """
+    Opens the streaming writer matching the extension of ``path`` (Parquet options are ignored for other formats).
+
+    ``.sqlite`` paths get a :class:`spacebar_store.ArticleStore`, which always
+    merges into the database (upsert on URL) whatever ``append`` says.
+    """
+    fmt = stream_format_for(path)
+    if fmt == "sqlite":
+        from spacebar_store import ArticleStore
+
+        return ArticleStore(path, fieldnames)
+    if fmt == "parquet":
+        return ParquetStreamWriter(path, fieldnames, compression=compression, row_group_size=row_group_size, append=append)
+    return StreamingWriter(path, fieldnames, append=append)
+
+
+def read_csv_header(path: str) -> List[str]:
+    """Column names of an existing CSV export (empty for an empty file)."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def existing_columns(path: str, columns: List[str], fieldnames: List[str]) -> List[str]:
+    """
+    Columns to write when adding rows to an existing export with ``columns``.
+
+    An export from an older version may lack columns added since (e.g. the
+    normalized date): its own columns are kept and the new ones are left out
+    of the added rows. Any other difference raises ValueError.
+    """
+    if columns == list(fieldnames):
+        return list(fieldnames)
+    if columns and set(columns) <= set(fieldnames):
+        return list(columns)
+    raise ValueError(f"Cannot append to {path}: its columns ({', '.join(columns)}) differ from {', '.join(fieldnames)}")
+
+
+class StreamingWriter:
+    """
+    Appends article rows to disk as soon as they are scraped.
+
+    Rows go to ``<path>.part`` and are flushed one by one, so a killed process
+    loses at most the article being written and memory does not grow with the
+    crawl. :meth:`close` fsyncs the file and atomically renames it to ``path``;
+    until then an existing file at ``path`` is left untouched.
+
+    CSV output matches ``DataFrame.to_csv(index=False, encoding="utf-8-sig")``;
+    JSON Lines output has one ``ensure_ascii=False`` object per line.
+
+    With ``resume_offset`` an interrupted output (``.part`` or an already
+    finalized ``path``) is reopened instead: it is truncated to that many
+    bytes, which drops a row torn by a crash, and new rows are appended
+    after the ``resume_rows`` rows kept.
+
+    With ``append`` rows are added to the end of an existing ``path`` in
+    place (no ``.part``, no rename, existing rows are neither read nor
+    rewritten); a CSV must have the same columns, or a subset of them
+    (see :func:`existing_columns`). :attr:`base_offset` is
+    its size before the first new row, and :meth:`discard` truncates back to it.
+    Combined with ``resume_offset`` an interrupted append is continued in place.
+    """
+
+    resumable = True  # ``offset`` can be journaled and passed back as ``resume_offset``
+
+    def __init__(self, path: str, fieldnames: List[str], fmt: Optional[str] = None,
+                 resume_offset: Optional[int] = None, resume_rows: int = 0, append: bool = False):
+        self.path = path
+        self.part_path = path + PART_SUFFIX
+        self.fieldnames = fieldnames
+        self.fmt = fmt or stream_format_for(path) or "csv"
+        if self.fmt not in ("csv", "jsonl"):
+            raise ValueError(f"StreamingWriter cannot write {self.fmt!r}; use open_stream_writer()")
+        self.count = 0
+        self.urls: List[str] = []  # Written URLs only (small), e.g. to refresh a URL index
+        self.appending = False
+        self.base_offset = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+        encoding = "utf-8-sig" if self.fmt == "csv" else "utf-8"
+        newline = "" if self.fmt == "csv" else None
+        if append and resume_offset is None and os.path.exists(path) and os.path.getsize(path) > 0:
+            if self.fmt == "csv":
+                self.fieldnames = existing_columns(path, read_csv_header(path), fieldnames)
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                missing_newline = f.read(1) not in (b"\n", b"\r")
+            self.appending = True
+            self.part_path = path
+            self._file = open(path, "a", encoding=encoding, newline=newline)
+            if missing_newline:
+                self._file.write(os.linesep if self.fmt == "csv" else "\n")
+            self._file.flush()
+            self.base_offset = self._file.tell()
+            resume_offset = self.base_offset  # Same as a resume from here on: no header
+        elif resume_offset is not None:
+            if append and not os.path.exists(self.part_path) and os.path.exists(path):
+                # Resumed append: the rows are being added to ``path`` itself
+                self.appending = True
+                self.part_path = path
+                self.base_offset = resume_offset
+            elif not os.path.exists(self.part_path):
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"Nothing to resume: {self.part_path} / {path} not found")
+                os.replace(path, self.part_path)
+            if self.fmt == "csv" and resume_offset > 0:
+                self.fieldnames = existing_columns(path, read_csv_header(self.part_path), fieldnames)
+            with open(self.part_path, "r+b") as f:
+                f.truncate(resume_offset)
+            self.count = resume_rows
+            # Appending at a non-zero position: utf-8-sig does not write a second BOM
+            self._file = open(self.part_path, "a", encoding=encoding, newline=newline)
+        else:
+            self._file = open(self.part_path, "w", encoding=encoding, newline=newline)
+
+        if self.fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=self.fieldnames, lineterminator=os.linesep, extrasaction="ignore")
+            if resume_offset is None or resume_offset == 0:
+                self._csv.writeheader()
+        self._file.flush()
+
+    @property
+    def offset(self) -> int:
+        """Bytes written so far; everything up to here is flushed to the OS."""
+        return self._file.tell()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        """Appends one article and flushes it to the OS."""
+        if self.fmt == "csv":
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps({k: row.get(k) for k in self.fieldnames}, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.count += 1
+        if row.get("URL"):
+            self.urls.append(row["URL"])
+        if self.count % FSYNC_EVERY == 0:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> str:
+        """Finalizes the output: fsync, then atomically replace ``path``. Returns ``path``."""
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            if not self.appending:
+                os.replace(self.part_path, self.path)
+        return self.path
+
+    def discard(self) -> None:
+        """Drops the partial file without touching ``path`` (e.g. nothing was scraped)."""
+        if not self._file.closed:
+            self._file.close()
+        if self.appending:
+            with open(self.path, "r+b") as f:
+                f.truncate(self.base_offset)
+        elif os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+    def __enter__(self) -> "StreamingWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        # Finalize on success, STOP and errors alike: partial results are still results
+        if self.count:
+            self.close()
+        else:
+            self.discard()
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow)") from None
+    return pq
+
+
+def parquet_parts(path: str) -> List[str]:
+    """
+    Data files of a Parquet export: ``path`` itself, or the part files of a dataset directory in append order.
+
+    Hidden (``.``) and ``_`` names are skipped, like pyarrow's dataset
+    discovery does, so a part still being written is never read.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path))
+            if name.endswith(".parquet") and not name.startswith((".", "_"))]
+
+
+def parquet_dataset(path: str, columns: Optional[List[str]] = None) -> Any:
+    """
+    Opens a Parquet export (single file or dataset directory) as one ``pyarrow.dataset.Dataset``.
+
+    Part files appended by different versions may have different columns:
+    the schema is the union of the parts' schemas (only their footers are
+    read) and rows of a part lacking a column read as null. ``columns``
+    adds columns to the schema that no part has yet (all null).
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    pq = _import_pyarrow()
+    parts = parquet_parts(path)
+    schema = pa.unify_schemas([pq.read_schema(part) for part in parts]) if parts else pa.schema([])
+    for name in columns or ():
+        if name not in schema.names:
+            schema = schema.append(pa.field(name, pa.string()))
+    return ds.dataset(parts, schema=schema, format="parquet")
+
+
+class ParquetStreamWriter:
+    """
+    Writes article rows to a Parquet file one row group at a time.
+
+    Same interface as :class:`StreamingWriter`: rows go to ``<path>.part``,
+    which :meth:`close` renames to ``path``. Rows are buffered until
+    ``row_group_size`` of them are collected, so a killed process loses at most
+    one row group, and the file only becomes readable once it is closed (the
+    Parquet footer is written last). Every column is stored as a nullable
+    UTF-8 string, so readers can load just the columns they need.
+
+    With ``append`` the new rows become a new part file of a Parquet dataset
+    directory at ``path`` (``part-00001.parquet``, ...); existing rows are
+    neither read nor rewritten. A single-file export is turned into a
+    dataset by moving it into the directory as its first part (a rename, not
+    a copy). Read the export with :func:`parquet_dataset`, which also
+    merges the columns of parts written by different versions.
+    """
+
+    resumable = False  # Row groups have no stable byte offset to journal
+
+    def __init__(self, path: str, fieldnames: List[str], compression: str = DEFAULT_PARQUET_COMPRESSION,
+                 row_group_size: int = DEFAULT_ROW_GROUP_SIZE, append: bool = False):
+        pq = _import_pyarrow()
+        import pyarrow as pa
+
+        if compression not in PARQUET_COMPRESSIONS:
+            raise ValueError(f"unknown Parquet compression {compression!r} (choose from: {', '.join(PARQUET_COMPRESSIONS)})")
+        self.path = path
+        self.part_path = path + PART_SUFFIX
+        self.fieldnames = fieldnames
+        self.fmt = "parquet"
+        self.row_group_size = max(1, int(row_group_size))
+        self.count = 0
+        self.appending = False
+        self.urls: List[str] = []
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+        if append and os.path.exists(path):
+            existing = parquet_dataset(path).schema.names
+            if not any(name in existing for name in fieldnames):
+                raise ValueError(f"Cannot append to {path}: none of the columns {', '.join(fieldnames)} found")
+            self.appending = True
+        self._schema = pa.schema([(name, pa.string()) for name in fieldnames])
+        self._columns: Dict[str, List[Optional[str]]] = {name: [] for name in fieldnames}
+        self._writer = pq.ParquetWriter(self.part_path, self._schema, compression=None if compression == "none" else compression)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        """Buffers one article; a row group is written every ``row_group_size`` rows."""
+        for name in self.fieldnames:
+            value = row.get(name)
+            # None and pandas' NaN (missing values) become nulls
+            self._columns[name].append(None if value is None or value != value else str(value))
+        self.count += 1
+        if row.get("URL"):
+            self.urls.append(row["URL"])
+        if len(self._columns[self.fieldnames[0]]) >= self.row_group_size:
+            self._flush_row_group()
+
+    def _flush_row_group(self) -> None:
+        import pyarrow as pa
+
+        if not self._columns[self.fieldnames[0]]:
+            return
+        self._writer.write_table(pa.table(self._columns, schema=self._schema), row_group_size=self.row_group_size)
+        self._columns = {name: [] for name in self.fieldnames}
+
+    def _next_part(self) -> str:
+        """Path of the next part file of the dataset at ``path``; a single file becomes its first part."""
+        if not os.path.isdir(self.path):
+            staging = self.path + ".dataset" + PART_SUFFIX
+            os.makedirs(staging, exist_ok=True)
+            os.replace(self.path, os.path.join(staging, "part-00000.parquet"))
+            os.replace(staging, self.path)
+        numbers = [int(name[5:10]) for name in os.listdir(self.path)
+                   if name.startswith("part-") and name[5:10].isdigit()]
+        return os.path.join(self.path, f"part-{max(numbers, default=-1) + 1:05d}.parquet")
+
+    def close(self) -> str:
+        """Writes the last row group and the footer, then atomically moves the file into place. Returns ``path``."""
+        if self._writer is not None:
+            self._flush_row_group()
+            self._writer.close()
+            self._writer = None
+            if self.appending:
+                os.replace(self.part_path, self._next_part())
+            elif os.path.isdir(self.path):
+                # Overwriting a dataset directory: swap it out, then delete the old parts
+                old = self.path + ".old"
+                os.replace(self.path, old)
+                os.replace(self.part_path, self.path)
+                shutil.rmtree(old)
+            else:
+                os.replace(self.part_path, self.path)
+        return self.path
+
+    def discard(self) -> None:
+        """Drops the partial file without touching ``path``."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+    def __enter__(self) -> "ParquetStreamWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self.count:
+            self.close()
+        else:
+            self.discard()
+
+
+def write_parquet(rows: Iterable[Dict[str, Any]], path: str, fieldnames: List[str], compression: str = DEFAULT_PARQUET_COMPRESSION,
+                  row_group_size: int = DEFAULT_ROW_GROUP_SIZE, append: bool = False) -> int:
+    """Writes ``rows`` (e.g. ``df.to_dict("records")``) to a Parquet file in one go. Returns the number of rows written."""
+    with ParquetStreamWriter(path, fieldnames, compression=compression, row_group_size=row_group_size, append=append) as writer:
+        for row in rows:
+            writer.write(row)
+    return writer.count
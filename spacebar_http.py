@@ -0,0 +1,141 @@
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+from spacebar_archive import WarcWriter
+from spacebar_cache import HttpCache, CachingAdapter
+
+# --- Constants & Configuration ---
+DEFAULT_POOL_SIZE = 10   # Keep-alive connections per host (requests' own default)
+# Requests are retried by RateLimiter.get (``retries``), not by urllib3: every retry then waits for
+# the host's budget and the stop event, and 429/503 are left to the limiter's Retry-After handling
+RETRY_ROUNDS = 3         # Passes over the articles that still failed after those retries
+RETRY_DELAY = 5.0        # Seconds before the first pass; doubled for every further pass
+# gzip and deflate always; br and zstd when brotli / zstandard are installed to decode them
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+T = TypeVar("T")
+
+
+def make_session(pool_size: int = DEFAULT_POOL_SIZE, headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[HttpCache] = None, archive: Optional[WarcWriter] = None) -> requests.Session:
+    """
+    Creates a keep-alive session with the shared transport settings.
+
+    The adapters make no retries of their own; pass ``retries`` to
+    :meth:`spacebar_ratelimit.RateLimiter.get` instead.
+
+    Args:
+        pool_size: Connections kept open per host; one per thread that uses the session.
+        headers: Default headers (e.g. the User-Agent) on top of :data:`ACCEPT_ENCODING`.
+        cache: Optional on-disk HTTP cache (mounts a :class:`CachingAdapter`).
+        archive: Optional WARC writer; its response hook archives every page.
+    """
+    session = requests.Session()
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    if headers:
+        session.headers.update(headers)
+    pool_size = max(1, int(pool_size))
+    if cache is not None:
+        adapter: HTTPAdapter = CachingAdapter(cache, pool_connections=1, pool_maxsize=pool_size)
+    else:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if archive is not None:
+        session.hooks["response"].append(archive.hook)
+    return session
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for failures worth retrying later: connection errors, timeouts, 429 and 5xx (not 404 and friends)."""
+    if isinstance(exc, requests.HTTPError):
+        resp = exc.response
+        return resp is None or resp.status_code == 429 or resp.status_code >= 500
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout,
+                            requests.exceptions.ChunkedEncodingError, requests.exceptions.RetryError))
+
+
+class FailedArticle(NamedTuple):
+    url: str
+    headline: Optional[str]
+    error: str      # Last error
+    attempts: int
+
+
+class RetryQueue:
+    """
+    Articles whose download failed even after the per-request retries.
+
+    Failures are collected while the listing pages are walked and fetched
+    again by :meth:`drain` once the walk is done, when a short outage or a
+    burst of 5xx is usually over. Thread-safe.
+    """
+
+    def __init__(self, rounds: int = RETRY_ROUNDS, delay: float = RETRY_DELAY):
+        self.rounds = max(0, int(rounds))
+        self.delay = delay
+        self.recovered = 0
+        self.lost: List[FailedArticle] = []  # Still failing after the last round (or stopped)
+        self._items: Dict[str, FailedArticle] = {}
+        self._lock = threading.Lock()
+
+    def add(self, url: str, headline: Optional[str], error: BaseException, attempts: int = 1) -> None:
+        with self._lock:
+            self._items[url] = FailedArticle(url, headline, str(error), attempts)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def _take(self) -> List[FailedArticle]:
+        with self._lock:
+            items = list(self._items.values())
+            self._items.clear()
+            return items
+
+    def drain(self, fetch: Callable[[str, Optional[str]], T],
+              stop_event: Optional[threading.Event] = None) -> Iterator[Tuple[str, Optional[str], T]]:
+        """
+        Fetches the queued articles again, in up to ``rounds`` passes.
+
+        Waits ``delay`` seconds before the first pass and twice as long before
+        each further one. ``fetch(url, headline)`` raises on failure; transient
+        failures go back into the queue for the next pass, anything else (and
+        whatever is left after the last pass or when ``stop_event`` is set)
+        ends up in :attr:`lost`.
+
+        Yields:
+            ``(url, headline, result)`` for every article that was fetched.
+        """
+        for attempt in range(self.rounds):
+            if not len(self):
+                return
+            wait = self.delay * 2 ** attempt
+            if stop_event is None:
+                time.sleep(wait)
+            elif stop_event.wait(wait):
+                break
+            for item in self._take():
+                if stop_event is not None and stop_event.is_set():
+                    self.lost.append(item)
+                    continue
+                try:
+                    result = fetch(item.url, item.headline)
+                except Exception as e:
+                    if is_transient(e):
+                        self.add(item.url, item.headline, e, item.attempts + 1)
+                    else:
+                        self.lost.append(item._replace(error=str(e), attempts=item.attempts + 1))
+                    continue
+                self.recovered += 1
+                yield item.url, item.headline, result
+        self.abandon()
+
+    def abandon(self) -> None:
+        """Gives up on the queued articles (moves them to :attr:`lost`), e.g. when the site is down."""
+        self.lost.extend(self._take())
@@ -0,0 +1,75 @@
+import queue
+import time
+from collections import deque
+from typing import Any, Callable, Deque
+
+# --- Constants & Configuration ---
+DEFAULT_MAX_LINES = 2000   # Lines kept in the log widget; older ones are dropped
+DRAIN_BUDGET = 0.03        # Seconds of queue handling per UI tick, so input and redraws stay responsive
+POLL_INTERVAL = 100        # ms between UI ticks when the queue is idle
+BUSY_POLL_INTERVAL = 10    # ms to the next tick when messages were left in the queue
+
+
+def drain_queue(msg_queue: "queue.Queue[Any]", handle: Callable[[Any], None], budget: float = DRAIN_BUDGET) -> bool:
+    """
+    Hands queued messages to ``handle`` for at most ``budget`` seconds.
+
+    Call it from the Tk thread (``root.after``); worker threads only ever put
+    messages on the queue, so they never wait on the UI.
+
+    Returns:
+        True when messages are left for the next tick.
+    """
+    deadline = time.monotonic() + budget
+    while True:
+        try:
+            item = msg_queue.get_nowait()
+        except queue.Empty:
+            return False
+        handle(item)
+        if time.monotonic() >= deadline:
+            return not msg_queue.empty()
+
+
+class LogView:
+    """
+    Batched, bounded log rendering for a Tk ``Text``/``ScrolledText`` widget.
+
+    :meth:`add` only appends to a ring buffer of at most ``max_lines`` lines;
+    :meth:`flush` renders everything added since the last flush with a single
+    insert, scrolls once and trims the widget back to ``max_lines``. Both must
+    be called on the Tk thread, typically once per queue drain.
+    """
+
+    def __init__(self, widget: Any, max_lines: int = DEFAULT_MAX_LINES):
+        self.widget = widget
+        self.max_lines = max(1, int(max_lines))
+        self._pending: Deque[str] = deque(maxlen=self.max_lines)
+        self._shown = 0  # Lines currently in the widget
+
+    def add(self, line: str) -> None:
+        self._pending.append(line)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        lines = list(self._pending)
+        self._pending.clear()
+
+        widget = self.widget
+        widget.config(state="normal")
+        widget.insert("end", "\n".join(lines) + "\n")
+        self._shown += len(lines)
+        excess = self._shown - self.max_lines
+        if excess > 0:
+            widget.delete("1.0", f"{excess + 1}.0")
+            self._shown = self.max_lines
+        widget.see("end")
+        widget.config(state="disabled")
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._shown = 0
+        self.widget.config(state="normal")
+        self.widget.delete("1.0", "end")
+        self.widget.config(state="disabled")
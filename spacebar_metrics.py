@@ -0,0 +1,199 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# --- Constants & Configuration ---
+# Phases of one article: wait (rate limiter), download, decode, parse, write. "parse" covers parsing and
+# extraction together: scan_article reads title/date/content off the parser events in a single pass,
+# so there is no separate extract step to time. Listing pages are timed as a whole ("listing").
+PHASES = ["wait", "download", "decode", "parse", "write", "listing"]
+# Upper bounds (seconds) of the Prometheus histogram buckets
+BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+DEFAULT_METRICS_PORT = 9464
+METRICS_PREFIX = "spacebar"
+
+
+class _Phase:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)  # Non-cumulative; summed up when rendered
+
+
+class CrawlMetrics:
+    """
+    Thread-safe counters and phase timings of a scraper.
+
+    Values only grow for the lifetime of the object (Prometheus counter
+    semantics); :meth:`snapshot` returns a plain-dict copy that is safe to put
+    on the message queue, and :meth:`render_prometheus` the text exposition
+    format served by :class:`MetricsServer`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._phases: Dict[str, _Phase] = {name: _Phase() for name in PHASES}
+        self._requests: Dict[str, int] = {"article": 0, "listing": 0, "discovery": 0}
+        self._cache: Dict[str, int] = {"hit": 0, "revalidated": 0, "miss": 0}
+        self._errors: Dict[str, int] = {}
+        self.bytes = 0
+        self.retries = 0
+        self.articles = 0
+
+    def observe(self, phase: str, seconds: float) -> None:
+        """Records one duration of ``phase``."""
+        with self._lock:
+            stats = self._phases[phase]
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+
+    def observe_phases(self, timings: Dict[str, float]) -> None:
+        for phase, seconds in timings.items():
+            self.observe(phase, seconds)
+
+    def response(self, kind: str, resp: Any, size: Optional[int] = None) -> None:
+        """Counts a response: its body size (``size`` for streamed bodies), cache status and the retries made for it (``resp.retries``)."""
+        retries = getattr(resp, "retries", 0)
+        with self._lock:
+            self._requests[kind] = self._requests.get(kind, 0) + 1
+            self.bytes += len(resp.content or b"") if size is None else size
+            self.retries += retries
+            status = getattr(resp, "cache_status", None)
+            if status in self._cache:
+                self._cache[status] += 1
+
+    def error(self, exc: BaseException) -> None:
+        """Counts an error by exception type (``HTTPError`` by status: ``HTTP 503``)."""
+        resp = getattr(exc, "response", None)
+        kind = f"HTTP {resp.status_code}" if resp is not None and getattr(resp, "status_code", None) else type(exc).__name__
+        with self._lock:
+            self._errors[kind] = self._errors.get(kind, 0) + 1
+
+    def article_saved(self) -> None:
+        with self._lock:
+            self.articles += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of every value; phase times are in seconds (``avg`` per observation)."""
+        with self._lock:
+            return {
+                "uptime": time.time() - self.started,
+                "articles": self.articles,
+                "bytes": self.bytes,
+                "retries": self.retries,
+                "requests": dict(self._requests),
+                "cache": dict(self._cache),
+                "errors": dict(self._errors),
+                "phases": {
+                    name: {"count": p.count, "total": p.total, "avg": p.total / p.count if p.count else 0.0, "max": p.max}
+                    for name, p in self._phases.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format (version 0.0.4)."""
+        p = METRICS_PREFIX
+        with self._lock:
+            lines: List[str] = [
+                f"# HELP {p}_articles_total Articles saved.",
+                f"# TYPE {p}_articles_total counter",
+                f"{p}_articles_total {self.articles}",
+                f"# HELP {p}_downloaded_bytes_total Response body bytes (cache hits included).",
+                f"# TYPE {p}_downloaded_bytes_total counter",
+                f"{p}_downloaded_bytes_total {self.bytes}",
+                f"# HELP {p}_retries_total Requests retried after a connection error or 5xx.",
+                f"# TYPE {p}_retries_total counter",
+                f"{p}_retries_total {self.retries}",
+                f"# HELP {p}_requests_total Responses received, by page kind.",
+                f"# TYPE {p}_requests_total counter",
+            ]
+            lines += [f'{p}_requests_total{{kind="{k}"}} {v}' for k, v in sorted(self._requests.items())]
+            lines += [f"# HELP {p}_cache_responses_total Responses by HTTP cache outcome.", f"# TYPE {p}_cache_responses_total counter"]
+            lines += [f'{p}_cache_responses_total{{result="{k}"}} {v}' for k, v in sorted(self._cache.items())]
+            lines += [f"# HELP {p}_errors_total Failed requests and pages, by error type.", f"# TYPE {p}_errors_total counter"]
+            lines += [f'{p}_errors_total{{type="{_escape(k)}"}} {v}' for k, v in sorted(self._errors.items())]
+            lines += [f"# HELP {p}_phase_seconds Time spent per crawl phase.", f"# TYPE {p}_phase_seconds histogram"]
+            for name, stats in self._phases.items():
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(f'{p}_phase_seconds_bucket{{phase="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{p}_phase_seconds_bucket{{phase="{name}",le="+Inf"}} {stats.count}')
+                lines.append(f'{p}_phase_seconds_sum{{phase="{name}"}} {stats.total:.6f}')
+                lines.append(f'{p}_phase_seconds_count{{phase="{name}"}} {stats.count}')
+            lines += [f"# HELP {p}_uptime_seconds Seconds since the scraper started.", f"# TYPE {p}_uptime_seconds gauge",
+                      f"{p}_uptime_seconds {time.time() - self.started:.3f}"]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def summarize(snapshot: Dict[str, Any]) -> str:
+    """One-line human readable summary of a :meth:`CrawlMetrics.snapshot` (GUI status / logs)."""
+    phases = snapshot["phases"]
+    ms = " ".join(f"{name} {phases[name]['avg'] * 1000:.0f}" for name in ("wait", "download", "parse", "write") if phases[name]["count"])
+    rate = snapshot["articles"] / snapshot["uptime"] if snapshot["uptime"] else 0.0
+    cache = snapshot["cache"]
+    errors = sum(snapshot["errors"].values())
+    return (f"{snapshot['articles']} articles ({rate:.1f}/s) | avg ms: {ms or '-'} | "
+            f"{snapshot['bytes'] / 1e6:.1f} MB | retries {snapshot['retries']} | "
+            f"cache {cache['hit'] + cache['revalidated']}/{sum(cache.values())} | errors {errors}")
+
+
+class MetricsServer:
+    """
+    Serves ``GET /metrics`` of a :class:`CrawlMetrics` on a background thread.
+
+    Meant for long-running headless crawls; bind to localhost unless the
+    scraper runs in a container whose port is only reachable by Prometheus.
+    """
+
+    def __init__(self, metrics: CrawlMetrics, host: str = "127.0.0.1", port: int = DEFAULT_METRICS_PORT):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MetricsServer":
+        return self.start()
+
+    def __exit__(self, *exc: Optional[Any]) -> None:
+        self.close()
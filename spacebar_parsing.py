@@ -0,0 +1,287 @@
+import time
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+try:
+    from lxml import etree
+except ImportError:  # scan_article falls back to html.parser
+    etree = None
+
+# --- Constants & Configuration ---
+TITLE_CLASS = "article-title"
+DATE_CLASS = "text-gray-400 text-subheadsm mb-4 md:mb-0"
+CONTENT_CLASS = "payload-richtext"
+
+# Fastest first; "html.parser" ships with Python and is always available
+PARSER_PREFERENCE = ["lxml", "html.parser"]
+
+
+def available_parsers() -> List[str]:
+    """Returns the BeautifulSoup tree builders installed on this machine, fastest first."""
+    found = []
+    for name in PARSER_PREFERENCE:
+        try:
+            BeautifulSoup("", name)
+        except FeatureNotFound:
+            continue
+        found.append(name)
+    return found
+
+
+# html.parser reproduces the original extractors exactly, including on broken
+# markup where lxml repairs the tree differently; lxml is opt-in (--parser / Parser combo)
+DEFAULT_PARSER = "html.parser"
+
+
+def _is_article_node(class_value: Optional[str]) -> bool:
+    """
+    Class filter of the article strainer.
+
+    Mirrors how ``find(name, class_=...)`` matches: a single class token, or
+    the whole attribute string for the multi-class date selector.
+    """
+    if not class_value:
+        return False
+    tokens = class_value.split()
+    return TITLE_CLASS in tokens or CONTENT_CLASS in tokens or class_value == DATE_CLASS
+
+
+# Only the title <h1>, the date <p> and the rich-text <div> (with their
+# subtrees) are built; navigation, scripts, related articles etc. are skipped.
+ARTICLE_STRAINER = SoupStrainer(["h1", "p", "div"], attrs={"class": _is_article_node})
+
+
+def make_soup(markup: str, parser: Optional[str] = None, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Builds a BeautifulSoup tree with the configured backend (``DEFAULT_PARSER`` if None)."""
+    return BeautifulSoup(markup, parser or DEFAULT_PARSER, parse_only=parse_only)
+
+
+def parse_listing_page(markup: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parses a category listing page.
+
+    The whole document is built: skipping the daily highlights block needs
+    the ancestors of its ``<h2>``, which a strainer would drop.
+    """
+    return make_soup(markup, parser)
+
+
+def parse_article_page(markup: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parses an article page, building only the nodes the extractors read.
+
+    ``find("h1", class_="article-title")``, the date ``<p>`` and
+    ``find("div", class_="payload-richtext")`` return the same elements on
+    this tree as on the full document.
+    """
+    return make_soup(markup, parser, parse_only=ARTICLE_STRAINER)
+
+
+# Rich-text blocks that make up the article body, in document order
+CONTENT_TAGS = ["p", "li", "blockquote", "h2", "h3"]
+# Blocks read by spacebar_scraper.py and scrape_news (joined with "\n", text pieces with " ")
+LEGACY_CONTENT_TAGS = ["p", "li", "blockquote"]
+
+# Strings BeautifulSoup's get_text() leaves out (Script / Stylesheet / TemplateString)
+_HIDDEN_TEXT_TAGS = {"script", "style", "template"}
+# Elements without an end tag; html.parser does not know them
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+
+
+class _ArticleScanner:
+    """
+    Event handler that collects the title, the date and the rich-text blocks in one pass.
+
+    Implements the lxml parser-target interface (``start``/``end``/``data``/
+    ``comment``/``close``); :class:`_HTMLParserAdapter` drives it from the
+    standard library parser. Text is buffered between tag events and stripped
+    per string, exactly like ``get_text(strip=True)`` on the tree the same
+    backend would build, so no DOM is needed.
+    """
+
+    def __init__(self, content_tags: Iterable[str], separator: str):
+        self.content_tags = set(content_tags)
+        self.separator = separator
+        self.title: Optional[str] = None
+        self.date: Optional[str] = None
+        self.blocks: Optional[List[str]] = None  # None until the rich-text <div> is found
+        self._stack: List[str] = []
+        self._captures: List[Tuple[int, str, List[str]]] = []  # (depth, kind, text pieces), innermost last
+        self._in_content = 0  # Depth of the open rich-text <div>, 0 when outside
+        self._hidden = 0      # Open <script>/<style>/<template> elements
+        self._buffer: List[str] = []
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        text = "".join(self._buffer).strip()
+        self._buffer = []
+        if text and not self._hidden:
+            for _, _, pieces in self._captures:
+                pieces.append(text)
+
+    def start(self, tag: str, attrib: Dict[str, str], nsmap: Optional[Dict[str, str]] = None) -> None:
+        self._flush()
+        self._stack.append(tag)
+        depth = len(self._stack)
+        if tag in _HIDDEN_TEXT_TAGS:
+            self._hidden += 1
+        class_value = attrib.get("class") or ""
+        tokens = class_value.split()
+        if tag == "h1" and self.title is None and (TITLE_CLASS in tokens or class_value == TITLE_CLASS):
+            self.title = ""
+            self._captures.append((depth, "title", []))
+        elif tag == "p" and self.date is None and class_value == DATE_CLASS:
+            self.date = ""
+            self._captures.append((depth, "date", []))
+        elif tag == "div" and self.blocks is None and CONTENT_CLASS in tokens:
+            self.blocks = []
+            self._in_content = depth
+        # A block may also be the date <p>; both get the same text
+        if self._in_content and depth > self._in_content and tag in self.content_tags:
+            self._captures.append((depth, f"block{len(self.blocks)}", []))
+            self.blocks.append("")
+
+    def end(self, tag: str) -> None:
+        self._flush()
+        if tag not in self._stack:
+            return  # Stray end tag
+        while self._stack:
+            depth = len(self._stack)
+            name = self._stack.pop()
+            while self._captures and self._captures[-1][0] == depth:
+                _, kind, pieces = self._captures.pop()
+                if kind == "title":
+                    self.title = "".join(pieces)
+                elif kind == "date":
+                    self.date = "".join(pieces)
+                else:
+                    self.blocks[int(kind[5:])] = self.separator.join(pieces)
+            if depth == self._in_content:
+                self._in_content = 0
+            if name in _HIDDEN_TEXT_TAGS:
+                self._hidden -= 1
+            if name == tag:
+                return
+
+    def data(self, text: str) -> None:
+        self._buffer.append(text)
+
+    def comment(self, text: str) -> None:
+        self._flush()  # A comment ends the string before it
+
+    def close(self) -> None:
+        while self._stack:
+            self.end(self._stack[-1])  # Unclosed elements end with the document
+
+
+class _HTMLParserAdapter(HTMLParser):
+    """Feeds :class:`_ArticleScanner` from ``html.parser``, the way BeautifulSoup's html.parser builder nests tags."""
+
+    def __init__(self, scanner: _ArticleScanner):
+        super().__init__(convert_charrefs=True)
+        self.scanner = scanner
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attrib: Dict[str, str] = {}
+        for name, value in attrs:
+            attrib.setdefault(name, value or "")  # The first of duplicated attributes wins
+        self.scanner.start(tag, attrib)
+        if tag in _VOID_TAGS:
+            self.scanner.end(tag)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.scanner.end(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in _VOID_TAGS:
+            self.scanner.end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self.scanner.data(data)
+
+    def handle_comment(self, data: str) -> None:
+        self.scanner.comment(data)
+
+
+def scan_article(markup: str, parser: Optional[str] = None, content_tags: Iterable[str] = CONTENT_TAGS,
+                 separator: str = "") -> Tuple[Optional[str], Optional[str], Optional[List[str]]]:
+    """
+    Extracts the title, date and rich-text blocks of an article page in a single streaming pass.
+
+    Gives the same strings as running ``find``/``find_all(content_tags)`` and
+    ``get_text(separator, strip=True)`` on :func:`parse_article_page` with the
+    same backend (lxml parser events, or ``html.parser``), without building a tree.
+
+    Returns:
+        ``(title, date, blocks)``: None for a missing title/date, ``blocks``
+        None when the page has no rich-text ``<div>``, otherwise one string
+        per block in document order (empty blocks included).
+    """
+    scanner = _ArticleScanner(content_tags, separator)
+    if (parser or DEFAULT_PARSER) == "lxml" and etree is not None:
+        lxml_parser = etree.HTMLParser(target=scanner)
+        lxml_parser.feed(markup)
+        lxml_parser.close()
+    else:
+        adapter = _HTMLParserAdapter(scanner)
+        adapter.feed(markup)
+        adapter.close()
+        scanner.close()
+    return scanner.title, scanner.date, scanner.blocks
+
+
+def extract_article(markup: bytes, parser: Optional[str] = None) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    Extracts ``(title, date, content)`` from the raw bytes of an article page.
+
+    A module-level function on plain bytes so it can run in a
+    ``ProcessPoolExecutor``: only the raw page goes to the worker process and
+    only these three strings come back. ``title`` and ``date`` are None when
+    the page lacks them; ``content`` joins the non-empty rich-text blocks with
+    blank lines. Uses the single-pass :func:`scan_article`.
+    """
+    return extract_article_timed(markup, parser)[0]
+
+
+def extract_article_dom(markup: str, parser: Optional[str] = None, content_tags: Iterable[str] = CONTENT_TAGS,
+                        separator: str = "") -> Tuple[Optional[str], Optional[str], Optional[List[str]]]:
+    """
+    Reference DOM implementation of :func:`scan_article` (same arguments and result).
+
+    Builds the strained tree and queries it with ``find``/``find_all``; kept to
+    check the streaming extractor against (``tests/test_parsing.py``,
+    ``benchmarks/bench_extract.py``).
+    """
+    soup = parse_article_page(markup, parser)
+    title_tag = soup.find("h1", class_=TITLE_CLASS)
+    date_tag = soup.find("p", class_=DATE_CLASS)
+    content_div = soup.find("div", class_=CONTENT_CLASS)
+    return (
+        title_tag.get_text(strip=True) if title_tag else None,
+        date_tag.get_text(strip=True) if date_tag else None,
+        [tag.get_text(separator=separator, strip=True) for tag in content_div.find_all(list(content_tags))] if content_div else None,
+    )
+
+
+def extract_article_timed(markup: bytes, parser: Optional[str] = None) -> Tuple[Tuple[Optional[str], Optional[str], str], Dict[str, float]]:
+    """
+    :func:`extract_article` that also returns how long each step took.
+
+    Returns:
+        ``((title, date, content), {"decode": s, "parse": s})``, where
+        ``parse`` is the single :func:`scan_article` pass that parses and
+        extracts at once (joining the blocks included). Picklable both ways,
+        so the timings survive a process pool too.
+    """
+    t0 = time.perf_counter()
+    # Same decoding as ``resp.encoding = "utf-8"; resp.text``
+    page = markup.decode("utf-8", errors="replace")
+    t1 = time.perf_counter()
+    title, date, blocks = scan_article(page, parser)
+    fields = (title, date, "\n\n".join(block for block in blocks or () if block))
+    return fields, {"decode": t1 - t0, "parse": time.perf_counter() - t1}
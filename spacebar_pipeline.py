@@ -0,0 +1,332 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Tuple, Union
+
+# --- Constants & Configuration ---
+DEFAULT_PREFETCH_PAGES = 2  # Listing pages fetched ahead of article downloads
+DEFAULT_PAGE_RETRIES = 2    # Extra attempts of a listing page that failed
+DEFAULT_ERROR_DELAY = 2.0   # Seconds before the first extra attempt; doubled for each further one
+# Consecutive failed listing pages that open the circuit breaker. Each failed page has been requested
+# 1 + DEFAULT_PAGE_RETRIES times (listing fetches are not retried again by the rate limiter), so a trip
+# takes 9 requests and about 18 s of backoff: long enough to ride out a blip, short enough to stop an outage
+DEFAULT_TRIP_AFTER = 3
+MAX_RECOVER_AFTER = 600.0   # Longest wait between half-open probes of a tripped breaker
+
+# (page number, parsed listing or None, error or None)
+ListingResult = Tuple[int, Any, Optional[Exception]]
+
+
+class _Trip(NamedTuple):
+    """Marker sent after the failed page that opened the breaker, so the trip is reported in order."""
+    page: int
+    probe_in: Optional[float]  # Seconds until the probe; None when the walk ends
+
+
+def wait_or_cancel(seconds: float, cancelled: Callable[[], bool]) -> bool:
+    """Sleeps ``seconds`` in short slices; False as soon as ``cancelled()`` is True."""
+    deadline = time.monotonic() + seconds
+    while not cancelled():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return True
+        time.sleep(min(remaining, 0.1))
+    return False
+
+
+def fetch_with_retries(fetch: Callable[[], Any], retries: int = DEFAULT_PAGE_RETRIES, delay: float = DEFAULT_ERROR_DELAY,
+                       should_retry: Optional[Callable[[Exception], bool]] = None,
+                       cancelled: Callable[[], bool] = lambda: False) -> Any:
+    """
+    Calls ``fetch()`` up to ``1 + retries`` times, waiting ``delay``, ``2 * delay``, ...
+    seconds between attempts. Errors rejected by ``should_retry`` (e.g. a 404)
+    and the last error are raised; so is the pending error once ``cancelled()``.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fetch()
+        except Exception as e:
+            if attempt >= retries or (should_retry is not None and not should_retry(e)):
+                raise
+            if not wait_or_cancel(delay * 2 ** attempt, cancelled):
+                raise
+        attempt += 1
+
+
+class CircuitBreaker:
+    """
+    Ends a listing walk once the site keeps failing, instead of requesting page after page in vain.
+
+    The breaker is *closed* while pages load. ``trip_after`` consecutive
+    failed pages open it; a page only counts as failed once its own retries
+    (``ListingPrefetcher.retries``) are used up. An open breaker ends the walk, unless
+    ``recover_after`` is set (long-running "watch" crawls). In that case the
+    walk waits that long and lets one probe request through (*half-open*). A
+    successful probe closes the breaker and the walk resumes from the first
+    page that failed. A failed probe opens it again for twice as long, up to
+    :data:`MAX_RECOVER_AFTER`.
+
+    Not thread-safe: each walk has its own breaker.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, trip_after: int = DEFAULT_TRIP_AFTER, recover_after: float = 0.0):
+        self.trip_after = max(1, int(trip_after))
+        self.recover_after = max(0.0, recover_after)
+        self.state = self.CLOSED
+        self.failures = 0  # Consecutive failed pages
+        self.trips = 0     # Times the breaker opened from closed
+        self._cooldown = self.recover_after
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._cooldown = self.recover_after
+
+    def record_failure(self) -> bool:
+        """Counts a failed page; True when the breaker is (now) open."""
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+            self._cooldown = min(self._cooldown * 2, max(MAX_RECOVER_AFTER, self.recover_after))
+        elif self.state == self.CLOSED and self.failures >= self.trip_after:
+            self.state = self.OPEN
+            self.trips += 1
+        return self.state == self.OPEN
+
+    def next_probe(self) -> Optional[float]:
+        """Seconds to wait before the half-open probe, or None when the walk should end."""
+        return self._cooldown if self.recover_after else None
+
+    def half_open(self) -> None:
+        """Lets the next request through as a probe."""
+        self.state = self.HALF_OPEN
+
+
+class ListingPrefetcher:
+    """
+    Walks the listing pages of a category ahead of the article fetcher.
+
+    A background thread calls ``fetch_page(page)`` for ``start_page``,
+    ``start_page + 1``, ... and hands the parsed results to the consumer through
+    a bounded queue, so at most ``lookahead`` pages are waiting at any time.
+    While the consumer is busy downloading the articles of page N, pages
+    N+1..N+lookahead are already being fetched and parsed.
+
+    With ``lookahead <= 0`` no thread is started and pages are fetched on
+    demand, which reproduces the old lockstep behaviour.
+
+    A failed page is attempted again with backoff before its error is passed
+    on and the walk moves to the next page; a :class:`CircuitBreaker` ends the
+    walk when several pages in a row fail, so an unbounded walk
+    (``end_page=0``) does not go on forever against a site that is down.
+
+    Usage::
+
+        with ListingPrefetcher(fetch_page, 1, 0, is_last=lambda links: not links) as pages:
+            for page, links, error in pages:
+                ...
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int], Any],
+        start_page: int,
+        end_page: int,
+        lookahead: int = DEFAULT_PREFETCH_PAGES,
+        is_last: Optional[Callable[[Any], bool]] = None,
+        stop_event: Optional[threading.Event] = None,
+        error_delay: float = DEFAULT_ERROR_DELAY,
+        retries: int = DEFAULT_PAGE_RETRIES,
+        should_retry: Optional[Callable[[Exception], bool]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        on_trip: Optional[Callable[[int, Optional[float]], None]] = None,
+    ):
+        """
+        Args:
+            fetch_page: Fetches and parses one listing page. Exceptions are passed to the consumer.
+            start_page: First page number to fetch.
+            end_page: Last page number to fetch (0 for until ``is_last`` says so).
+            lookahead: Maximum number of pages fetched ahead of the consumer.
+            is_last: Returns True for a parsed page after which no further pages exist.
+            stop_event: Optional event that aborts the walk (e.g. the STOP button).
+            error_delay: Seconds before the first extra attempt of a failed page (doubled for each further one).
+            retries: Extra attempts of a failed page before its error is passed on and the walk moves on.
+            should_retry: Tells which errors are worth another attempt (default: all).
+            breaker: Ends the walk after repeated failed pages (default: a :class:`CircuitBreaker`
+                tripping after :data:`DEFAULT_TRIP_AFTER` pages); see :attr:`breaker`.
+            on_trip: Called whenever the breaker opens, with the failed page and the seconds until
+                the probe of that page (None: the walk ends). Runs on the consuming thread, once the
+                consumer has handled that failed page, so its report follows the page's own.
+        """
+        self.fetch_page = fetch_page
+        self.start_page = start_page
+        self.end_page = end_page
+        self.lookahead = lookahead
+        self.is_last = is_last or (lambda result: False)
+        self.stop_event = stop_event or threading.Event()
+        self.error_delay = error_delay
+        self.retries = max(0, int(retries))
+        self.should_retry = should_retry
+        # Open once the walk has ended because the site kept failing
+        self.breaker = breaker or CircuitBreaker()
+        self.on_trip = on_trip
+
+        self._closed = threading.Event()
+        self._queue: "queue.Queue[Union[ListingResult, _Trip, None]]" = queue.Queue(maxsize=max(1, lookahead))
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "ListingPrefetcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _cancelled(self) -> bool:
+        return self._closed.is_set() or self.stop_event.is_set()
+
+    def _walk(self) -> Iterator[Union[ListingResult, _Trip]]:
+        """Yields (page, result, error) for each listing page until the end is reached, and a :class:`_Trip` when the breaker opens."""
+        page = self.start_page
+        first_failed: Optional[int] = None  # First page of the current run of failed pages
+        while not self._cancelled():
+            if self.end_page != 0 and page > self.end_page:
+                return
+
+            try:
+                result, error = fetch_with_retries(lambda: self.fetch_page(page), self.retries, self.error_delay,
+                                                   self.should_retry, self._cancelled), None
+            except Exception as e:
+                result, error = None, e
+            if error is None:
+                self.breaker.record_success()
+                first_failed = None
+
+            yield page, result, error
+
+            if error is not None:
+                if first_failed is None:
+                    first_failed = page
+                if self.breaker.record_failure():
+                    # Tripped: end the walk, or wait and probe again from the first failed
+                    # page, so no page of the outage is skipped once the site is back
+                    delay = self.breaker.next_probe()
+                    yield _Trip(page, delay)
+                    if delay is None or not wait_or_cancel(delay, self._cancelled):
+                        return
+                    self.breaker.half_open()
+                    page = first_failed
+                    continue
+            elif self.is_last(result):
+                return
+            page += 1
+
+    def _produce(self) -> None:
+        try:
+            for item in self._walk():
+                if not self._put(item):
+                    return
+        finally:
+            self._put(None)
+
+    def _put(self, item: Union[ListingResult, _Trip, None]) -> bool:
+        """Blocks until the consumer has room, giving up if the prefetcher is closed."""
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _report_trip(self, trip: _Trip) -> None:
+        if self.on_trip:
+            self.on_trip(trip.page, trip.probe_in)
+
+    def __iter__(self) -> Iterator[ListingResult]:
+        if self.lookahead <= 0:
+            for item in self._walk():
+                if isinstance(item, _Trip):
+                    self._report_trip(item)
+                else:
+                    yield item
+            return
+
+        self._thread = threading.Thread(target=self._produce, name="listing-prefetch", daemon=True)
+        self._thread.start()
+        while True:
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._cancelled():
+                    return
+                continue
+            if item is None:
+                return
+            if isinstance(item, _Trip):
+                self._report_trip(item)
+                continue
+            yield item
+
+    def close(self) -> None:
+        """Stops fetching further pages and releases the background thread."""
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def find_first_page(reached: Callable[[int], bool], start_page: int, end_page: int = 0,
+                    on_probe: Optional[Callable[[int, bool], None]] = None) -> int:
+    """
+    Finds the first listing page for which ``reached(page)`` is True.
+
+    ``reached`` must be monotone over the pages (False ... False True ... True),
+    e.g. "this page already holds articles published on or before a date"
+    on a newest-first listing. Pages are probed at ``start_page``, then at
+    exponentially growing distances until one is reached, and the boundary is
+    then narrowed down by binary search: about ``2 * log2(n)`` probes instead
+    of walking ``n`` pages.
+
+    Args:
+        reached: Probes one page (pages past the end should count as reached).
+        start_page: First candidate page.
+        end_page: Last candidate page (0 for no limit).
+        on_probe: Called with every probed page and its result (logging).
+
+    Returns:
+        The first reached page, or ``end_page`` if none is.
+    """
+    def probe(page: int) -> bool:
+        result = reached(page)
+        if on_probe:
+            on_probe(page, result)
+        return result
+
+    if probe(start_page):
+        return start_page
+    lo, step = start_page, 1  # lo: last page known not to be reached
+    while True:
+        hi = start_page + step
+        if end_page and hi >= end_page:
+            hi = end_page
+            if hi <= lo or not probe(hi):
+                return end_page
+            break
+        if probe(hi):
+            break
+        lo, step = hi, step * 2
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if probe(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
@@ -0,0 +1,239 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+# --- Constants & Configuration ---
+DEFAULT_RATE = 2.0          # Starting budget, requests/second per host
+DEFAULT_BURST = 4           # Requests that may go out back-to-back after an idle period
+DEFAULT_MIN_RATE = 0.1
+DEFAULT_MAX_RATE = 8.0
+DEFAULT_TARGET_LATENCY = 2.0  # Seconds; slower average responses make us back off
+BACKOFF_STATUSES = (429, 503)
+MAX_RETRY_AFTER = 300.0
+DEFAULT_RETRIES = 3         # Retries of one request in get() (connection errors, timeouts, RETRY_STATUSES)
+DEFAULT_BACKOFF = 0.5       # Seconds before the first retry; doubled for every further one
+# 429 and 503 are not retried at once: record() pauses/slows the host, and the caller's retry queue tries later
+RETRY_STATUSES = (500, 502, 504)
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class RateLimitCancelled(Exception):
+    """Raised when waiting for a request slot is aborted by the stop event."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Converts a ``Retry-After`` header (seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return min(max(when.timestamp() - time.time(), 0.0), MAX_RETRY_AFTER)
+
+
+class _HostBucket:
+    """Token bucket and AIMD state of a single host."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.latency: Optional[float] = None  # EWMA of response time
+
+    def refill(self, now: float, burst: int) -> None:
+        self.tokens = min(float(burst), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    """
+    Adaptive per-host token bucket shared by every request of a crawl.
+
+    Each host gets a budget of ``rate`` requests/second with bursts of up to
+    ``burst`` requests. The budget adapts to the server (AIMD):
+
+    * every fast, successful response adds ``increase`` req/s, up to ``max_rate``;
+    * a 429/503, a connection error or an average latency above
+      ``target_latency`` multiplies the rate by ``decrease``, down to ``min_rate``;
+    * a ``Retry-After`` header pauses the host for the requested time.
+
+    The limiter is thread-safe, so worker pools and the listing prefetch
+    thread can share one instance.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        min_rate: float = DEFAULT_MIN_RATE,
+        max_rate: float = DEFAULT_MAX_RATE,
+        target_latency: float = DEFAULT_TARGET_LATENCY,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+    ):
+        self.initial_rate = rate
+        self.burst = max(1, int(burst))
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _HostBucket] = {}
+
+    def _bucket(self, url: str) -> _HostBucket:
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(self.initial_rate, self.burst)
+        return bucket
+
+    def acquire(self, url: str, stop_event: Optional[threading.Event] = None) -> None:
+        """
+        Blocks until a request to the host of ``url`` is allowed.
+
+        Raises:
+            RateLimitCancelled: If ``stop_event`` is set while waiting.
+        """
+        while True:
+            with self._lock:
+                bucket = self._bucket(url)
+                now = time.monotonic()
+                bucket.refill(now, self.burst)
+                if now >= bucket.blocked_until and bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    return
+                wait = max(bucket.blocked_until - now, (1 - bucket.tokens) / bucket.rate)
+
+            if stop_event is None:
+                time.sleep(wait)
+            elif stop_event.wait(min(wait, 0.25)):
+                raise RateLimitCancelled(url)
+
+    def record(self, url: str, status: Optional[int] = None, latency: Optional[float] = None,
+               retry_after: Optional[float] = None, error: bool = False) -> None:
+        """Feeds the outcome of a request back into the host's rate."""
+        with self._lock:
+            bucket = self._bucket(url)
+            now = time.monotonic()
+
+            if latency is not None:
+                bucket.latency = latency if bucket.latency is None else 0.8 * bucket.latency + 0.2 * latency
+
+            if retry_after:
+                bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+
+            overloaded = error or status in BACKOFF_STATUSES or (status is not None and status >= 500)
+            slow = bucket.latency is not None and bucket.latency > self.target_latency
+            if overloaded or slow:
+                # Back off at most once per interval, so a burst of concurrent
+                # failures does not collapse the rate to the minimum at once
+                if now - bucket.last_decrease >= max(1.0, 1.0 / bucket.rate):
+                    bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                    bucket.tokens = min(bucket.tokens, 0.0)
+                    bucket.last_decrease = now
+            elif status is not None and status < 400:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def refund(self, url: str) -> None:
+        """Returns an unused slot, e.g. when the request never reached the server."""
+        with self._lock:
+            bucket = self._bucket(url)
+            bucket.tokens = min(float(self.burst), bucket.tokens + 1)
+
+    def get(self, client: Any, url: str, stop_event: Optional[threading.Event] = None, retries: int = 0,
+            backoff: float = DEFAULT_BACKOFF, **kwargs: Any) -> Any:
+        """
+        Performs ``client.get(url, **kwargs)`` within the budget and records the outcome.
+
+        ``client`` is anything with a requests-style ``get`` (a ``Session`` or the
+        ``requests`` module itself). The response is returned unchecked, so
+        callers still decide what to do with error statuses. Responses served
+        from a local cache (``resp.from_cache``) give their slot back.
+
+        With ``retries`` a connection error, timeout or :data:`RETRY_STATUSES`
+        response is tried again up to that many times, ``backoff``,
+        ``2 * backoff``, ... seconds apart. Every attempt waits for its own slot,
+        so the AIMD backoff and ``Retry-After`` pauses apply to retries too, and
+        every wait ends as soon as ``stop_event`` is set. Once the retries run
+        out the last response is returned (or its error raised).
+
+        The time spent waiting (budget and backoff) is attached as
+        ``resp.rate_limit_wait``, the number of retries made as ``resp.retries``.
+
+        Raises:
+            RateLimitCancelled: If ``stop_event`` is set while waiting.
+        """
+        waited = 0.0
+        attempt = 0
+        while True:
+            queued = time.monotonic()
+            if attempt:
+                pause = backoff * 2 ** (attempt - 1)
+                if stop_event is None:
+                    time.sleep(pause)
+                elif stop_event.wait(pause):
+                    raise RateLimitCancelled(url)
+            self.acquire(url, stop_event)
+            started = time.monotonic()
+            waited += started - queued
+            try:
+                resp = client.get(url, **kwargs)
+            except Exception as e:
+                self.record(url, latency=time.monotonic() - started, error=True)
+                if attempt < retries and isinstance(e, RETRY_ERRORS):
+                    attempt += 1
+                    continue
+                raise
+            if getattr(resp, "from_cache", False):
+                self.refund(url)
+                break
+            self.record(
+                url,
+                status=resp.status_code,
+                latency=time.monotonic() - started,
+                retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+            )
+            if attempt < retries and resp.status_code in RETRY_STATUSES:
+                resp.close()  # Hands the connection back to the pool
+                attempt += 1
+                continue
+            break
+        resp.rate_limit_wait = waited
+        resp.retries = attempt
+        return resp
+
+    def current_rate(self, url: Optional[str] = None) -> float:
+        """Returns the current budget (req/s) of the host of ``url``, or the slowest known host."""
+        with self._lock:
+            if url is not None:
+                return self._bucket(url).rate
+            if not self._buckets:
+                return self.initial_rate
+            return min(bucket.rate for bucket in self._buckets.values())
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Returns the rate, average latency and remaining pause of every host seen so far."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    "rate": bucket.rate,
+                    "latency": bucket.latency,
+                    "paused_for": max(0.0, bucket.blocked_until - now),
+                }
+                for host, bucket in self._buckets.items()
+            }
@@ -1,29 +1,49 @@
-import requests
-from bs4 import BeautifulSoup
-import time
+import sys
 import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from spacebar_ratelimit import RateLimiter, DEFAULT_RETRIES
+from spacebar_http import make_session, is_transient, RetryQueue
+from spacebar_pipeline import CircuitBreaker, fetch_with_retries
+from spacebar_dates import iso_date_column
+from spacebar_parsing import parse_listing_page, scan_article, LEGACY_CONTENT_TAGS
+
+CATEGORIES = {
+    "การเมือง": "politics",
+    "ธุรกิจ": "business",
+    "สังคม": "social",
+    "โลก": "world",
+    "วัฒนธรรม": "culture",
+    "ไลฟ์สไตล์": "lifestyle",
+    "กีฬา": "sport",
+    "Deep Space": "deep-space"
+}
+EXIT_SITE_DOWN = 3  # หยุดเพราะโหลดหน้ารายการไม่ได้ติดกันหลายหน้า (บันทึกข่าวที่ได้แล้ว)
 
 def ask_category():
-    categories = {
-        "การเมือง": "politics",
-        "ธุรกิจ": "business",
-        "สังคม": "social",
-        "โลก": "world",
-        "วัฒนธรรม": "culture",
-        "ไลฟ์สไตล์": "lifestyle",
-        "กีฬา": "sport",
-        "Deep Space": "deep-space"
-    }
+    categories = CATEGORIES
     print("Available categories:")
     for i, (th, en) in enumerate(categories.items(), 1):
         print(f"  {i}. {th} ({en})")
-    sel = input("เลือก category ที่ต้องการ (en หรือ เลข): ").strip()
-    if sel.isdigit() and 1 <= int(sel) <= len(categories):
-        return list(categories.values())[int(sel)-1]
-    if sel in categories.values():
-        return sel
+    sel = input("เลือก category ที่ต้องการ (en หรือ เลข, หลายหมวดคั่นด้วย , หรือ all): ").strip()
+    if sel.lower() == "all":
+        return list(categories.values())
+    selected = []
+    for part in sel.split(","):
+        part = part.strip()
+        if part.isdigit() and 1 <= int(part) <= len(categories):
+            code = list(categories.values())[int(part)-1]
+        elif part in categories.values():
+            code = part
+        else:
+            continue
+        if code not in selected:
+            selected.append(code)
+    if selected:
+        return selected
     print("Category ไม่ถูกต้อง ใช้ 'politics' (ข่าวการเมือง) เป็นค่าเริ่มต้น")
-    return "politics"
+    return ["politics"]
 
 def ask_page_range():
     try:
@@ -39,10 +59,8 @@ def ask_page_range():
         print(f"ค่าที่ใส่ไม่ถูกต้อง ใช้หน้าแรกแทน (1)")
         return 1, 1
 
-def main():
+def scrape_category(category, start_page, end_page, session, limiter, stop_event, prefix="", breaker=None):
     base_url = "https://spacebar.th"
-    category = ask_category()
-    start_page, end_page = ask_page_range()
     articles = []
     seen_urls = set()
     total_scraped = 0
@@ -51,118 +69,182 @@ def main():
         "User-Agent": "Mozilla/5.0 (compatible; MyBot/1.0; +https://yourdomain.com/bot)"
     }
 
+    # ข่าวที่โหลดไม่สำเร็จชั่วคราว (เครือข่าย/429/5xx) เก็บไว้ลองใหม่ตอนท้าย แทนที่จะทิ้งไป
+    retry_queue = RetryQueue()
+    # หน้ารายการที่โหลดไม่ได้ลองใหม่แบบ backoff ถ้าผิดพลาดติดกันหลายหน้า (เว็บล่ม/ถูกบล็อก) หยุดแทนการไล่เลขหน้าไปเรื่อยๆ
+    if breaker is None:
+        breaker = CircuitBreaker()
+
+    # หน้ารายการลองใหม่ทั้งหน้าด้วย fetch_with_retries ด้านล่าง (รวม 429/503) limiter จึงไม่ต้อง retry ซ้ำอีกชั้น
+    def fetch_listing(category_url):
+        resp = limiter.get(session, category_url, stop_event=stop_event, headers=headers, timeout=10)
+        resp.raise_for_status()
+        return resp
+
+    # request ของข่าวที่ล้มเหลว (เชื่อมต่อไม่ได้/5xx) ลองใหม่ผ่าน limiter: รอตาม rate ของ host และหยุดทันทีเมื่อ stop_event
+    def fetch_article(news_url, headline):
+        news_resp = limiter.get(session, news_url, stop_event=stop_event, retries=DEFAULT_RETRIES, headers=headers, timeout=10)
+        news_resp.raise_for_status()
+        news_resp.encoding = "utf-8"
+        title, date, blocks = scan_article(news_resp.text, content_tags=LEGACY_CONTENT_TAGS, separator=" ")
+        return {
+            "category": category,
+            "title": title if title is not None else headline,
+            "content": "\n".join(blocks or []).strip(),
+            "date": date,
+            "URL": news_url,
+        }
+
     page = start_page
-    try:
-        while True:
-            if end_page != 0 and page > end_page:
+    while not stop_event.is_set():
+        if end_page != 0 and page > end_page:
+            break
+
+        if page == 1:
+            category_url = f"{base_url}/category/{category}"
+        else:
+            category_url = f"{base_url}/category/{category}/page/{page}"
+        print(f"\n{prefix}[Progress] Loading page {page}: {category_url}")
+
+        try:
+            resp = fetch_with_retries(lambda: fetch_listing(category_url), should_retry=is_transient, cancelled=stop_event.is_set)
+        except Exception as e:
+            print(f"{prefix}[Error] โหลด {category_url} ผิดพลาด: {e}")
+            if breaker.record_failure():
+                print(f"{prefix}[Stop] โหลดหน้ารายการไม่สำเร็จติดกัน {breaker.failures} หน้า หยุดดึงหมวดนี้ (บันทึกข่าวที่ได้แล้ว)")
                 break
+            page += 1
+            continue
+        breaker.record_success()
 
-            if page == 1:
-                category_url = f"{base_url}/category/{category}"
-            else:
-                category_url = f"{base_url}/category/{category}/page/{page}"
-            print(f"\n[Progress] Loading page {page}: {category_url}")
-
-            try:
-                resp = requests.get(category_url, headers=headers, timeout=10)
-                resp.raise_for_status()
-            except Exception as e:
-                print(f"[Error] โหลด {category_url} ผิดพลาด: {e}")
-                time.sleep(2)
-                page += 1
-                continue
+        resp.encoding = "utf-8"
+        soup = parse_listing_page(resp.text)
 
-            resp.encoding = "utf-8"
-            soup = BeautifulSoup(resp.text, "html.parser")
+        news_links = soup.find_all("a", attrs={"aria-label": ["articleLink", "latestArticleLink"]})
+        if not news_links:
+            print(f"\n{prefix}[End] No more news found on page {page}. Stop scraping.")
+            break
 
-            news_links = soup.find_all("a", attrs={"aria-label": ["articleLink", "latestArticleLink"]})
-            if not news_links:
-                print(f"\n[End] No more news found on page {page}. Stop scraping.")
+        found_this_page = 0
+        queued_this_page = 0
+        for idx, link in enumerate(news_links, start=1):
+            if stop_event.is_set():
                 break
+            try:
+                headline_div = link.find("div", class_="w-full text-base font-semibold text-gray-700 hover:text-accentual-blue-main mb-2 line-clamp-3")
+                if headline_div:
+                    headline = headline_div.get_text(strip=True)
+                else:
+                    headline_tag = link.find("h3")
+                    headline = headline_tag.get_text(strip=True) if headline_tag else None
+
+                news_url = link["href"]
+                if news_url.startswith("/"):
+                    news_url = base_url + news_url
+
+                if f"/{category}/" not in news_url:
+                    continue
+                if news_url in seen_urls:
+                    continue
+                seen_urls.add(news_url)
 
-            found_this_page = 0
-            for idx, link in enumerate(news_links, start=1):
+                # Request ข่าวแต่ละชิ้น
                 try:
-                    headline_div = link.find("div", class_="w-full text-base font-semibold text-gray-700 hover:text-accentual-blue-main mb-2 line-clamp-3")
-                    if headline_div:
-                        headline = headline_div.get_text(strip=True)
-                    else:
-                        headline_tag = link.find("h3")
-                        headline = headline_tag.get_text(strip=True) if headline_tag else None
-
-                    news_url = link["href"]
-                    if news_url.startswith("/"):
-                        news_url = base_url + news_url
-
-                    if f"/{category}/" not in news_url:
-                        continue
-                    if news_url in seen_urls:
-                        continue
-                    seen_urls.add(news_url)
-
-                    # Request ข่าวแต่ละชิ้น
-                    try:
-                        news_resp = requests.get(news_url, headers=headers, timeout=10)
-                        news_resp.raise_for_status()
-                    except Exception as e:
-                        print(f"[Error] โหลดข่าว {news_url} ผิดพลาด: {e}")
-                        time.sleep(2)
-                        continue
-
-                    news_resp.encoding = "utf-8"
-                    news_soup = BeautifulSoup(news_resp.text, "html.parser")
-
-                    title_tag = news_soup.find("h1", class_="article-title")
-                    title = title_tag.get_text(strip=True) if title_tag else headline
-
-                    date_tag = news_soup.find("p", class_="text-gray-400 text-subheadsm mb-4 md:mb-0")
-                    date = date_tag.get_text(strip=True) if date_tag else None
-
-                    content_div = news_soup.find("div", class_="payload-richtext")
-                    content = ""
-                    if content_div:
-                        for tag in content_div.find_all(['p', 'li', 'blockquote']):
-                            content += tag.get_text(separator=" ", strip=True) + "\n"
-                    content = content.strip()
-
-                    articles.append({
-                        "category": category,
-                        "title": title,
-                        "content": content,
-                        "date": date,
-                        "URL": news_url,
-                    })
-
-                    found_this_page += 1
-                    total_scraped += 1
-
-                    print(f"[{total_scraped}] {title[:45]} | Date: {date} | {news_url}")
-
-                    time.sleep(1)
-
+                    article = fetch_article(news_url, headline)
                 except Exception as e:
-                    print(f"[Error] Processing news on page {page}, idx {idx}: {e}")
+                    print(f"{prefix}[Error] โหลดข่าว {news_url} ผิดพลาด: {e}")
+                    if is_transient(e):
+                        retry_queue.add(news_url, headline, e)
+                        queued_this_page += 1
                     continue
 
-            print(f"[Summary] Page {page} — Scraped {found_this_page} new news articles (Total: {total_scraped})")
+                articles.append(article)
+                found_this_page += 1
+                total_scraped += 1
 
-            if found_this_page == 0:
-                print(f"[End] No new news on page {page}. Scraping likely complete.")
-                break
+                print(f"{prefix}[{total_scraped}] {article['title'][:45]} | Date: {article['date']} | {news_url}")
 
-            page += 1
+            except Exception as e:
+                print(f"{prefix}[Error] Processing news on page {page}, idx {idx}: {e}")
+                continue
 
-    except KeyboardInterrupt:
-        print("\n[Stopped] Scraper interrupted by user. Saving results...")
+        print(f"{prefix}[Summary] Page {page} — Scraped {found_this_page} new news articles (Total: {total_scraped}) | Rate: {limiter.current_rate():.2f} req/s")
+
+        if found_this_page == 0 and not queued_this_page:
+            print(f"{prefix}[End] No new news on page {page}. Scraping likely complete.")
+            break
+
+        page += 1
+
+    if breaker.is_open:
+        retry_queue.abandon()  # เว็บล่มอยู่ ลองใหม่ไปก็ได้แค่รอ
+    if len(retry_queue):
+        print(f"{prefix}[Retry] Retrying {len(retry_queue)} failed articles")
+        for news_url, headline, article in retry_queue.drain(fetch_article, stop_event):
+            articles.append(article)
+            total_scraped += 1
+            print(f"{prefix}[{total_scraped}] {article['title'][:45]} | Date: {article['date']} | {news_url}")
+        print(f"{prefix}[Retry] Recovered {retry_queue.recovered} articles, {len(retry_queue.lost)} lost")
+    for item in retry_queue.lost:
+        print(f"{prefix}[Error] โหลดข่าว {item.url} ไม่สำเร็จหลังลอง {item.attempts} ครั้ง: {item.error}")
+
+    return articles
 
-    # Export CSV
+def export_csv(category, articles):
     try:
         df = pd.DataFrame(articles)
+        if "date" in df:
+            # แปลงวันที่ทั้งคอลัมน์ในครั้งเดียว (ข่าววันเดียวกัน parse ครั้งเดียว)
+            df.insert(df.columns.get_loc("date") + 1, "date_iso", iso_date_column(df["date"]))
         outname = f"spacebar_{category}_news.csv"
         df.to_csv(outname, index=False, encoding="utf-8-sig")
-        print(f"\n[Done] Exported {total_scraped} news articles to {outname}")
+        print(f"\n[Done] Exported {len(articles)} news articles to {outname}")
     except Exception as e:
         print(f"[Error] ไม่สามารถบันทึกไฟล์ CSV: {e}")
 
+def main():
+    categories = ask_category()
+    start_page, end_page = ask_page_range()
+    stop_event = threading.Event()
+
+    # เริ่มที่ 1 request/วินาที แล้วปรับตามการตอบสนองของเซิร์ฟเวอร์
+    # หลายหมวดจะดึงพร้อมกัน (หมวดละ 1 thread) โดยใช้ limiter และ connection pool ร่วมกัน
+    # session เดียวกัน: keep-alive, retry แบบ backoff เมื่อเชื่อมต่อไม่ได้/5xx และรับ gzip/brotli
+    limiter = RateLimiter(rate=1.0, burst=1)
+    session = make_session(pool_size=len(categories))
+
+    breakers = {category: CircuitBreaker() for category in categories}
+    pool = ThreadPoolExecutor(max_workers=len(categories))
+    futures = {
+        category: pool.submit(scrape_category, category, start_page, end_page, session, limiter, stop_event,
+                              f"[{category}] " if len(categories) > 1 else "", breakers[category])
+        for category in categories
+    }
+    try:
+        # รอแบบมี timeout เพื่อให้กด Ctrl+C ระหว่างรอได้
+        pending = set(futures.values())
+        while pending:
+            _, pending = wait(pending, timeout=0.5)
+    except KeyboardInterrupt:
+        print("\n[Stopped] Scraper interrupted by user. Saving results...")
+        stop_event.set()
+    pool.shutdown(wait=True)
+    session.close()
+
+    # Export CSV (หมวดละไฟล์)
+    for category, future in futures.items():
+        try:
+            articles = future.result()
+        except Exception as e:
+            print(f"[Error] [{category}] {e}")
+            continue
+        export_csv(category, articles)
+
+    tripped = [category for category, breaker in breakers.items() if breaker.is_open]
+    if tripped:
+        print(f"[Stop] เว็บไม่ตอบสนอง หยุดก่อนจบ: {', '.join(tripped)} (ได้ข่าวบางส่วน)")
+        return EXIT_SITE_DOWN
+    return 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
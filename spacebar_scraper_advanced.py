@@ -1,13 +1,22 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
 import threading
+import queue
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from spacebar_pipeline import ListingPrefetcher, CircuitBreaker, DEFAULT_PREFETCH_PAGES, find_first_page
+from spacebar_ratelimit import RateLimiter, DEFAULT_RETRIES
+from spacebar_http import make_session, is_transient, RetryQueue
+from spacebar_urlindex import UrlIndex, iter_export_urls
+from spacebar_export import (
+    open_stream_writer, stream_format_for, can_append, PARQUET_COMPRESSIONS, DEFAULT_PARQUET_COMPRESSION,
+)
+from spacebar_dates import date_position, iso_date, ISO_DATE_FIELD, OLDER, NEWER
+from spacebar_parsing import parse_listing_page, scan_article, LEGACY_CONTENT_TAGS
+from spacebar_logview import LogView, drain_queue, POLL_INTERVAL, BUSY_POLL_INTERVAL
+
 CATEGORIES = {
     "การเมือง (Politics)": "politics",
     "ธุรกิจ (Business)": "business",
@@ -18,8 +27,12 @@ CATEGORIES = {
     "กีฬา (Sport)": "sport",
     "Deep Space (บทความพิเศษ)": "deep-space"
 }
-EXPORT_FORMATS = ['CSV', 'Excel', 'JSON', 'Text']
-EXPORT_EXT = {'CSV': '.csv', 'Excel': '.xlsx', 'JSON': '.json', 'Text': '.txt'}
+BASE_URL = "https://spacebar.th"
+ALL_CATEGORIES = "ทุกหมวด (All)"
+EXPORT_FORMATS = ['CSV', 'JSON Lines', 'Parquet', 'SQLite', 'Excel', 'JSON', 'Text']
+EXPORT_EXT = {'CSV': '.csv', 'JSON Lines': '.jsonl', 'Parquet': '.parquet', 'SQLite': '.sqlite', 'Excel': '.xlsx', 'JSON': '.json', 'Text': '.txt'}
+EXPORT_COLUMNS = ["หมวด", "หัวข้อ", "เนื้อหา", "วันที่", ISO_DATE_FIELD, "URL"]
+OLDER_STOP_STREAK = 5  # ข่าวเก่ากว่าวันที่เริ่มต้นติดกันกี่ข่าวจึงหยุดไล่หน้า (ข่าวปักหมุดอาจแทรกได้ไม่กี่ข่าว)
 
 def get_normal_news_links(soup):
     highlight_header = soup.find("h2", string="เรื่องเด่นประจำวัน")
@@ -30,194 +43,336 @@ def get_normal_news_links(soup):
     news_links = soup.find_all("a", attrs={"aria-label": ["articleLink", "latestArticleLink"]})
     return news_links
 
-def parse_date(date_str):
-    for fmt in ["%d %b. %Y", "%d %b %Y", "%Y-%m-%d", "%d/%m/%Y"]:
-        try:
-            return datetime.strptime(date_str, fmt)
-        except Exception:
-            continue
-    try:
-        return datetime.strptime(date_str.split()[0], "%d/%m/%Y")
-    except Exception:
-        return None
-
-def in_date_range(date_str, date_start, date_end):
-    d = parse_date(date_str)
-    if not d:
-        return False
-    if date_start and d < date_start:
-        return False
-    if date_end and d > date_end:
-        return False
-    return True
-
 def read_existing_urls(filepath):
     if not os.path.exists(filepath):
         return set()
     try:
-        ext = os.path.splitext(filepath)[1].lower()
-        if ext == '.xlsx':
-            df = pd.read_excel(filepath)
-        elif ext == '.json':
-            df = pd.read_json(filepath)
-        elif ext == '.txt':
-            urls = set()
-            with open(filepath, encoding='utf-8') as f:
-                for line in f:
-                    if line.startswith("URL:"):
-                        urls.add(line.strip()[4:].strip())
-            return urls
-        else:
-            df = pd.read_csv(filepath)
-        return set(df['URL']) if 'URL' in df.columns else set()
+        return set(iter_export_urls(filepath))
     except Exception:
         return set()
 
-def scrape_news(category, start_page, end_page, log_func, progress_func, date_start=None, date_end=None, page_callback=None):
-    base_url = "https://spacebar.th"
+def scrape_news(category, start_page, end_page, log_func, progress_func, date_start=None, date_end=None, page_callback=None, prefetch_pages=DEFAULT_PREFETCH_PAGES, rate_limiter=None, known_urls=None, stop_after_known=0, parser=None, on_article=None, session=None, base_url=BASE_URL):
     articles = []
+    total = 0
     seen_urls = set()
     headers = {
         "User-Agent": "Mozilla/5.0 (compatible; MyBot/1.0; +https://yourdomain.com/bot)"
     }
-    page = start_page
-    while True:
-        if end_page != 0 and page > end_page:
-            break
-
-        if page_callback:
-            if end_page == 0:
-                page_callback(page, None)
-            else:
-                page_callback(page, end_page)
-
+    # จำกัดอัตราการ request ต่อ host แทนการ sleep คงที่ (ปรับเร็ว/ช้าตามการตอบสนองของเซิร์ฟเวอร์)
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+    # ใช้ session ร่วมกันได้ (connection pool เดียวกันเมื่อดึงหลายหมวดพร้อมกัน)
+    # ถ้าไม่ได้ส่งมาก็สร้างเอง (keep-alive) request ที่เชื่อมต่อไม่ได้/5xx ลองใหม่แบบ backoff ผ่าน rate_limiter.get
+    client = session if session is not None else make_session(pool_size=2)
+    # ข่าวที่โหลดไม่สำเร็จชั่วคราว (เครือข่าย/429/5xx) เก็บไว้ลองใหม่หลังไล่หน้ารายการเสร็จ แทนที่จะทิ้งไป
+    retry_queue = RetryQueue()
+
+    def listing_url(page):
         if page == 1:
-            category_url = f"{base_url}/category/{category}"
-        else:
-            category_url = f"{base_url}/category/{category}/page/{page}"
+            return f"{base_url}/category/{category}"
+        return f"{base_url}/category/{category}/page/{page}"
+
+    # retries=0 ตอนไล่หน้ารายการ: ListingPrefetcher ลองหน้าที่ผิดพลาดใหม่เองอยู่แล้ว (retry ชั้นเดียว)
+    def fetch_listing(page, retries=0):
+        category_url = listing_url(page)
         log_func(f"กำลังโหลดหน้า {page}: {category_url}")
 
-        if end_page != 0:
-            progress_func(page - start_page + 1, end_page - start_page + 1)
+        resp = rate_limiter.get(client, category_url, retries=retries, headers=headers, timeout=10)
+        resp.raise_for_status()
 
+        resp.encoding = "utf-8"
+        soup = parse_listing_page(resp.text, parser)
+        return get_normal_news_links(soup)
+
+    def page_reaches_date_end(page):
+        # หน้านี้มีข่าวที่ไม่ใหม่กว่า date_end แล้วหรือยัง: ดูวันที่ของข่าวสุดท้าย (เก่าสุด) ในหน้า
+        # หน้าที่เลยหน้าสุดท้าย หรืออ่านวันที่ไม่ได้ ถือว่าถึงแล้ว (เริ่มเร็วไปดีกว่าข้ามข่าว)
+        hrefs = [link.get("href") or "" for link in fetch_listing(page, DEFAULT_RETRIES)]
+        urls = [base_url + href if href.startswith("/") else href for href in hrefs if f"/{category}/" in href]
+        if not urls:
+            return True
+        resp = rate_limiter.get(client, urls[-1], retries=DEFAULT_RETRIES, headers=headers, timeout=10)
+        resp.raise_for_status()
+        resp.encoding = "utf-8"
+        _, date, _ = scan_article(resp.text, parser, LEGACY_CONTENT_TAGS)
+        position = date_position(date, None, date_end) if date else None
+        return position is None or position != NEWER
+
+    def fetch_article(news_url, headline):
+        news_resp = rate_limiter.get(client, news_url, retries=DEFAULT_RETRIES, headers=headers, timeout=10)
+        news_resp.raise_for_status()
+        news_resp.encoding = "utf-8"
+        # อ่าน title/วันที่/เนื้อหาในรอบเดียวโดยไม่สร้าง DOM
+        title, date, blocks = scan_article(news_resp.text, parser, LEGACY_CONTENT_TAGS, separator=" ")
+        return title if title is not None else headline, date, blocks
+
+    def save_article(news_url, title, date, blocks):
+        nonlocal total
+        content = ""
+        if blocks is not None:
+            content = "\n".join(blocks).strip()
+        else:
+            log_func(f"[Warn] ไม่พบเนื้อหา (payload-richtext) ใน {news_url}")
+
+        article = {
+            "หมวด": category,
+            "หัวข้อ": title,
+            "เนื้อหา": content,
+            "วันที่": date,
+            ISO_DATE_FIELD: iso_date(date),  # วันที่แบบ YYYY-MM-DD ไว้กรอง/เรียงโดยไม่ต้อง parse ซ้ำ
+            "URL": news_url,
+        }
+        if on_article:
+            on_article(article)
+        else:
+            articles.append(article)
+        total += 1
+        log_func(f"[{total}] {title[:45]} | Date: {date}")
+
+    # ช่วงวันที่ในอดีต: หาหน้าแรกที่มีข่าวถึง date_end ด้วย exponential + binary search แทนการไล่ทุกหน้าที่ใหม่กว่า
+    # (ทำเสมอ รวมถึงโหมด incremental: ข่าวเดิมในหน้าที่ใหม่กว่าช่วงวันที่ไม่ได้แปลว่าดึงช่วงนี้ไปแล้ว)
+    window_page = start_page  # หน้าแรกที่มีข่าวไม่ใหม่กว่า date_end หน้าหลังจากนี้อยู่ในช่วงวันที่หรือเก่ากว่าทั้งหน้า
+    if date_end is not None:
+        def log_probe(page, reached):
+            log_func(f"[ค้นหาหน้า] หน้า {page}: {'ถึงช่วงวันที่แล้ว' if reached else 'ยังใหม่กว่าช่วงวันที่'}")
         try:
-            resp = requests.get(category_url, headers=headers, timeout=10)
-            resp.raise_for_status()
+            first_page = find_first_page(page_reaches_date_end, start_page, end_page, on_probe=log_probe)
         except Exception as e:
-            log_func(f"[Error] โหลด {category_url} ผิดพลาด: {e}")
-            time.sleep(2)
-            page += 1
-            continue
-
-        resp.encoding = "utf-8"
-        soup = BeautifulSoup(resp.text, "html.parser")
-        news_links = get_normal_news_links(soup)
-        if not news_links:
-            log_func(f"[End] ไม่พบข่าวเพิ่มเติมที่หน้า {page}")
-            break
-
-        found_this_page = 0
-        for idx, link in enumerate(news_links, start=1):
-            try:
-                headline_div = link.find("div", class_="w-full text-base font-semibold text-gray-700 hover:text-accentual-blue-main mb-2 line-clamp-3")
-                if headline_div:
-                    headline = headline_div.get_text(strip=True)
+            log_func(f"[Warn] ค้นหาหน้าแรกตามวันที่ไม่สำเร็จ ({e}) เริ่มที่หน้า {start_page}")
+            first_page = None  # ไม่รู้ว่าช่วงวันที่เริ่มหน้าไหน: รู้ได้จากวันที่ของข่าวเท่านั้น
+        if first_page is not None and first_page > start_page:
+            log_func(f"**เริ่มดึงที่หน้า {first_page} (ข้ามหน้าที่ใหม่กว่า {date_end:%Y-%m-%d})**")
+            start_page = first_page
+        window_page = first_page
+
+    # ถ้ามี on_article จะส่งข่าวออกไปทีละข่าว (เช่นเขียนลงไฟล์ทันที) และไม่เก็บไว้ใน articles
+    # โหมด incremental: ข้ามข่าวที่อยู่ใน known_urls โดยไม่โหลดหน้าข่าว และหยุดเมื่อเจอข่าวเดิม
+    # ทั้งหน้า หรือเจอข่าวเดิมติดกัน stop_after_known ข่าว (0 = ดูทั้งหน้า)
+    consecutive_known = 0
+    consecutive_older = 0  # ข่าวเก่ากว่า date_start ติดกัน: ถึง OLDER_STOP_STREAK แล้วหยุด
+    # กฎหยุดเมื่อเจอข่าวเดิมใช้หลังจากไล่ถึงช่วงวันที่แล้วเท่านั้น (ข่าวที่ใหม่กว่า date_end ไม่ใช่จุดที่ดึงครั้งก่อนหยุดไว้)
+    reached_window = date_end is None
+    if known_urls is not None:
+        # ส่วนใหญ่จะหยุดตั้งแต่หน้าแรกๆ จึงไม่โหลดหน้ารายการล่วงหน้า
+        prefetch_pages = 0
+
+    # โหลดหน้ารายการล่วงหน้าสูงสุด prefetch_pages หน้า ระหว่างที่กำลังโหลดข่าวของหน้าปัจจุบัน (0 = ทีละหน้าแบบเดิม)
+    # หน้ารายการที่โหลดไม่ได้จะลองใหม่แบบ backoff ถ้าผิดพลาดติดกัน breaker.trip_after หน้า (เว็บล่ม/ถูกบล็อก) จะหยุดหมวดนี้
+    # แทนการไล่เลขหน้าต่อไปเรื่อยๆ เมื่อดึงจนจบ (end_page=0) ข่าวที่ได้แล้วยังถูกบันทึกตามปกติ
+    breaker = CircuitBreaker()
+    def on_trip(page, probe_in):
+        # เรียกหลังจาก log ของหน้าที่ผิดพลาดแล้ว (thread เดียวกับลูปด้านล่าง)
+        if probe_in is None:
+            log_func(f"[Error] โหลดหน้ารายการไม่สำเร็จติดกัน {breaker.failures} หน้า (ล่าสุดหน้า {page}) หยุดดึงหมวดนี้")
+        else:
+            log_func(f"[Error] โหลดหน้ารายการไม่สำเร็จติดกัน {breaker.failures} หน้า (ล่าสุดหน้า {page}) ลองใหม่ใน {probe_in:.0f} วินาที")
+    listing = ListingPrefetcher(fetch_listing, start_page, end_page, lookahead=prefetch_pages, is_last=lambda links: not links,
+                                should_retry=is_transient, breaker=breaker, on_trip=on_trip)
+    with listing:
+        for page, news_links, error in listing:
+            if page_callback:
+                if end_page == 0:
+                    page_callback(page, None)
                 else:
-                    headline_tag = link.find("h3")
-                    if headline_tag:
-                        headline = headline_tag.get_text(strip=True)
-                    else:
-                        headline = "[ไม่พบ headline] (DOM อาจเปลี่ยน)"
+                    page_callback(page, end_page)
 
-                news_url = link.get("href")
-                if not news_url:
-                    log_func(f"[Warn] ข่าวลำดับ {idx} ไม่พบลิงก์ (DOM เปลี่ยน?)")
-                    continue
+            if end_page != 0:
+                progress_func(page - start_page + 1, end_page - start_page + 1)
 
-                if news_url.startswith("/"):
-                    news_url = base_url + news_url
-
-                if f"/{category}/" not in news_url and not news_url.endswith(f"/{category}"):
-                    continue
-                if news_url in seen_urls:
-                    continue
-                seen_urls.add(news_url)
+            if error is not None:
+                log_func(f"[Error] โหลด {listing_url(page)} ผิดพลาด: {error}")
+                continue
 
+            if not news_links:
+                log_func(f"[End] ไม่พบข่าวเพิ่มเติมที่หน้า {page}")
+                break
+            if window_page is not None and page > window_page:
+                reached_window = True
+
+            found_this_page = 0
+            known_this_page = 0
+            newer_this_page = 0
+            known_before_window = 0  # ข่าวเดิมก่อนถึงช่วงวันที่: ไม่ใช่เหตุให้หยุด
+            queued_this_page = 0  # ข่าวที่รอลองใหม่: หน้านี้ยังไม่ถือว่าว่าง
+            reached_known = False
+            reached_older = False
+            for idx, link in enumerate(news_links, start=1):
                 try:
-                    news_resp = requests.get(news_url, headers=headers, timeout=10)
-                    news_resp.raise_for_status()
-                except Exception as e:
-                    log_func(f"[Error] โหลดข่าว {news_url} ผิดพลาด: {e}")
-                    time.sleep(2)
-                    continue
-
-                news_resp.encoding = "utf-8"
-                news_soup = BeautifulSoup(news_resp.text, "html.parser")
-
-                title_tag = news_soup.find("h1", class_="article-title")
-                title = title_tag.get_text(strip=True) if title_tag else headline
-                if title == "[ไม่พบ headline] (DOM อาจเปลี่ยน)":
-                    log_func(f"[Warn] ไม่พบ title/headline ใน {news_url}")
+                    headline_div = link.find("div", class_="w-full text-base font-semibold text-gray-700 hover:text-accentual-blue-main mb-2 line-clamp-3")
+                    if headline_div:
+                        headline = headline_div.get_text(strip=True)
+                    else:
+                        headline_tag = link.find("h3")
+                        if headline_tag:
+                            headline = headline_tag.get_text(strip=True)
+                        else:
+                            headline = "[ไม่พบ headline] (DOM อาจเปลี่ยน)"
+
+                    news_url = link.get("href")
+                    if not news_url:
+                        log_func(f"[Warn] ข่าวลำดับ {idx} ไม่พบลิงก์ (DOM เปลี่ยน?)")
+                        continue
 
-                date_tag = news_soup.find("p", class_="text-gray-400 text-subheadsm mb-4 md:mb-0")
-                date = date_tag.get_text(strip=True) if date_tag else None
-                if not date:
-                    log_func(f"[Warn] ไม่พบวันที่ใน {news_url}")
+                    if news_url.startswith("/"):
+                        news_url = base_url + news_url
 
-                if (date_start or date_end) and date:
-                    if not in_date_range(date, date_start, date_end):
+                    if f"/{category}/" not in news_url and not news_url.endswith(f"/{category}"):
+                        continue
+                    if news_url in seen_urls:
+                        continue
+                    seen_urls.add(news_url)
+
+                    if known_urls is not None and news_url in known_urls:
+                        if reached_window:
+                            known_this_page += 1
+                            consecutive_known += 1
+                            if stop_after_known and consecutive_known >= stop_after_known:
+                                reached_known = True
+                                break
+                        else:
+                            known_before_window += 1
+                        continue
+                    consecutive_known = 0
+
+                    try:
+                        title, date, blocks = fetch_article(news_url, headline)
+                    except Exception as e:
+                        log_func(f"[Error] โหลดข่าว {news_url} ผิดพลาด: {e}")
+                        if is_transient(e):
+                            retry_queue.add(news_url, headline, e)
+                            queued_this_page += 1
                         continue
 
-                content_div = news_soup.find("div", class_="payload-richtext")
-                content = ""
-                if content_div:
-                    for tag in content_div.find_all(['p', 'li', 'blockquote']):
-                        content += tag.get_text(separator=" ", strip=True) + "\n"
-                    content = content.strip()
-                else:
-                    log_func(f"[Warn] ไม่พบเนื้อหา (payload-richtext) ใน {news_url}")
-
-                articles.append({
-                    "หมวด": category,
-                    "หัวข้อ": title,
-                    "เนื้อหา": content,
-                    "วันที่": date,
-                    "URL": news_url,
-                })
+                    if title == "[ไม่พบ headline] (DOM อาจเปลี่ยน)":
+                        log_func(f"[Warn] ไม่พบ title/headline ใน {news_url}")
+
+                    if not date:
+                        log_func(f"[Warn] ไม่พบวันที่ใน {news_url}")
+
+                    if (date_start or date_end) and date:
+                        position = date_position(date, date_start, date_end)
+                        # อ่านวันที่ไม่ได้: เก็บข่าวไว้เหมือนข่าวที่ไม่มีวันที่ และไม่ถือว่าถึงช่วงวันที่แล้ว
+                        if position is None:
+                            log_func(f"[Warn] อ่านวันที่ '{date}' ไม่ได้ใน {news_url} เก็บข่าวไว้โดยไม่กรองตามช่วงวันที่")
+                        elif position == OLDER:
+                            consecutive_older += 1
+                            if consecutive_older >= OLDER_STOP_STREAK:
+                                reached_older = True
+                                break
+                            continue
+                        else:
+                            consecutive_older = 0
+                            if position == NEWER:
+                                newer_this_page += 1
+                                continue
+                            reached_window = True
+
+                    save_article(news_url, title, date, blocks)
+                    found_this_page += 1
 
-                found_this_page += 1
+                except Exception as e:
+                    log_func(f"[Error] ใน page {page}, idx {idx}: {e}")
+                    continue
 
-                log_func(f"[{len(articles)}] {title[:45]} | Date: {date}")
-                time.sleep(0.5)
-            except Exception as e:
-                log_func(f"[Error] ใน page {page}, idx {idx}: {e}")
+            log_func(f"[สรุป] หน้า {page}: ได้ข่าวใหม่ {found_this_page} ข่าว (รวมทั้งหมด {total}) | อัตรา {rate_limiter.current_rate():.2f} req/s")
+            if reached_known:
+                log_func(f"[End] พบข่าวที่มีอยู่แล้วติดกัน {consecutive_known} ข่าวที่หน้า {page} (incremental)")
+                break
+            if reached_older:
+                log_func(f"[End] ข่าวเก่ากว่า {date_start:%Y-%m-%d} ติดกัน {consecutive_older} ข่าวที่หน้า {page} (หยุดตามช่วงวันที่)")
+                break
+            if (newer_this_page or known_before_window) and found_this_page == 0:
+                continue  # ยังไม่ถึงช่วงวันที่ ไปหน้าถัดไป
+            if known_this_page and found_this_page == 0:
+                log_func(f"[End] ข่าวทั้งหมดในหน้า {page} มีอยู่แล้ว (incremental)")
+                break
+            if found_this_page == 0 and not queued_this_page:
+                log_func(f"[End] ไม่มีข่าวใหม่ที่หน้า {page}")
+                break
+
+    if breaker.is_open:
+        retry_queue.abandon()  # เว็บล่มอยู่ ลองใหม่ไปก็ได้แค่รอ
+    # ลองโหลดข่าวที่ผิดพลาดใหม่สูงสุด RETRY_ROUNDS รอบ โดยรอนานขึ้นเท่าตัวทุกรอบ (เซิร์ฟเวอร์มักกลับมาแล้ว)
+    if len(retry_queue):
+        log_func(f"[Retry] ลองโหลดข่าวที่ผิดพลาดใหม่ {len(retry_queue)} ข่าว")
+        for news_url, headline, (title, date, blocks) in retry_queue.drain(fetch_article):
+            if (date_start or date_end) and date and date_position(date, date_start, date_end) in (OLDER, NEWER):
                 continue
-
-        log_func(f"[สรุป] หน้า {page}: ได้ข่าวใหม่ {found_this_page} ข่าว (รวมทั้งหมด {len(articles)})")
-        if found_this_page == 0:
-            log_func(f"[End] ไม่มีข่าวใหม่ที่หน้า {page}")
-            break
-        page += 1
-
+            save_article(news_url, title, date, blocks)
+        log_func(f"[Retry] โหลดสำเร็จ {retry_queue.recovered} ข่าว ไม่สำเร็จ {len(retry_queue.lost)} ข่าว")
+    for item in retry_queue.lost:
+        log_func(f"[Error] โหลดข่าว {item.url} ไม่สำเร็จหลังลอง {item.attempts} ครั้ง: {item.error}")
+    if session is None:
+        client.close()
     return articles
 
-def export_news(df, export_path, format_type):
+def scrape_categories(categories, start_page, end_page, log_func, progress_func, category_callback=None, rate_limiter=None, on_article=None, **kwargs):
+    # ดึงหลายหมวดพร้อมกัน หมวดละ 1 thread ใช้ session (connection pool) และ rate limiter ร่วมกัน
+    # เวลารวมจึงใกล้กับหมวดที่ช้าที่สุด แทนที่จะเป็นผลรวมของทุกหมวด
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+    lock = threading.Lock()
+    pages_done = {}
+    total_pages = (end_page - start_page + 1) * len(categories) if end_page != 0 else 0
+
+    def run_category(category):
+        def progress(val, maxval):
+            with lock:
+                pages_done[category] = val
+                done = sum(pages_done.values())
+            if total_pages:
+                progress_func(done, total_pages)
+        def page_callback(current, end_val):
+            if category_callback:
+                category_callback(category, current, end_val)
+        def on_category_article(article):
+            with lock:
+                on_article(article)
+        return scrape_news(
+            category, start_page, end_page, lambda msg: log_func(f"[{category}] {msg}"), progress,
+            page_callback=page_callback, rate_limiter=rate_limiter, session=session,
+            on_article=on_category_article if on_article else None, **kwargs
+        )
+
+    # หมวดละ 2 connection: หน้าข่าว + หน้ารายการที่โหลดล่วงหน้า
+    with make_session(pool_size=len(categories) * 2) as session:
+        with ThreadPoolExecutor(max_workers=len(categories)) as pool:
+            results = list(pool.map(run_category, categories))
+    return [article for articles in results for article in articles]
+
+def export_news(df, export_path, format_type, url_index=None, compression=DEFAULT_PARQUET_COMPRESSION, append=False):
+    # append=True (CSV/JSON Lines/Parquet): เพิ่มข่าวใหม่ต่อท้ายไฟล์เดิม ไม่อ่านหรือเขียนข่าวเดิมซ้ำ
+    # SQLite: upsert ตาม URL ลงฐานข้อมูลเดิมเสมอ (ข่าวเดิมถูกอัปเดต)
+    if append or format_type in ("Parquet", "SQLite"):
+        with open_stream_writer(export_path, EXPORT_COLUMNS, compression=compression, append=append) as writer:
+            for row in df.to_dict("records"):
+                writer.write(row)
+        if url_index is not None:
+            if append or format_type == "SQLite":
+                url_index.add_many(df["URL"])
+            else:
+                url_index.reset(df["URL"])
+            url_index.sync(export_path)
+        return
     if format_type == "CSV":
         df.to_csv(export_path, index=False, encoding="utf-8-sig")
     elif format_type == "Excel":
         df.to_excel(export_path, index=False)
     elif format_type == "JSON":
         df.to_json(export_path, orient="records", force_ascii=False, indent=2)
+    elif format_type == "JSON Lines":
+        df.to_json(export_path, orient="records", force_ascii=False, lines=True)
     elif format_type == "Text":
         with open(export_path, "w", encoding="utf-8") as f:
             for idx, row in df.iterrows():
                 f.write(f"หมวด: {row['หมวด']}\nหัวข้อ: {row['หัวข้อ']}\nวันที่: {row['วันที่']}\nURL: {row['URL']}\n{row['เนื้อหา']}\n{'-'*60}\n")
+    # ไฟล์ถูกเขียนทับ: ให้ index ข้างไฟล์ตรงกับแถวที่เพิ่งเขียน
+    if url_index is not None:
+        url_index.reset(df["URL"])
+        url_index.sync(export_path)
 
-def show_summary(df_all, df_new, cat_display):
-    total = len(df_all)
-    total_new = len(df_new)
+def show_summary(total, total_new, counts, cat_display):
     msg = f"สรุปผลการดึงข่าว\n\nข่าวทั้งหมด: {total}\nข่าวใหม่: {total_new}\n"
-    counts = df_all['หมวด'].value_counts()
     msg += "\nจำนวนข่าวแยกตามหมวด:\n"
     for c in cat_display:
         code = CATEGORIES[c]
@@ -226,243 +381,386 @@ def show_summary(df_all, df_new, cat_display):
     messagebox.showinfo("รายงานสรุป", msg)
 
 # ---------- GUI -----------
-root = tk.Tk()
-root.title("Spacebar News Scraper")
-root.geometry("510x570")
-root.resizable(False, False)
-root.configure(bg="#f6f7fb")
-
-frm = ttk.Frame(root, padding=(18, 15, 18, 15))
-frm.pack(fill="both", expand=True)
-
-ttk.Label(frm, text="เลือกที่หมวดหมู่:").grid(row=0, column=0, sticky="e", pady=(6, 2))
-dropdown_category = ttk.Combobox(frm, values=list(CATEGORIES.keys()), state="readonly", width=24)
-dropdown_category.set(list(CATEGORIES.keys())[0])
-dropdown_category.grid(row=0, column=1, pady=(6, 2), columnspan=2, sticky="w")
-
-ttk.Label(frm, text="หน้าเริ่มต้น:").grid(row=1, column=0, sticky="e", pady=4)
-entry_start = ttk.Entry(frm, width=8)
-entry_start.grid(row=1, column=1, sticky="w", pady=4)
-entry_start.insert(0, "1")
-ttk.Label(frm, text="หน้าสิ้นสุด:").grid(row=1, column=2, sticky="e", pady=4)
-entry_end = ttk.Entry(frm, width=8)
-entry_end.grid(row=1, column=3, sticky="w", pady=4)
-entry_end.insert(0, "1")
-
-ttk.Label(frm, text="วันที่เริ่มต้น (yyyy-mm-dd):").grid(row=2, column=0, sticky="e", pady=4)
-entry_date_start = ttk.Entry(frm, width=12)
-entry_date_start.grid(row=2, column=1, sticky="w", pady=4)
-ttk.Label(frm, text="วันที่สิ้นสุด (yyyy-mm-dd):").grid(row=2, column=2, sticky="e", pady=4)
-entry_date_end = ttk.Entry(frm, width=12)
-entry_date_end.grid(row=2, column=3, sticky="w", pady=4)
-
-lbl_hint = ttk.Label(frm, text="*ถ้าไม่กรอกวัน จะดึงตามหน้า (page) ที่เลือก", foreground="#6c6c6c")
-lbl_hint.grid(row=3, column=0, columnspan=4, sticky="w", pady=(0, 6))
-
-ttk.Label(frm, text="ไฟล์ปลายทาง:").grid(row=4, column=0, sticky="e", pady=4)
-csv_path_var = tk.StringVar()
-entry_csv = ttk.Entry(frm, textvariable=csv_path_var, width=32)
-entry_csv.grid(row=4, column=1, pady=4, sticky="w", columnspan=2)
-entry_csv.insert(0, "spacebar_news")
-def choose_csv_path():
-    filename = filedialog.asksaveasfilename(
-        defaultextension="",
-        filetypes=[
-            ("CSV files", "*.csv"), ("Excel files", "*.xlsx"),
-            ("JSON files", "*.json"), ("Text files", "*.txt"), ("All files", "*.*")]
-        ,
-        initialfile=entry_csv.get().strip() or "spacebar_news"
-    )
-    if filename:
-        # ใช้ basename ไม่เอานามสกุล
-        name_only = os.path.splitext(os.path.basename(filename))[0]
-        csv_path_var.set(name_only)
-btn_choose_path = ttk.Button(frm, text="เลือก...", command=choose_csv_path)
-btn_choose_path.grid(row=4, column=3, padx=2)
-
-ttk.Label(frm, text="Export เป็นไฟล์:").grid(row=5, column=0, sticky="e", pady=4)
-dropdown_format = ttk.Combobox(frm, values=EXPORT_FORMATS, state="readonly", width=10)
-dropdown_format.set("CSV")
-dropdown_format.grid(row=5, column=1, pady=4, sticky="w")
-
-export_new_var = tk.IntVar(value=1)
-cb_export_new = tk.Checkbutton(frm, text="Export เฉพาะข่าวใหม่ (เทียบไฟล์เดิม)", variable=export_new_var)
-cb_export_new.grid(row=5, column=2, columnspan=2, sticky="w", pady=2)
-
-btn_start = ttk.Button(frm, text="เริ่มดึงข่าว", width=20)
-btn_start.grid(row=6, column=0, columnspan=4, pady=14, ipadx=8)
-
-progress_bar = ttk.Progressbar(frm, length=350, mode="determinate")
-progress_bar.grid(row=7, column=0, columnspan=4, pady=(3, 0))
-
-label_current_page = ttk.Label(frm, text="", foreground="#0076D6", font=("Segoe UI", 10, "bold"))
-label_current_page.grid(row=8, column=0, columnspan=4, pady=(2, 2), sticky="w")
-
-ttk.Label(frm, text="Log:").grid(row=9, column=0, columnspan=4, sticky="w")
-log_text = tk.Text(frm, height=12, width=58, state="disabled", bg="#f8fafb", fg="#333", wrap="word", font=("Consolas", 10))
-log_text.grid(row=10, column=0, columnspan=4, pady=4)
-
-darkmode_var = tk.IntVar()
-def toggle_dark_mode():
-    mode = darkmode_var.get()
-    style = ttk.Style()
-    if mode:
-        root.configure(bg="#23272f")
-        frm.configure(style="Dark.TFrame")
-        style.configure("Dark.TFrame", background="#23272f")
-        style.configure("Dark.TLabel", background="#23272f", foreground="#e3eaf7")
-        style.configure("Dark.TButton", background="#394150", foreground="#c9d1e9")
-        style.configure("Dark.TCombobox", fieldbackground="#394150", background="#394150", foreground="#e3eaf7")
-        style.configure("Dark.TEntry", fieldbackground="#394150", background="#394150", foreground="#e3eaf7")
-        for widget in frm.winfo_children():
-            if isinstance(widget, ttk.Entry) or isinstance(widget, ttk.Combobox):
-                widget.configure(style="Dark.TEntry" if isinstance(widget, ttk.Entry) else "Dark.TCombobox")
-            elif isinstance(widget, ttk.Label):
-                widget.configure(style="Dark.TLabel")
-            elif isinstance(widget, ttk.Button):
-                widget.configure(style="Dark.TButton")
-        log_text.config(bg="#242933", fg="#e3eaf7")
-        label_current_page.config(foreground="#44aaff")
-    else:
-        root.configure(bg="#f6f7fb")
-        frm.configure(style="TFrame")
-        for widget in frm.winfo_children():
-            if isinstance(widget, ttk.Entry) or isinstance(widget, ttk.Combobox):
-                widget.configure(style="TEntry" if isinstance(widget, ttk.Entry) else "TCombobox")
-            elif isinstance(widget, ttk.Label):
-                widget.configure(style="TLabel")
-            elif isinstance(widget, ttk.Button):
-                widget.configure(style="TButton")
-        log_text.config(bg="#f8fafb", fg="#333")
-        label_current_page.config(foreground="#0076D6")
-cb_dark = tk.Checkbutton(frm, text="Dark mode", variable=darkmode_var, command=toggle_dark_mode)
-cb_dark.grid(row=11, column=0, sticky="w", pady=8, columnspan=4)
-
-def run_scraper():
-    try:
-        start = int(entry_start.get()) if entry_start.get().strip() else 1
-        end = int(entry_end.get()) if entry_end.get().strip() else 1
-        if start < 1: start = 1
-    except Exception:
-        start, end = 1, 1
-
-    date_start_str = entry_date_start.get().strip()
-    date_end_str = entry_date_end.get().strip()
-    date_start = None
-    date_end = None
-    if date_start_str:
+def main():
+    root = tk.Tk()
+    root.title("Spacebar News Scraper")
+    root.geometry("510x630")
+    root.resizable(False, False)
+    root.configure(bg="#f6f7fb")
+
+    frm = ttk.Frame(root, padding=(18, 15, 18, 15))
+    frm.pack(fill="both", expand=True)
+
+    ttk.Label(frm, text="เลือกที่หมวดหมู่:").grid(row=0, column=0, sticky="e", pady=(6, 2))
+    dropdown_category = ttk.Combobox(frm, values=list(CATEGORIES.keys()) + [ALL_CATEGORIES], state="readonly", width=24)
+    dropdown_category.set(list(CATEGORIES.keys())[0])
+    dropdown_category.grid(row=0, column=1, pady=(6, 2), columnspan=2, sticky="w")
+
+    ttk.Label(frm, text="หน้าเริ่มต้น:").grid(row=1, column=0, sticky="e", pady=4)
+    entry_start = ttk.Entry(frm, width=8)
+    entry_start.grid(row=1, column=1, sticky="w", pady=4)
+    entry_start.insert(0, "1")
+    ttk.Label(frm, text="หน้าสิ้นสุด:").grid(row=1, column=2, sticky="e", pady=4)
+    entry_end = ttk.Entry(frm, width=8)
+    entry_end.grid(row=1, column=3, sticky="w", pady=4)
+    entry_end.insert(0, "1")
+
+    ttk.Label(frm, text="วันที่เริ่มต้น (yyyy-mm-dd):").grid(row=2, column=0, sticky="e", pady=4)
+    entry_date_start = ttk.Entry(frm, width=12)
+    entry_date_start.grid(row=2, column=1, sticky="w", pady=4)
+    ttk.Label(frm, text="วันที่สิ้นสุด (yyyy-mm-dd):").grid(row=2, column=2, sticky="e", pady=4)
+    entry_date_end = ttk.Entry(frm, width=12)
+    entry_date_end.grid(row=2, column=3, sticky="w", pady=4)
+
+    lbl_hint = ttk.Label(frm, text="*ถ้าไม่กรอกวัน จะดึงตามหน้า (page) ที่เลือก", foreground="#6c6c6c")
+    lbl_hint.grid(row=3, column=0, columnspan=4, sticky="w", pady=(0, 6))
+
+    ttk.Label(frm, text="ไฟล์ปลายทาง:").grid(row=4, column=0, sticky="e", pady=4)
+    csv_path_var = tk.StringVar()
+    entry_csv = ttk.Entry(frm, textvariable=csv_path_var, width=32)
+    entry_csv.grid(row=4, column=1, pady=4, sticky="w", columnspan=2)
+    entry_csv.insert(0, "spacebar_news")
+    def choose_csv_path():
+        filename = filedialog.asksaveasfilename(
+            defaultextension="",
+            filetypes=[
+                ("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl"), ("Parquet files", "*.parquet"), ("Excel files", "*.xlsx"),
+                ("JSON files", "*.json"), ("Text files", "*.txt"), ("All files", "*.*")]
+            ,
+            initialfile=entry_csv.get().strip() or "spacebar_news"
+        )
+        if filename:
+            # ใช้ basename ไม่เอานามสกุล
+            name_only = os.path.splitext(os.path.basename(filename))[0]
+            csv_path_var.set(name_only)
+    btn_choose_path = ttk.Button(frm, text="เลือก...", command=choose_csv_path)
+    btn_choose_path.grid(row=4, column=3, padx=2)
+
+    ttk.Label(frm, text="Export เป็นไฟล์:").grid(row=5, column=0, sticky="e", pady=4)
+    dropdown_format = ttk.Combobox(frm, values=EXPORT_FORMATS, state="readonly", width=10)
+    dropdown_format.set("CSV")
+    dropdown_format.grid(row=5, column=1, pady=4, sticky="w")
+
+    export_new_var = tk.IntVar(value=1)
+    cb_export_new = tk.Checkbutton(frm, text="Export เฉพาะข่าวใหม่ (เทียบไฟล์เดิม)", variable=export_new_var)
+    cb_export_new.grid(row=5, column=2, columnspan=2, sticky="w", pady=2)
+
+    incremental_var = tk.IntVar(value=0)
+    cb_incremental = tk.Checkbutton(frm, text="Incremental (หยุดเมื่อเจอข่าวเดิม)", variable=incremental_var)
+    cb_incremental.grid(row=6, column=0, columnspan=2, sticky="w", pady=2)
+    ttk.Label(frm, text="ข่าวเดิมติดกัน (0=ทั้งหน้า):").grid(row=6, column=2, sticky="e", pady=2)
+    entry_stop_known = ttk.Entry(frm, width=8)
+    entry_stop_known.grid(row=6, column=3, sticky="w", pady=2)
+    entry_stop_known.insert(0, "0")
+
+    stream_var = tk.IntVar(value=1)
+    cb_stream = tk.Checkbutton(frm, text="เขียนไฟล์ทีละข่าว (CSV/JSONL/Parquet)", variable=stream_var)
+    cb_stream.grid(row=7, column=0, columnspan=2, sticky="w", pady=2)
+    ttk.Label(frm, text="Parquet บีบอัด:").grid(row=7, column=2, sticky="e", pady=2)
+    dropdown_compression = ttk.Combobox(frm, values=PARQUET_COMPRESSIONS, state="readonly", width=7)
+    dropdown_compression.set(DEFAULT_PARQUET_COMPRESSION)
+    dropdown_compression.grid(row=7, column=3, sticky="w", pady=2)
+
+    append_var = tk.IntVar(value=0)
+    cb_append = tk.Checkbutton(frm, text="ต่อท้ายไฟล์เดิม (CSV/JSONL/Parquet, ไม่เขียนทับข่าวเดิม)", variable=append_var)
+    cb_append.grid(row=8, column=0, columnspan=4, sticky="w", pady=2)
+
+    btn_start = ttk.Button(frm, text="เริ่มดึงข่าว", width=20)
+    btn_start.grid(row=9, column=0, columnspan=4, pady=14, ipadx=8)
+
+    progress_bar = ttk.Progressbar(frm, length=350, mode="determinate")
+    progress_bar.grid(row=10, column=0, columnspan=4, pady=(3, 0))
+
+    label_current_page = ttk.Label(frm, text="", foreground="#0076D6", font=("Segoe UI", 10, "bold"))
+    label_current_page.grid(row=11, column=0, columnspan=4, pady=(2, 2), sticky="w")
+
+    ttk.Label(frm, text="Log:").grid(row=12, column=0, columnspan=4, sticky="w")
+    log_text = tk.Text(frm, height=12, width=58, state="disabled", bg="#f8fafb", fg="#333", wrap="word", font=("Consolas", 10))
+    log_text.grid(row=13, column=0, columnspan=4, pady=4)
+
+    # thread ที่ดึงข่าวไม่แตะ Tk เอง: ส่งทุกอย่างผ่าน ui_queue แล้ว poll_ui วาดบน Tk thread ทีละชุด
+    ui_queue = queue.Queue()
+    log_view = LogView(log_text)
+
+    def handle_ui(message):
+        kind, data = message
+        if kind == "LOG":
+            log_view.add(data)
+        elif kind == "PROGRESS":
+            val, maxval = data
+            progress_bar["maximum"] = maxval
+            progress_bar["value"] = val
+        elif kind == "PAGE":
+            label_current_page.config(text=data)
+        elif kind == "CALL":
+            log_view.flush()  # ให้เห็น log ล่าสุดก่อนเปิด dialog
+            data()
+
+    def poll_ui():
+        busy = False
         try:
-            date_start = datetime.strptime(date_start_str, "%Y-%m-%d")
-        except Exception:
-            messagebox.showerror("Error", "วันที่เริ่มต้นไม่ถูกต้อง! ใช้รูปแบบ yyyy-mm-dd")
-            entry_date_start.focus()
-            return
-    if date_end_str:
+            busy = drain_queue(ui_queue, handle_ui)
+        finally:
+            log_view.flush()
+            root.after(BUSY_POLL_INTERVAL if busy else POLL_INTERVAL, poll_ui)
+
+    root.after(POLL_INTERVAL, poll_ui)
+
+    darkmode_var = tk.IntVar()
+    def toggle_dark_mode():
+        mode = darkmode_var.get()
+        style = ttk.Style()
+        if mode:
+            root.configure(bg="#23272f")
+            frm.configure(style="Dark.TFrame")
+            style.configure("Dark.TFrame", background="#23272f")
+            style.configure("Dark.TLabel", background="#23272f", foreground="#e3eaf7")
+            style.configure("Dark.TButton", background="#394150", foreground="#c9d1e9")
+            style.configure("Dark.TCombobox", fieldbackground="#394150", background="#394150", foreground="#e3eaf7")
+            style.configure("Dark.TEntry", fieldbackground="#394150", background="#394150", foreground="#e3eaf7")
+            for widget in frm.winfo_children():
+                if isinstance(widget, ttk.Entry) or isinstance(widget, ttk.Combobox):
+                    widget.configure(style="Dark.TEntry" if isinstance(widget, ttk.Entry) else "Dark.TCombobox")
+                elif isinstance(widget, ttk.Label):
+                    widget.configure(style="Dark.TLabel")
+                elif isinstance(widget, ttk.Button):
+                    widget.configure(style="Dark.TButton")
+            log_text.config(bg="#242933", fg="#e3eaf7")
+            label_current_page.config(foreground="#44aaff")
+        else:
+            root.configure(bg="#f6f7fb")
+            frm.configure(style="TFrame")
+            for widget in frm.winfo_children():
+                if isinstance(widget, ttk.Entry) or isinstance(widget, ttk.Combobox):
+                    widget.configure(style="TEntry" if isinstance(widget, ttk.Entry) else "TCombobox")
+                elif isinstance(widget, ttk.Label):
+                    widget.configure(style="TLabel")
+                elif isinstance(widget, ttk.Button):
+                    widget.configure(style="TButton")
+            log_text.config(bg="#f8fafb", fg="#333")
+            label_current_page.config(foreground="#0076D6")
+    cb_dark = tk.Checkbutton(frm, text="Dark mode", variable=darkmode_var, command=toggle_dark_mode)
+    cb_dark.grid(row=14, column=0, sticky="w", pady=8, columnspan=4)
+
+    def run_scraper():
         try:
-            date_end = datetime.strptime(date_end_str, "%Y-%m-%d")
+            start = int(entry_start.get()) if entry_start.get().strip() else 1
+            end = int(entry_end.get()) if entry_end.get().strip() else 1
+            if start < 1: start = 1
         except Exception:
-            messagebox.showerror("Error", "วันที่สิ้นสุดไม่ถูกต้อง! ใช้รูปแบบ yyyy-mm-dd")
-            entry_date_end.focus()
+            start, end = 1, 1
+
+        date_start_str = entry_date_start.get().strip()
+        date_end_str = entry_date_end.get().strip()
+        date_start = None
+        date_end = None
+        if date_start_str:
+            try:
+                date_start = datetime.strptime(date_start_str, "%Y-%m-%d")
+            except Exception:
+                messagebox.showerror("Error", "วันที่เริ่มต้นไม่ถูกต้อง! ใช้รูปแบบ yyyy-mm-dd")
+                entry_date_start.focus()
+                return
+        if date_end_str:
+            try:
+                date_end = datetime.strptime(date_end_str, "%Y-%m-%d")
+            except Exception:
+                messagebox.showerror("Error", "วันที่สิ้นสุดไม่ถูกต้อง! ใช้รูปแบบ yyyy-mm-dd")
+                entry_date_end.focus()
+                return
+
+        # ---- Generate export path ----
+        file_basename = csv_path_var.get().strip()
+        file_type = dropdown_format.get()
+        if not file_basename:
+            messagebox.showerror("Error", "กรุณากำหนดชื่อไฟล์ (ไม่ต้องใส่นามสกุล)")
             return
+        ext = EXPORT_EXT[file_type]
+        export_path = file_basename + ext
 
-    # ---- Generate export path ----
-    file_basename = csv_path_var.get().strip()
-    file_type = dropdown_format.get()
-    if not file_basename:
-        messagebox.showerror("Error", "กรุณากำหนดชื่อไฟล์ (ไม่ต้องใส่นามสกุล)")
-        return
-    ext = EXPORT_EXT[file_type]
-    export_path = file_basename + ext
-
-    cat_display = [dropdown_category.get()]
-    cat_code = CATEGORIES[cat_display[0]]
-
-    format_type = file_type
-    export_only_new = export_new_var.get()
-
-    entry_start.config(state="disabled")
-    entry_end.config(state="disabled")
-    dropdown_category.config(state="disabled")
-    btn_choose_path.config(state="disabled")
-    btn_start.config(state="disabled")
-    entry_date_start.config(state="disabled")
-    entry_date_end.config(state="disabled")
-    dropdown_format.config(state="disabled")
-    cb_export_new.config(state="disabled")
-
-    progress_bar["mode"] = "determinate"
-    progress_bar["value"] = 0
-
-    log_text.config(state="normal")
-    log_text.delete(1.0, tk.END)
-    log_text.config(state="disabled")
-
-    label_current_page.config(text="")  # reset
-
-    def log_func(msg):
-        log_text.config(state="normal")
-        log_text.insert(tk.END, msg + "\n")
-        log_text.see(tk.END)
-        log_text.config(state="disabled")
-        log_text.update_idletasks()
-    def progress_func(val, maxval):
-        progress_bar["maximum"] = maxval
-        progress_bar["value"] = val
-        progress_bar.update_idletasks()
-    def page_callback(current, end_val):
-        if end_val:
-            label_current_page.config(text=f"กำลังดึงหน้าที่: {current} / {end_val}")
+        if dropdown_category.get() == ALL_CATEGORIES:
+            cat_display = list(CATEGORIES.keys())
         else:
-            label_current_page.config(text=f"หน้าปัจจุบัน: {current} (ดึงจนจบ)")
-        label_current_page.update_idletasks()
-
-    def enable_all():
-        entry_start.config(state="normal")
-        entry_end.config(state="normal")
-        dropdown_category.config(state="readonly")
-        btn_choose_path.config(state="normal")
-        btn_start.config(state="normal")
-        entry_date_start.config(state="normal")
-        entry_date_end.config(state="normal")
-        dropdown_format.config(state="readonly")
-        cb_export_new.config(state="normal")
-        progress_bar.stop()
+            cat_display = [dropdown_category.get()]
+        cat_codes = [CATEGORIES[c] for c in cat_display]
+
+        format_type = file_type
+        compression = dropdown_compression.get()
+        # ต่อท้ายไฟล์เดิม: CSV/JSONL เขียนแถวใหม่ท้ายไฟล์, Parquet เพิ่มไฟล์ part ใหม่ใน dataset directory (ข่าวที่มีอยู่แล้วไม่ export ซ้ำ)
+        append_mode = bool(append_var.get()) and can_append(export_path) and os.path.exists(export_path)
+        export_only_new = export_new_var.get() or append_mode
+        incremental = incremental_var.get()
+        streaming = stream_var.get() and stream_format_for(export_path) is not None
+        try:
+            stop_after_known = int(entry_stop_known.get()) if entry_stop_known.get().strip() else 0
+            if stop_after_known < 0: stop_after_known = 0
+        except Exception:
+            stop_after_known = 0
+
+        entry_start.config(state="disabled")
+        entry_end.config(state="disabled")
+        dropdown_category.config(state="disabled")
+        btn_choose_path.config(state="disabled")
+        btn_start.config(state="disabled")
+        entry_date_start.config(state="disabled")
+        entry_date_end.config(state="disabled")
+        dropdown_format.config(state="disabled")
+        cb_export_new.config(state="disabled")
+        cb_incremental.config(state="disabled")
+        entry_stop_known.config(state="disabled")
+        cb_stream.config(state="disabled")
+        dropdown_compression.config(state="disabled")
+        cb_append.config(state="disabled")
+
         progress_bar["mode"] = "determinate"
-        progress_bar.update_idletasks()
-        label_current_page.config(text="")
+        progress_bar["value"] = 0
 
-    def wrapper():
-        if (not date_start_str and not date_end_str):
-            log_func("**ไม่ได้กำหนดช่วงวันที่ จะดึงข่าวตามหน้า (page) ที่เลือก**")
-        else:
-            log_func("**กำลังกรองข่าวเฉพาะในช่วงวันที่**")
+        log_view.clear()
 
-        all_articles = scrape_news(
-            cat_code, start, end, log_func, progress_func,
-            date_start=date_start, date_end=date_end,
-            page_callback=page_callback
-        )
-        if not all_articles:
-            log_func("ไม่พบข่าวตามเงื่อนไข")
-            enable_all()
-            return
-        df_all = pd.DataFrame(all_articles)
-        df_new = df_all
-        if export_only_new:
-            existing_urls = read_existing_urls(export_path)
-            df_new = df_all[~df_all["URL"].isin(existing_urls)]
-            log_func(f"ข่าวใหม่ที่จะ export: {len(df_new)} ข่าว")
-        else:
-            log_func(f"ข่าวทั้งหมดที่จะ export: {len(df_all)} ข่าว")
-        if len(df_new) == 0:
-            messagebox.showinfo("ไม่มีข่าวใหม่", "ไม่มีข่าวใหม่ที่จะ export")
-        else:
-            export_news(df_new, export_path, format_type)
-            log_func(f"[Done] Export {len(df_new)} ข่าวเป็น {export_path}")
-        show_summary(df_all, df_new, cat_display)
-        enable_all()
-    threading.Thread(target=wrapper).start()
+        label_current_page.config(text="")  # reset
+
+        # ฟังก์ชันเหล่านี้ถูกเรียกจาก thread ที่ดึงข่าว: แค่ใส่ลง ui_queue ไม่รอ UI
+        def log_func(msg):
+            ui_queue.put(("LOG", msg))
+        def progress_func(val, maxval):
+            ui_queue.put(("PROGRESS", (val, maxval)))
+        def page_callback(current, end_val):
+            if end_val:
+                ui_queue.put(("PAGE", f"กำลังดึงหน้าที่: {current} / {end_val}"))
+            else:
+                ui_queue.put(("PAGE", f"หน้าปัจจุบัน: {current} (ดึงจนจบ)"))
+        category_pages = {}
+        category_lock = threading.Lock()
+        def category_callback(category, current, end_val):
+            with category_lock:
+                category_pages[category] = current
+                text = "หน้าปัจจุบัน: " + ", ".join(f"{c} {p}" for c, p in category_pages.items())
+            ui_queue.put(("PAGE", text))
+        def on_ui(func):
+            ui_queue.put(("CALL", func))
+        def crawl(**kwargs):
+            if len(cat_codes) > 1:
+                return scrape_categories(cat_codes, start, end, log_func, progress_func, category_callback=category_callback, **kwargs)
+            return scrape_news(cat_codes[0], start, end, log_func, progress_func, page_callback=page_callback, **kwargs)
+
+        def enable_all():
+            entry_start.config(state="normal")
+            entry_end.config(state="normal")
+            dropdown_category.config(state="readonly")
+            btn_choose_path.config(state="normal")
+            btn_start.config(state="normal")
+            entry_date_start.config(state="normal")
+            entry_date_end.config(state="normal")
+            dropdown_format.config(state="readonly")
+            cb_export_new.config(state="normal")
+            cb_incremental.config(state="normal")
+            entry_stop_known.config(state="normal")
+            cb_stream.config(state="normal")
+            dropdown_compression.config(state="readonly")
+            cb_append.config(state="normal")
+            progress_bar.stop()
+            progress_bar["mode"] = "determinate"
+            progress_bar.update_idletasks()
+            label_current_page.config(text="")
+
+        def wrapper():
+            # error ใดๆ ระหว่างดึง/export ต้องแสดงใน log และเปิดปุ่มกลับมาเสมอ ไม่ให้ GUI ค้างอยู่ในสถานะกำลังทำงาน
+            url_index = None
+            try:
+                if (not date_start_str and not date_end_str):
+                    log_func("**ไม่ได้กำหนดช่วงวันที่ จะดึงข่าวตามหน้า (page) ที่เลือก**")
+                else:
+                    log_func("**กำลังกรองข่าวเฉพาะในช่วงวันที่**")
+
+                # index URL ข้างไฟล์ export (สร้างจากไฟล์เดิมครั้งเดียวถ้ายังไม่มี)
+                url_index = UrlIndex.open_for(export_path)
+                existing_urls = url_index
+                if incremental:
+                    log_func(f"**Incremental: ข้ามข่าวที่มีอยู่แล้ว {len(existing_urls)} ข่าวใน {export_path}**")
+                if append_mode:
+                    log_func(f"**ต่อท้ายไฟล์เดิม: {export_path} (มีอยู่แล้ว {len(existing_urls)} ข่าว)**")
+                elif append_var.get() and os.path.exists(export_path) and not can_append(export_path):
+                    log_func(f"**{format_type} ต่อท้ายไม่ได้: ไฟล์ {export_path} จะถูกเขียนทับ**")
+
+                if streaming:
+                    # เขียนลง <ไฟล์>.part ทีละข่าว แล้วเปลี่ยนชื่อเป็นไฟล์จริงเมื่อจบ (แม้จะ error กลางทาง)
+                    writer = open_stream_writer(export_path, EXPORT_COLUMNS, compression=compression, append=append_mode)
+                    counts = {}
+                    def on_article(article):
+                        counts[article["หมวด"]] = counts.get(article["หมวด"], 0) + 1
+                        if export_only_new and article["URL"] in existing_urls:
+                            return
+                        writer.write(article)
+                    log_func(f"**Streaming: เขียนข่าวลง {writer.part_path} ทันทีที่ดึงได้**")
+                    try:
+                        crawl(
+                            date_start=date_start, date_end=date_end,
+                            known_urls=existing_urls if incremental else None,
+                            stop_after_known=stop_after_known,
+                            on_article=on_article
+                        )
+                    finally:
+                        if writer.count:
+                            writer.close()
+                            if append_mode or writer.fmt == "sqlite":
+                                url_index.add_many(writer.urls)
+                            else:
+                                url_index.reset(writer.urls)
+                            url_index.sync(export_path)
+                        else:
+                            writer.discard()
+                        url_index.close()
+                    total = sum(counts.values())
+                    if not total:
+                        log_func("ไม่พบข่าวตามเงื่อนไข")
+                        return
+                    if writer.count:
+                        log_func(f"[Done] Export {writer.count} ข่าวเป็น {export_path}")
+                    def finish_stream():
+                        if writer.count == 0:
+                            messagebox.showinfo("ไม่มีข่าวใหม่", "ไม่มีข่าวใหม่ที่จะ export")
+                        show_summary(total, writer.count, counts, cat_display)
+                    on_ui(finish_stream)
+                    return
+
+                all_articles = crawl(
+                    date_start=date_start, date_end=date_end,
+                    known_urls=existing_urls if incremental else None,
+                    stop_after_known=stop_after_known
+                )
+                if not all_articles:
+                    log_func("ไม่พบข่าวตามเงื่อนไข")
+                    return
+                import pandas as pd  # โหลดเฉพาะตอน export แบบรวมทั้งก้อน
+                df_all = pd.DataFrame(all_articles)
+                df_new = df_all
+                if export_only_new:
+                    df_new = df_all[~df_all["URL"].isin(existing_urls.known(df_all["URL"]))]
+                    log_func(f"ข่าวใหม่ที่จะ export: {len(df_new)} ข่าว")
+                else:
+                    log_func(f"ข่าวทั้งหมดที่จะ export: {len(df_all)} ข่าว")
+                if len(df_new):
+                    export_news(df_new, export_path, format_type, url_index=url_index, compression=compression, append=append_mode)
+                    log_func(f"[Done] Export {len(df_new)} ข่าวเป็น {export_path}")
+                counts = df_all['หมวด'].value_counts()
+                def finish_export():
+                    if len(df_new) == 0:
+                        messagebox.showinfo("ไม่มีข่าวใหม่", "ไม่มีข่าวใหม่ที่จะ export")
+                    show_summary(len(df_all), len(df_new), counts, cat_display)
+                on_ui(finish_export)
+            except Exception as e:
+                log_func(f"[Error] ดึงข่าว/export ไม่สำเร็จ: {e}")
+                error = str(e)
+                on_ui(lambda: messagebox.showerror("Error", f"ดึงข่าว/export ไม่สำเร็จ: {error}"))
+            finally:
+                if url_index is not None:
+                    url_index.close()
+                on_ui(enable_all)
+        threading.Thread(target=wrapper).start()
+
+    btn_start.config(command=run_scraper)
 
-btn_start.config(command=run_scraper)
+    root.mainloop()
 
-root.mainloop()
+if __name__ == "__main__":
+    main()
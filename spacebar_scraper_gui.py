@@ -1,18 +1,19 @@
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 import os
 import threading
 import queue
-import time
 import datetime
-from urllib.parse import urljoin
-from typing import List, Dict, Set, Optional, Tuple, Any
+from typing import Any, List, Dict, Optional, Tuple
+
+from spacebar_core import (
+    SpacebarScraper, CATEGORIES, DEFAULT_WORKERS, MAX_WORKERS, MAX_PARSE_WORKERS, NO_MULTI_RESUME_MSG,
+)
+from spacebar_cache import HttpCache, DEFAULT_CACHE_PATH
+from spacebar_checkpoint import CrawlJournal, describe as describe_checkpoint
+from spacebar_parsing import available_parsers, DEFAULT_PARSER
+from spacebar_metrics import summarize as summarize_metrics
+from spacebar_logview import LogView, drain_queue, POLL_INTERVAL, BUSY_POLL_INTERVAL
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 import tkinter as tk
 from tkinter import filedialog
 import ttkbootstrap as ttk
@@ -21,226 +22,8 @@ from ttkbootstrap.toast import ToastNotification
 from ttkbootstrap.dialogs import Messagebox
 
 # --- Constants & Configuration ---
-CATEGORIES = {
-    "การเมือง (Politics)": "politics",
-    "ธุรกิจ (Business)": "business",
-    "สังคม (Social)": "social",
-    "โลก (World)": "world",
-    "วัฒนธรรม (Culture)": "culture",
-    "ไลฟ์สไตล์ (Lifestyle)": "lifestyle",
-    "กีฬา (Sport)": "sport",
-    "Deep Space (บทความพิเศษ)": "deep-space"
-}
-
 APP_TITLE = "Spacebar News Scraper Pro"
 APP_SIZE = (580, 780)  # Slightly larger for better spacing
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-}
-
-# --- Logic Layer: Scraper ---
-class SpacebarScraper:
-    """
-    Business Logic Layer: Handles the web scraping process.
-    """
-    def __init__(self, msg_queue: queue.Queue):
-        self.msg_queue = msg_queue
-        self.stop_event = threading.Event()
-
-    def log(self, message: str) -> None:
-        """Sends a log message to the GUI."""
-        self.msg_queue.put(("LOG", message))
-
-    def progress(self, value: int, maximum: Optional[int] = None) -> None:
-        """Sends a progress update to the GUI."""
-        self.msg_queue.put(("PROGRESS", (value, maximum)))
-    
-    def status_update(self, message: str) -> None:
-        """Sends a status label update to the GUI."""
-        self.msg_queue.put(("STATUS", message))
-
-    def done(self, success: bool, summary: str) -> None:
-        """Signals completion or failure."""
-        self.msg_queue.put(("DONE", (success, summary)))
-
-    def get_normal_news_links(self, soup: BeautifulSoup) -> List[Any]:
-        """Extracts standard article links from the soup object, avoiding highlights if needed."""
-        # Remove highlight block to avoid duplicates if necessary
-        highlight_header = soup.find("h2", string="เรื่องเด่นประจำวัน")
-        if highlight_header:
-            highlight_block = highlight_header.find_parent("div", class_="w-full")
-            if highlight_block:
-                highlight_block.decompose()
-        # Find all article links
-        news_links = soup.find_all("a", attrs={"aria-label": ["articleLink", "latestArticleLink"]})
-        return news_links
-
-    def run(self, category: str, start_page: int, end_page: int, csv_path: str) -> None:
-        """
-        Main scraping loop.
-        
-        Args:
-            category: The category slug to scrape.
-            start_page: Page number to start from.
-            end_page: Page number to end at (0 for until end).
-            csv_path: File path to save the CSV.
-        """
-        base_url = "https://spacebar.th"
-        articles: List[Dict[str, str]] = []
-        seen_urls: Set[str] = set()
-        total_scraped = 0
-        page = start_page
-        start_time = time.time()
-        
-        self.log(f"--- เริ่มต้นดึงข้อมูล: {category} (หน้า {start_page} - {end_page if end_page > 0 else 'จนจบ'}) ---")
-        
-        try:
-            with requests.Session() as session:
-                session.headers.update(HEADERS)
-                
-                while not self.stop_event.is_set():
-                    # Check end condition
-                    if end_page != 0 and page > end_page:
-                        break
-
-                    # Update Status
-                    self.status_update(f"กำลังประมวลผลหน้าที่ {page}...")
-                    
-                    # Update Progress Bar (Page based)
-                    if end_page != 0:
-                        self.progress(page - start_page, end_page - start_page + 1)
-                    else:
-                        self.progress(0, 0) # Indeterminate mode
-
-                    # Construct URL safely
-                    if page == 1:
-                        category_url = urljoin(base_url, f"/category/{category}")
-                    else:
-                        category_url = urljoin(base_url, f"/category/{category}/page/{page}")
-                    
-                    self.log(f"Loading Page: {category_url}")
-
-                    try:
-                        resp = session.get(category_url, timeout=20)
-                        resp.raise_for_status()
-                    except Exception as e:
-                        self.log(f"[Error] Failed page {page}: {e}")
-                        time.sleep(2)
-                        page += 1
-                        continue
-
-                    resp.encoding = "utf-8"
-                    soup = BeautifulSoup(resp.text, "html.parser")
-                    news_links = self.get_normal_news_links(soup)
-
-                    if not news_links:
-                        self.log(f"[Info] No more news at page {page}. Stopping.")
-                        break
-
-                    found_this_page = 0
-                    
-                    # Process each news link
-                    for idx, link in enumerate(news_links, start=1):
-                        if self.stop_event.is_set():
-                            break
-
-                        try:
-                            # 1. Extract Headline from listing
-                            headline_div = link.find("div", class_="w-full text-base font-semibold text-gray-700 hover:text-accentual-blue-main mb-2 line-clamp-3")
-                            if headline_div:
-                                headline = headline_div.get_text(strip=True)
-                            else:
-                                headline_tag = link.find("h3")
-                                headline = headline_tag.get_text(strip=True) if headline_tag else "No Headline"
-
-                            # 2. Extract URL
-                            raw_url = link.get("href", "")
-                            news_url = urljoin(base_url, raw_url)
-                            
-                            # Filter
-                            if f"/{category}/" not in news_url and not news_url.endswith(f"/{category}"):
-                                continue
-                            if news_url in seen_urls:
-                                continue
-                            
-                            seen_urls.add(news_url)
-
-                            # 3. Enter News Page
-                            try:
-                                news_resp = session.get(news_url, timeout=15)
-                                news_resp.raise_for_status()
-                            except Exception as e:
-                                self.log(f"  [Skip] Content load failed: {news_url} ({e})")
-                                continue
-
-                            news_resp.encoding = "utf-8"
-                            news_soup = BeautifulSoup(news_resp.text, "html.parser")
-
-                            # Title
-                            title_tag = news_soup.find("h1", class_="article-title")
-                            title = title_tag.get_text(strip=True) if title_tag else headline
-
-                            # Date
-                            date_tag = news_soup.find("p", class_="text-gray-400 text-subheadsm mb-4 md:mb-0")
-                            date = date_tag.get_text(strip=True) if date_tag else "-"
-
-                            # Content
-                            content_div = news_soup.find("div", class_="payload-richtext")
-                            content = ""
-                            if content_div:
-                                # Extract text with newlines for readability
-                                content_parts = []
-                                for tag in content_div.find_all(['p', 'li', 'blockquote', 'h2', 'h3']):
-                                    text = tag.get_text(strip=True)
-                                    if text:
-                                        content_parts.append(text)
-                                content = "\n\n".join(content_parts)
-                            
-                            # Add to list
-                            articles.append({
-                                "หัวข้อ": title,
-                                "เนื้อหา": content,
-                                "วันที่": date,
-                                "URL": news_url,
-                            })
-
-                            found_this_page += 1
-                            total_scraped += 1
-                            self.log(f"  + [{total_scraped}] {title[:40]}... | {date}")
-                            
-                            # Politeness delay
-                            time.sleep(0.5)
-
-                        except Exception as inner_e:
-                            self.log(f"  [Error] Parsing item {idx}: {inner_e}")
-
-                    self.log(f"[Summary] Page {page}: Found {found_this_page} new articles")
-                    
-                    if found_this_page == 0:
-                        self.log(f"[Info] No items matched criteria on page {page}.")
-                        break
-
-                    page += 1
-
-            # Save to CSV
-            elapsed = time.time() - start_time
-            if articles:
-                df = pd.DataFrame(articles)
-                # Ensure directory exists
-                os.makedirs(os.path.dirname(os.path.abspath(csv_path)) or ".", exist_ok=True)
-                
-                df.to_csv(csv_path, index=False, encoding="utf-8-sig")
-                msg = f"Saved successfully: {csv_path}\nTotal Articles: {total_scraped}\nTime: {elapsed:.2f}s"
-                self.log(">>> " + msg.replace("\n", " | "))
-                self.done(True, msg)
-            else:
-                msg = f"No articles found.\nTime: {elapsed:.2f}s"
-                self.log(msg)
-                self.done(False, msg)
-
-        except Exception as e:
-            self.log(f"[CRITICAL ERROR] {e}")
-            self.done(False, f"Critical Error: {e}")
 
 # --- Presentation Layer: GUI (Material Design) ---
 class SpacebarGUI:
@@ -258,11 +41,12 @@ class SpacebarGUI:
         self.scraper: Optional[SpacebarScraper] = None
 
         self.last_saved_path: Optional[str] = None
+        self.http_cache: Optional[HttpCache] = None  # Opened on first use, shared across runs
 
         self.build_ui()
         
         # Start queue monitor
-        self.root.after(100, self.monitor_queue)
+        self.root.after(POLL_INTERVAL, self.monitor_queue)
         self.root.mainloop()
 
     def build_ui(self):
@@ -284,9 +68,23 @@ class SpacebarGUI:
 
         # Category
         ttk.Label(settings_frame, text="หมวดหมู่ข่าว (Category)", font=("Segoe UI", 10)).pack(anchor=W, pady=(0, 5))
+        category_frame = ttk.Frame(settings_frame)
+        category_frame.pack(fill=X, pady=(0, 10))
         self.category_var = tk.StringVar(value=list(CATEGORIES.keys())[0])
-        self.cb_category = ttk.Combobox(settings_frame, textvariable=self.category_var, values=list(CATEGORIES.keys()), state="readonly", bootstyle="primary")
-        self.cb_category.pack(fill=X, pady=(0, 10))
+        self.cb_category = ttk.Combobox(category_frame, textvariable=self.category_var, values=list(CATEGORIES.keys()), state="readonly", bootstyle="primary")
+        self.cb_category.pack(side=LEFT, fill=X, expand=YES)
+
+        # Multi-Category: ticked categories are crawled together (the combobox is then ignored)
+        self.multi_vars = {name: tk.BooleanVar(value=False) for name in CATEGORIES}
+        self.btn_multi = ttk.Menubutton(category_frame, text="Multi", bootstyle="outline-secondary")
+        multi_menu = tk.Menu(self.btn_multi, tearoff=0)
+        for name, var in self.multi_vars.items():
+            multi_menu.add_checkbutton(label=name, variable=var, command=self.update_multi_selection)
+        multi_menu.add_separator()
+        multi_menu.add_command(label="เลือกทั้งหมด (All)", command=lambda: self.select_all_categories(True))
+        multi_menu.add_command(label="ล้าง (Clear)", command=lambda: self.select_all_categories(False))
+        self.btn_multi["menu"] = multi_menu
+        self.btn_multi.pack(side=LEFT, padx=(5, 0))
 
         # Pages Row
         page_frame = ttk.Frame(settings_frame)
@@ -302,12 +100,28 @@ class SpacebarGUI:
 
         # End Page
         end_group = ttk.Frame(page_frame)
-        end_group.pack(side=LEFT, fill=X, expand=YES)
+        end_group.pack(side=LEFT, fill=X, expand=YES, padx=(0, 10))
         ttk.Label(end_group, text="ถึงหน้า (End) [0=All]").pack(anchor=W)
         self.entry_end = ttk.Spinbox(end_group, from_=0, to=9999, bootstyle="secondary")
         self.entry_end.set("1")
         self.entry_end.pack(fill=X)
 
+        # Concurrent Workers
+        workers_group = ttk.Frame(page_frame)
+        workers_group.pack(side=LEFT, fill=X, expand=YES, padx=(0, 10))
+        ttk.Label(workers_group, text="Workers (Parallel)").pack(anchor=W)
+        self.entry_workers = ttk.Spinbox(workers_group, from_=1, to=MAX_WORKERS, bootstyle="secondary")
+        self.entry_workers.set(str(DEFAULT_WORKERS))
+        self.entry_workers.pack(fill=X)
+
+        # Parse Processes
+        procs_group = ttk.Frame(page_frame)
+        procs_group.pack(side=LEFT, fill=X, expand=YES)
+        ttk.Label(procs_group, text="Parse Procs [0=Off]").pack(anchor=W)
+        self.entry_procs = ttk.Spinbox(procs_group, from_=0, to=MAX_PARSE_WORKERS, bootstyle="secondary")
+        self.entry_procs.set("0")
+        self.entry_procs.pack(fill=X)
+
         # File Path
         ttk.Label(settings_frame, text="บันทึกไฟล์ (Save Path)").pack(anchor=W, pady=(0, 5))
         file_frame = ttk.Frame(settings_frame)
@@ -318,6 +132,27 @@ class SpacebarGUI:
         self.entry_path.pack(side=LEFT, fill=X, expand=YES)
         ttk.Button(file_frame, text="📂", width=4, command=self.browse_file, bootstyle="outline-secondary").pack(side=LEFT, padx=(5, 0))
 
+        # Options
+        options_frame = ttk.Frame(settings_frame)
+        options_frame.pack(fill=X, pady=(10, 0))
+
+        self.use_cache_var = tk.BooleanVar(value=True)
+        self.chk_cache = ttk.Checkbutton(options_frame, text="HTTP Cache (ETag/304)", variable=self.use_cache_var, bootstyle="round-toggle")
+        self.chk_cache.pack(side=LEFT)
+
+        self.stream_var = tk.BooleanVar(value=True)
+        self.chk_stream = ttk.Checkbutton(options_frame, text="Streaming Write", variable=self.stream_var, bootstyle="round-toggle")
+        self.chk_stream.pack(side=LEFT, padx=(10, 0))
+
+        self.split_var = tk.BooleanVar(value=False)
+        self.chk_split = ttk.Checkbutton(options_frame, text="Split Files", variable=self.split_var, bootstyle="round-toggle")
+        self.chk_split.pack(side=LEFT, padx=(10, 0))
+
+        self.parser_var = tk.StringVar(value=DEFAULT_PARSER)
+        self.cb_parser = ttk.Combobox(options_frame, textvariable=self.parser_var, values=available_parsers(), state="readonly", width=12, bootstyle="secondary")
+        self.cb_parser.pack(side=RIGHT)
+        ttk.Label(options_frame, text="Parser").pack(side=RIGHT, padx=(0, 5))
+
         # --- Actions ---
         action_frame = ttk.Frame(main_frame)
         action_frame.pack(fill=X, pady=10)
@@ -325,6 +160,9 @@ class SpacebarGUI:
         self.btn_start = ttk.Button(action_frame, text="START SCRAPING", command=self.start_task, bootstyle="success", width=20)
         self.btn_start.pack(side=LEFT, fill=X, expand=YES, padx=(0, 5))
 
+        self.btn_resume = ttk.Button(action_frame, text="RESUME", command=self.resume_task, bootstyle="outline-success", width=10)
+        self.btn_resume.pack(side=LEFT, fill=X, expand=NO, padx=5)
+
         self.btn_stop = ttk.Button(action_frame, text="STOP", command=self.stop_task, bootstyle="danger", state="disabled", width=10)
         self.btn_stop.pack(side=LEFT, fill=X, expand=NO, padx=(5, 0))
 
@@ -347,6 +185,15 @@ class SpacebarGUI:
         self.lbl_status = ttk.Label(main_frame, text="Ready to scrape", font=("Segoe UI", 9), bootstyle="secondary")
         self.lbl_status.pack(anchor=W)
 
+        # Per-category progress of multi-category runs
+        self.category_progress: Dict[str, str] = {}
+        self.lbl_categories = ttk.Label(main_frame, text="", font=("Segoe UI", 8), bootstyle="secondary", wraplength=540)
+        self.lbl_categories.pack(anchor=W)
+
+        # Live crawl metrics (METRICS messages)
+        self.lbl_metrics = ttk.Label(main_frame, text="", font=("Segoe UI", 8), bootstyle="secondary", wraplength=540)
+        self.lbl_metrics.pack(anchor=W)
+
         self.progress = ttk.Floodgauge(main_frame, bootstyle="success", font=("Segoe UI", 8), mask="{}%", value=0, maximum=100)
         self.progress.pack(fill=X, pady=(5, 10))
 
@@ -355,9 +202,25 @@ class SpacebarGUI:
         # Log Text
         self.log_text = ttk.ScrolledText(main_frame, height=12, state="disabled", font=("Consolas", 9))
         self.log_text.pack(fill=BOTH, expand=YES)
+        # Lines are rendered in batches once per queue drain, and only the newest ones are kept
+        self.log_view = LogView(self.log_text)
+
+    def selected_categories(self) -> List[str]:
+        """Slugs of the categories ticked in the Multi menu."""
+        return [CATEGORIES[name] for name, var in self.multi_vars.items() if var.get()]
+
+    def update_multi_selection(self) -> None:
+        count = len(self.selected_categories())
+        self.btn_multi.configure(text=f"Multi ({count})" if count else "Multi")
+        self.cb_category.configure(state="disabled" if count else "readonly")
+
+    def select_all_categories(self, selected: bool) -> None:
+        for var in self.multi_vars.values():
+            var.set(selected)
+        self.update_multi_selection()
 
     def browse_file(self) -> None:
-        filename = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")], initialfile="spacebar_news.csv")
+        filename = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet"), ("SQLite", "*.sqlite")], initialfile="spacebar_news.csv")
         if filename:
             self.path_var.set(filename)
 
@@ -368,9 +231,7 @@ class SpacebarGUI:
         self.root.style.theme_use(new_theme)
     
     def clear_log(self) -> None:
-        self.log_text.config(state="normal")
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state="disabled")
+        self.log_view.clear()
 
     def open_output_folder(self) -> None:
         if self.last_saved_path and os.path.exists(self.last_saved_path):
@@ -380,10 +241,8 @@ class SpacebarGUI:
             Messagebox.show_warning("Folder path not found or file not saved yet.", "Path Error")
 
     def append_log(self, text: str) -> None:
-        self.log_text.config(state="normal")
-        self.log_text.insert(tk.END, f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {text}\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state="disabled")
+        """Queues a log line; it is drawn on the next :meth:`monitor_queue` tick."""
+        self.log_view.add(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {text}")
 
     def lock_ui(self, locked: bool) -> None:
         state = "disabled" if locked else "normal"
@@ -391,21 +250,35 @@ class SpacebarGUI:
         
         self.entry_start.configure(state=state)
         self.entry_end.configure(state=state)
+        self.entry_workers.configure(state=state)
+        self.entry_procs.configure(state=state)
         self.entry_path.configure(state=state)
         self.cb_category.configure(state=readonly)
+        self.btn_multi.configure(state=state)
+        self.chk_split.configure(state=state)
+        self.chk_cache.configure(state=state)
+        self.chk_stream.configure(state=state)
+        self.cb_parser.configure(state=readonly)
         self.btn_start.configure(state=state)
+        self.btn_resume.configure(state=state)
         self.btn_stop.configure(state="normal" if locked else "disabled")
         # Disable Open Folder while running to prevent confusion, re-enable if valid path exists later
         if locked:
            self.btn_open_folder.configure(state="disabled")
+        else:
+            self.update_multi_selection()
 
     def start_task(self) -> None:
         # Validation
         try:
             start = int(self.entry_start.get())
             end = int(self.entry_end.get())
+            workers = int(self.entry_workers.get())
+            procs = int(self.entry_procs.get())
             if start < 1: raise ValueError("Start Page must be >= 1")
             if end != 0 and end < start: raise ValueError("End Page must be >= Start Page (or 0)")
+            if not 1 <= workers <= MAX_WORKERS: raise ValueError(f"Workers must be between 1 and {MAX_WORKERS}")
+            if not 0 <= procs <= MAX_PARSE_WORKERS: raise ValueError(f"Parse Procs must be between 0 and {MAX_PARSE_WORKERS}")
         except ValueError as e:
             Messagebox.show_error(str(e), "Invalid Input")
             return
@@ -417,17 +290,68 @@ class SpacebarGUI:
 
         cat_name = self.category_var.get()
         cat_slug = CATEGORIES.get(cat_name, "politics")
+        categories = self.selected_categories()
 
         # Prepare UI
         self.lock_ui(True)
         self.progress.configure(value=0, maximum=100) # Reset
-        self.log_text.configure(state="normal")
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.configure(state="disabled")
+        self.clear_log()
+        self.category_progress.clear()
+        self.lbl_categories.config(text="")
+        self.lbl_metrics.config(text="")
         
+        cache = None
+        if self.use_cache_var.get():
+            if self.http_cache is None:
+                self.http_cache = HttpCache(DEFAULT_CACHE_PATH)
+            cache = self.http_cache
+
         # Init Scraper
-        self.scraper = SpacebarScraper(self.msg_queue)
-        self.scraper_thread = threading.Thread(target=self.scraper.run, args=(cat_slug, start, end, csv_path), daemon=True)
+        self.scraper = SpacebarScraper(self.msg_queue, max_workers=workers, cache=cache, parser=self.parser_var.get(),
+                                       stream=self.stream_var.get(), parse_workers=procs)
+        if len(categories) > 1:
+            self.scraper_thread = threading.Thread(target=self.scraper.run_many, args=(categories, start, end, csv_path, self.split_var.get()), daemon=True)
+        else:
+            if categories:
+                cat_slug = categories[0]
+            self.scraper_thread = threading.Thread(target=self.scraper.run, args=(cat_slug, start, end, csv_path), daemon=True)
+        self.scraper_thread.start()
+
+    def resume_task(self) -> None:
+        if len(self.selected_categories()) > 1:
+            Messagebox.show_error(f"{NO_MULTI_RESUME_MSG}.\nClear the Multi selection to resume a single-category crawl.", "Resume")
+            return
+        csv_path = self.path_var.get()
+        state = CrawlJournal.load(csv_path) if csv_path else None
+        if state is None:
+            Messagebox.show_info(f"No interrupted crawl found for:\n{csv_path}", "Resume")
+            return
+
+        try:
+            workers = int(self.entry_workers.get())
+            procs = int(self.entry_procs.get())
+            if not 1 <= workers <= MAX_WORKERS: raise ValueError(f"Workers must be between 1 and {MAX_WORKERS}")
+            if not 0 <= procs <= MAX_PARSE_WORKERS: raise ValueError(f"Parse Procs must be between 0 and {MAX_PARSE_WORKERS}")
+        except ValueError as e:
+            Messagebox.show_error(str(e), "Invalid Input")
+            return
+
+        # Prepare UI
+        self.lock_ui(True)
+        self.progress.configure(value=0, maximum=100) # Reset
+        self.clear_log()
+        for line in describe_checkpoint(state):
+            self.append_log(line)
+
+        cache = None
+        if self.use_cache_var.get():
+            if self.http_cache is None:
+                self.http_cache = HttpCache(DEFAULT_CACHE_PATH)
+            cache = self.http_cache
+
+        self.scraper = SpacebarScraper(self.msg_queue, max_workers=workers, cache=cache, parser=self.parser_var.get(), stream=True,
+                                       parse_workers=procs)
+        self.scraper_thread = threading.Thread(target=self.scraper.resume, args=(csv_path,), daemon=True)
         self.scraper_thread.start()
 
     def stop_task(self) -> None:
@@ -437,40 +361,57 @@ class SpacebarGUI:
             self.btn_stop.configure(state="disabled")
 
     def monitor_queue(self) -> None:
+        """
+        Handles scraper messages on the Tk thread.
+
+        Each tick drains the queue for a bounded time and draws the new log
+        lines with one insert, so a chatty crawl cannot freeze the window and
+        the scraper never waits for the UI.
+        """
+        busy = False
         try:
-            while True:
-                msg_type, data = self.msg_queue.get_nowait()
-                
-                if msg_type == "LOG":
-                    self.append_log(data)
-                elif msg_type == "STATUS":
-                    self.lbl_status.config(text=data)
-                elif msg_type == "PROGRESS":
-                    val, maximum = data
-                    if maximum:
-                        self.progress.configure(mode="determinate", maximum=maximum, value=val)
-                    else:
-                        self.progress.configure(mode="indeterminate")
-                        self.progress.start(10)
-                elif msg_type == "DONE":
-                    success, summary = data
-                    self.lock_ui(False)
-                    self.progress.stop()
-                    self.progress.configure(value=100)
-                    self.lbl_status.config(text="Finished" if success else "Stopped/Error")
-                    
-                    if success:
-                        self.last_saved_path = self.path_var.get()
-                        self.btn_open_folder.configure(state="normal")
-                        ToastNotification(title="Success", message=summary, bootstyle="success", duration=3000).show_toast()
-                    else:
-                        Messagebox.show_error(summary, "Error")
-                    
-                self.msg_queue.task_done()
-        except queue.Empty:
-            pass
+            busy = drain_queue(self.msg_queue, self.handle_message)
         finally:
-            self.root.after(100, self.monitor_queue)
+            self.log_view.flush()
+            self.root.after(BUSY_POLL_INTERVAL if busy else POLL_INTERVAL, self.monitor_queue)
+
+    def handle_message(self, message: Tuple[str, Any]) -> None:
+        msg_type, data = message
+
+        if msg_type == "LOG":
+            self.append_log(data)
+        elif msg_type == "STATUS":
+            self.lbl_status.config(text=data)
+        elif msg_type == "CATEGORY":
+            category, page, count, state = data
+            mark = {"done": " ✓", "error": " ✗"}.get(state, "")
+            self.category_progress[category] = f"{category}: p{page} · {count}{mark}"
+            self.lbl_categories.config(text="   ".join(self.category_progress.values()))
+        elif msg_type == "METRICS":
+            self.lbl_metrics.config(text=summarize_metrics(data))
+        elif msg_type == "PROGRESS":
+            val, maximum = data
+            if maximum:
+                self.progress.configure(mode="determinate", maximum=maximum, value=val)
+            else:
+                self.progress.configure(mode="indeterminate")
+                self.progress.start(10)
+        elif msg_type == "DONE":
+            success, summary = data
+            self.log_view.flush()  # Show the last lines before a dialog blocks the loop
+            self.lock_ui(False)
+            self.progress.stop()
+            self.progress.configure(value=100)
+            self.lbl_status.config(text="Finished" if success else "Stopped/Error")
+
+            if success:
+                self.last_saved_path = self.path_var.get()
+                self.btn_open_folder.configure(state="normal")
+                ToastNotification(title="Success", message=summary, bootstyle="success", duration=3000).show_toast()
+            else:
+                Messagebox.show_error(summary, "Error")
+
+        self.msg_queue.task_done()
 
 if __name__ == "__main__":
     app = SpacebarGUI()
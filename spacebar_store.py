@@ -0,0 +1,348 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from spacebar_dates import ISO_DATE_FIELD, iso_date
+
+# --- Constants & Configuration ---
+STORE_BATCH = 200         # Rows per transaction; a killed process loses at most one batch
+SEARCH_LIMIT = 20
+SNIPPET_TOKENS = 32       # Approximate snippet length in tokens (about that many characters with trigrams)
+TITLE_WEIGHT = 10.0       # bm25 weight of a title match relative to a content match
+MIN_TRIGRAM_TERM = 3      # Shorter terms cannot use the trigram index (matched with LIKE instead)
+
+# Export field -> store column
+COLUMNS = {"URL": "url", "หมวด": "category", "หัวข้อ": "title", "เนื้อหา": "content", "วันที่": "date", ISO_DATE_FIELD: "date_iso"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    category TEXT,
+    title TEXT,
+    content TEXT,
+    date TEXT,
+    date_iso TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_date_iso ON articles (date_iso);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# External-content FTS table kept in sync by triggers. Thai is written
+# without spaces between words, so word tokenizers see whole sentences as one
+# token; the trigram tokenizer (SQLite 3.34+) indexes every 3-character
+# substring, which makes any substring of 3+ characters searchable.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, content, content='articles', content_rowid='id', tokenize='{tokenizer}'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE OF title, content ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO articles_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+"""
+TOKENIZERS = ["trigram", "unicode61"]  # unicode61 only where trigram is unavailable (older SQLite)
+
+# Upsert keyed on the URL: the row keeps its id, so the FTS update trigger fires
+# (INSERT OR REPLACE would delete and re-insert without running the delete trigger)
+_UPSERT = """
+INSERT INTO articles (url, category, title, content, date, date_iso, updated_at)
+VALUES (:url, :category, :title, :content, :date, :date_iso, :updated_at)
+ON CONFLICT (url) DO UPDATE SET
+    category = COALESCE(excluded.category, category), title = excluded.title, content = excluded.content,
+    date = excluded.date, date_iso = excluded.date_iso, updated_at = excluded.updated_at
+"""
+
+
+class SearchHit(NamedTuple):
+    url: str
+    title: Optional[str]
+    date: Optional[str]
+    date_iso: Optional[str]
+    category: Optional[str]
+    snippet: str
+    score: float  # bm25: lower is better; 0.0 for LIKE-only matches
+
+
+def category_from_url(url: str) -> Optional[str]:
+    """Category slug of an article URL (``https://spacebar.th/<category>/<slug>``)."""
+    parts = urlparse(url).path.strip("/").split("/")
+    return parts[0] if len(parts) >= 2 and parts[0] else None
+
+
+def to_store_row(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Maps an export row (Thai field names) to store columns; None for rows without a URL."""
+    url = row.get("URL")
+    if not url:
+        return None
+    record = {column: row.get(field) for field, column in COLUMNS.items()}
+    for column, value in record.items():
+        if value != value:  # pandas' NaN
+            record[column] = None
+    record["category"] = record["category"] or category_from_url(url)
+    # Rows from older exports have no normalized date yet
+    record["date_iso"] = record["date_iso"] or iso_date(record["date"])
+    record["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    return record
+
+
+def _like_pattern(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _snippet(text: Optional[str], term: str, width: int = 60) -> str:
+    text = text or ""
+    pos = text.lower().find(term.lower())
+    if pos < 0:
+        return text[:width * 2]
+    start = max(0, pos - width)
+    return ("…" if start else "") + text[start:pos] + "[" + text[pos:pos + len(term)] + "]" + text[pos + len(term):pos + len(term) + width] + "…"
+
+
+class ArticleStore:
+    """
+    SQLite article store with a full-text index over title and content.
+
+    Rows are upserted on the article URL, so re-scraping an article updates
+    it in place, and are committed :data:`STORE_BATCH` at a time. It has the
+    interface of the streaming writers in :mod:`spacebar_export`
+    (``write``/``close``/``discard``, ``count``, ``urls``), which
+    ``open_stream_writer`` returns for ``.sqlite`` paths. Unlike the file
+    exports the database is never replaced: every run merges into it, and
+    :meth:`discard` only drops the rows not committed yet.
+    """
+
+    resumable = False  # Nothing to journal: committed batches are already durable
+    fmt = "sqlite"
+
+    def __init__(self, path: str, fieldnames: Optional[List[str]] = None, batch_size: int = STORE_BATCH):
+        self.path = path
+        self.part_path = path  # Written in place
+        self.fieldnames = fieldnames
+        self.batch_size = max(1, int(batch_size))
+        self.count = 0
+        self.urls: List[str] = []
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            self.tokenizer = self._create_fts()
+
+    def _create_fts(self) -> str:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'tokenizer'").fetchone()
+        if row:
+            return row[0]
+        for tokenizer in TOKENIZERS:
+            try:
+                self._conn.executescript(_FTS_SCHEMA.format(tokenizer=tokenizer))
+            except sqlite3.OperationalError:
+                continue
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('tokenizer', ?)", (tokenizer,))
+            # Articles stored before the index existed
+            self._conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+            return tokenizer
+        raise RuntimeError("This SQLite build has no FTS5 support")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def write(self, row: Dict[str, Any]) -> None:
+        """Queues one article; the queue is committed every ``batch_size`` rows."""
+        record = to_store_row(row)
+        if record is None:
+            return
+        with self._lock:
+            self._pending.append(record)
+            self.count += 1
+            self.urls.append(record["url"])
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def upsert_many(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Writes and commits ``rows``. Returns the number of articles written."""
+        before = self.count
+        for row in rows:
+            self.write(row)
+        with self._lock:
+            self._flush()
+        return self.count - before
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(_UPSERT, self._pending)
+        self._pending = []
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT, category: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None) -> List[SearchHit]:
+        """
+        Articles containing every whitespace-separated term of ``query``, best matches first.
+
+        Terms are matched as substrings of the title or content (case-insensitive
+        for Latin script) and ranked with bm25, title matches weighing
+        :data:`TITLE_WEIGHT` times more. Terms shorter than
+        :data:`MIN_TRIGRAM_TERM` characters cannot use the index and are checked
+        with ``LIKE``; a query made only of such terms scans the table and
+        returns the newest matches. ``since``/``until`` are ``YYYY-MM-DD``
+        bounds on the normalized date.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        if self.tokenizer == "trigram":
+            indexed = [t for t in terms if len(t) >= MIN_TRIGRAM_TERM]
+        else:
+            indexed = terms
+        scanned = [t for t in terms if t not in indexed]
+
+        where: List[str] = []
+        params: List[Any] = []
+        for term in scanned:
+            where.append("(a.title LIKE ? ESCAPE '\\' OR a.content LIKE ? ESCAPE '\\')")
+            params += [_like_pattern(term)] * 2
+        for column, op, value in (("a.category", "=", category), ("a.date_iso", ">=", since), ("a.date_iso", "<=", until)):
+            if value:
+                where.append(f"{column} {op} ?")
+                params.append(value)
+
+        if indexed:
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in indexed)
+            # Rank first and build snippets for the top rows only: columns in the
+            # ranked SELECT would be computed for every match before sorting
+            sql = (f"WITH top AS (SELECT articles_fts.rowid AS id, bm25(articles_fts, {TITLE_WEIGHT}, 1.0) AS score "
+                   f"FROM articles_fts{' JOIN articles a ON a.id = articles_fts.rowid' if where else ''} "
+                   f"WHERE articles_fts MATCH ?{''.join(' AND ' + w for w in where)} ORDER BY score LIMIT ?) "
+                   f"SELECT a.url, a.title, a.date, a.date_iso, a.category, "
+                   f"snippet(articles_fts, 1, '[', ']', '…', {SNIPPET_TOKENS}), top.score "
+                   f"FROM top JOIN articles_fts ON articles_fts.rowid = top.id JOIN articles a ON a.id = top.id "
+                   f"WHERE articles_fts MATCH ? ORDER BY top.score")
+            params = [match] + params + [limit, match]
+        else:
+            sql = (f"SELECT a.url, a.title, a.date, a.date_iso, a.category, a.content, 0.0 "
+                   f"FROM articles a WHERE {' AND '.join(where)} ORDER BY a.date_iso DESC LIMIT ?")
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        if not indexed:
+            rows = [row[:5] + (_snippet(row[5], terms[0]),) + row[6:] for row in rows]
+        return [SearchHit(*row) for row in rows]
+
+    def close(self) -> str:
+        """Commits the queued rows and closes the database. Returns ``path``."""
+        with self._lock:
+            if self._conn is not None:
+                self._flush()
+                self._conn.close()
+                self._conn = None
+        return self.path
+
+    def discard(self) -> None:
+        """Drops the rows not committed yet and closes the database."""
+        with self._lock:
+            self._pending = []
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self) -> "ArticleStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def iter_export_rows(filepath: str) -> Iterator[Dict[str, Any]]:
+    """Yields the rows of a CSV, JSON Lines, JSON or Parquet export as dicts (streamed except JSON)."""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".parquet":
+        from spacebar_export import parquet_dataset
+
+        for batch in parquet_dataset(filepath).to_batches():
+            yield from batch.to_pylist()
+    elif ext == ".jsonl":
+        with open(filepath, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif ext == ".json":
+        with open(filepath, encoding="utf-8") as f:
+            yield from (record for record in json.load(f) if isinstance(record, dict))
+    elif ext == ".csv":
+        with open(filepath, encoding="utf-8-sig", newline="") as f:
+            yield from csv.DictReader(f)
+    else:
+        raise ValueError(f"cannot import {filepath}: use a .csv, .jsonl, .json or .parquet export")
+
+
+def _print_hits(hits: List[SearchHit], elapsed: float) -> None:
+    for rank, hit in enumerate(hits, 1):
+        print(f"{rank:>3}. [{hit.date_iso or hit.date or '-'}] {hit.title or '-'}\n     {hit.url}\n     {' '.join(hit.snippet.split())}")
+    print(f"{len(hits)} results in {elapsed * 1000:.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Search and load the SQLite article store of Spacebar exports.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_search = sub.add_parser("search", help="Full-text search over titles and contents")
+    p_search.add_argument("store", help="Store file (.sqlite)")
+    p_search.add_argument("query", nargs="+", help="Terms every result must contain")
+    p_search.add_argument("-n", "--limit", type=int, default=SEARCH_LIMIT, help=f"Results to show (default: {SEARCH_LIMIT})")
+    p_search.add_argument("-c", "--category", metavar="SLUG", help="Only this category")
+    p_search.add_argument("--since", metavar="YYYY-MM-DD", help="Only articles published on or after this day")
+    p_search.add_argument("--until", metavar="YYYY-MM-DD", help="Only articles published on or before this day")
+    p_search.add_argument("--json", action="store_true", help="One JSON object per result")
+    p_import = sub.add_parser("import", help="Upsert existing export files into a store")
+    p_import.add_argument("store", help="Store file (.sqlite), created if missing")
+    p_import.add_argument("exports", nargs="+", help="Export files (.csv, .jsonl, .json, .parquet)")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        with ArticleStore(args.store) as store:
+            for export_path in args.exports:
+                try:
+                    count = store.upsert_many(iter_export_rows(export_path))
+                except (OSError, ValueError) as e:
+                    print(f"[Skip] {export_path}: {e}", file=sys.stderr)
+                    continue
+                print(f"[Done] {export_path}: {count} articles")
+            print(f"{args.store}: {len(store)} articles")
+        return 0
+
+    if not os.path.exists(args.store):
+        parser.error(f"store not found: {args.store}")
+    with ArticleStore(args.store) as store:
+        started = time.perf_counter()
+        hits = store.search(" ".join(args.query), args.limit, args.category, args.since, args.until)
+        elapsed = time.perf_counter() - started
+    if args.json:
+        for hit in hits:
+            print(json.dumps(hit._asdict(), ensure_ascii=False))
+    else:
+        _print_hits(hits, elapsed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
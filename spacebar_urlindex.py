@@ -0,0 +1,228 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Container, Iterable, Iterator, List, Optional, Set
+
+# --- Constants & Configuration ---
+INDEX_SUFFIX = ".urls.sqlite3"
+_BATCH = 500  # SQLite limits the number of host parameters per statement
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def index_path_for(export_path: str) -> str:
+    """Returns the sidecar index path of an export file (``news.csv`` -> ``news.csv.urls.sqlite3``)."""
+    return export_path + INDEX_SUFFIX
+
+
+def _file_stamp(path: str) -> Optional[str]:
+    """Size and modification time of a file, used to detect exports changed behind our back."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def iter_export_urls(filepath: str) -> Iterator[str]:
+    """
+    Yields the URL of every row of an export file (CSV, Excel, JSON, JSON Lines, Parquet, Text or SQLite store).
+
+    CSV, JSON Lines and Text exports are streamed line by line; Excel is read in
+    read-only mode and only the URL column is materialised; Parquet (a file or
+    an appended dataset directory) reads only the URL column, one batch at a time.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".sqlite":
+        conn = sqlite3.connect(filepath)
+        try:
+            for (url,) in conn.execute("SELECT url FROM articles"):
+                yield url
+        finally:
+            conn.close()
+    elif ext == ".parquet":
+        from spacebar_export import parquet_dataset
+
+        dataset = parquet_dataset(filepath)
+        if "URL" not in dataset.schema.names:
+            return
+        for batch in dataset.to_batches(columns=["URL"]):
+            for url in batch.column(0).to_pylist():
+                if url:
+                    yield url
+    elif ext == ".txt":
+        with open(filepath, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("URL:"):
+                    yield line.strip()[4:].strip()
+    elif ext == ".xlsx":
+        from openpyxl import load_workbook
+
+        wb = load_workbook(filepath, read_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            if "URL" not in header:
+                return
+            col = list(header).index("URL")
+            for row in rows:
+                if col < len(row) and row[col]:
+                    yield str(row[col])
+        finally:
+            wb.close()
+    elif ext == ".jsonl":
+        with open(filepath, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    url = json.loads(line).get("URL")
+                    if url:
+                        yield url
+    elif ext == ".json":
+        with open(filepath, encoding="utf-8") as f:
+            records = json.load(f)
+        for record in records:
+            if isinstance(record, dict) and record.get("URL"):
+                yield record["URL"]
+    else:
+        with open(filepath, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                if row.get("URL"):
+                    yield row["URL"]
+
+
+class KnownUrls:
+    """``url in known`` over several URL collections (sets and/or :class:`UrlIndex` objects)."""
+
+    def __init__(self, *collections: Optional[Container[str]]):
+        self.collections = [c for c in collections if c is not None]
+
+    def __contains__(self, url: object) -> bool:
+        return any(url in c for c in self.collections)
+
+
+class UrlIndex:
+    """
+    Persistent set of the article URLs contained in one export file.
+
+    Stored as a small SQLite file next to the export so that "is this article
+    already exported?" is a primary-key lookup instead of re-reading the whole
+    export. Supports ``url in index`` and ``len(index)``, so it can be passed
+    anywhere a ``set`` of known URLs is expected.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open_for(cls, export_path: str) -> "UrlIndex":
+        """
+        Opens the sidecar index of ``export_path``, rebuilding it when it is
+        missing or the export was modified without going through the index.
+        """
+        index = cls(index_path_for(export_path))
+        if index.stamp() != _file_stamp(export_path):
+            index.rebuild(export_path)
+        return index
+
+    def __contains__(self, url: object) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM urls WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+    def known(self, urls: Iterable[str]) -> Set[str]:
+        """Returns the subset of ``urls`` that is already in the index."""
+        urls = list(urls)
+        found: Set[str] = set()
+        with self._lock:
+            for i in range(0, len(urls), _BATCH):
+                chunk = urls[i:i + _BATCH]
+                marks = ",".join("?" * len(chunk))
+                found.update(r[0] for r in self._conn.execute(f"SELECT url FROM urls WHERE url IN ({marks})", chunk))
+        return found
+
+    def add_many(self, urls: Iterable[str]) -> None:
+        """Records URLs appended to the export."""
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO urls VALUES (?)", ((u,) for u in urls if u))
+
+    def reset(self, urls: Iterable[str]) -> None:
+        """Replaces the content of the index (the export was rewritten)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM urls")
+            self._conn.executemany("INSERT OR IGNORE INTO urls VALUES (?)", ((u,) for u in urls if u))
+
+    def stamp(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'export_stamp'").fetchone()
+        return row[0] if row else None
+
+    def sync(self, export_path: str) -> None:
+        """Marks the index as matching the current state of ``export_path``."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('export_stamp', ?)", (_file_stamp(export_path),))
+
+    def rebuild(self, export_path: str) -> int:
+        """Re-reads ``export_path`` once and replaces the index with its URLs."""
+        if os.path.exists(export_path):
+            try:
+                self.reset(iter_export_urls(export_path))
+            except Exception:
+                # Unreadable export: treat it as empty, like read_existing_urls always did
+                self.reset(())
+        else:
+            self.reset(())
+        self.sync(export_path)
+        return len(self)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "UrlIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the sidecar URL index of Spacebar exports.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="(Re)build the index of existing export files")
+    p_rebuild.add_argument("exports", nargs="+", help="Export files (.csv, .jsonl, .parquet, .xlsx, .json, .txt, .sqlite)")
+    p_check = sub.add_parser("check", help="Tell whether URLs are already in an export")
+    p_check.add_argument("export", help="Export file")
+    p_check.add_argument("urls", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        for export_path in args.exports:
+            if not os.path.exists(export_path):
+                print(f"[Skip] {export_path}: file not found", file=sys.stderr)
+                continue
+            with UrlIndex(index_path_for(export_path)) as index:
+                count = index.rebuild(export_path)
+            print(f"[Done] {export_path}: {count} URLs -> {index_path_for(export_path)}")
+        return 0
+
+    with UrlIndex.open_for(args.export) as index:
+        for url in args.urls:
+            print(f"{'known' if url in index else 'new'}\t{url}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from spacebar_core import ARTICLE_FIELDS
+from spacebar_dates import ISO_DATE_FIELD
+from spacebar_export import ParquetStreamWriter, parquet_dataset, parquet_parts, write_parquet
+from spacebar_urlindex import iter_export_urls
+
+pytest.importorskip("pyarrow")
+
+# --- Constants & Configuration ---
+FIELDS = ARTICLE_FIELDS
+# Exports written before the ISO date column was added
+OLD_FIELDS = [field for field in ARTICLE_FIELDS if field != ISO_DATE_FIELD]
+
+
+def rows(start: int, stop: int):
+    return [{"หัวข้อ": f"ข่าว {i}", "เนื้อหา": f"เนื้อหาข่าว {i}", "วันที่": "27 ม.ค. 2568", ISO_DATE_FIELD: "2025-01-27",
+             "URL": f"https://spacebar.th/politics/{i}"}
+            for i in range(start, stop)]
+
+
+def test_append_adds_part_files_without_rewriting(tmp_path):
+    path = str(tmp_path / "archive.parquet")
+    write_parquet(rows(0, 3), path, OLD_FIELDS)
+    first = os.stat(path)
+
+    write_parquet(rows(3, 5), path, FIELDS, append=True)
+    assert os.path.isdir(path)
+    parts = parquet_parts(path)
+    assert [os.path.basename(p) for p in parts] == ["part-00000.parquet", "part-00001.parquet"]
+    moved = os.stat(parts[0])
+    assert (moved.st_ino, moved.st_mtime_ns) == (first.st_ino, first.st_mtime_ns)  # Renamed, not copied
+
+    write_parquet(rows(5, 6), path, FIELDS, append=True)
+    assert len(parquet_parts(path)) == 3
+    assert os.stat(parts[1]).st_mtime_ns == os.stat(os.path.join(path, "part-00001.parquet")).st_mtime_ns
+
+    table = parquet_dataset(path).to_table()
+    assert table.column("URL").to_pylist() == [r["URL"] for r in rows(0, 6)]
+    assert table.column("หัวข้อ").to_pylist() == [r["หัวข้อ"] for r in rows(0, 6)]
+    assert table.column(ISO_DATE_FIELD).to_pylist() == [None] * 3 + ["2025-01-27"] * 3
+    assert list(iter_export_urls(path)) == [r["URL"] for r in rows(0, 6)]
+
+
+def test_append_without_rows_leaves_export_alone(tmp_path):
+    path = str(tmp_path / "archive.parquet")
+    write_parquet(rows(0, 2), path, FIELDS)
+    with ParquetStreamWriter(path, FIELDS, append=True):
+        pass
+    assert os.path.isfile(path)
+    assert not os.path.exists(path + ".part")
+
+
+def test_overwrite_replaces_dataset(tmp_path):
+    path = str(tmp_path / "archive.parquet")
+    write_parquet(rows(0, 2), path, FIELDS)
+    write_parquet(rows(2, 4), path, FIELDS, append=True)
+    write_parquet(rows(9, 10), path, FIELDS)
+    assert os.path.isfile(path)
+    assert parquet_dataset(path).to_table().column("URL").to_pylist() == [rows(9, 10)[0]["URL"]]
+
+
+def test_append_rejects_unrelated_file(tmp_path):
+    path = str(tmp_path / "other.parquet")
+    write_parquet([{"x": "1"}], path, ["x"])
+    with pytest.raises(ValueError):
+        ParquetStreamWriter(path, FIELDS, append=True)
+    assert not os.path.exists(path + ".part")
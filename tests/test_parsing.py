@@ -0,0 +1,96 @@
+import glob
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from spacebar_core import make_record
+from spacebar_parsing import (
+    CONTENT_CLASS, CONTENT_TAGS, DATE_CLASS, LEGACY_CONTENT_TAGS, TITLE_CLASS, available_parsers, extract_article, extract_article_dom, scan_article,
+)
+
+# --- Constants & Configuration ---
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "articles")
+PAGES = sorted(glob.glob(os.path.join(FIXTURES, "*.html")))
+# (content tags, separator) of SpacebarScraper and of the legacy scrapers
+STYLES = {"core": (CONTENT_TAGS, ""), "legacy": (LEGACY_CONTENT_TAGS, " ")}
+
+
+def baseline_extract(markup: str, content_tags, separator: str):
+    # The extractor the scrapers shipped with: full html.parser tree, find/get_text
+    soup = BeautifulSoup(markup, "html.parser")
+    title_tag = soup.find("h1", class_=TITLE_CLASS)
+    date_tag = soup.find("p", class_=DATE_CLASS)
+    content_div = soup.find("div", class_=CONTENT_CLASS)
+    return (
+        title_tag.get_text(strip=True) if title_tag else None,
+        date_tag.get_text(strip=True) if date_tag else None,
+        [tag.get_text(separator=separator, strip=True) for tag in content_div.find_all(list(content_tags))] if content_div else None,
+    )
+
+
+def read_page(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_fixtures_present():
+    assert PAGES, f"no article fixtures in {FIXTURES}"
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+@pytest.mark.parametrize("style", sorted(STYLES))
+@pytest.mark.parametrize("path", PAGES, ids=os.path.basename)
+def test_scan_matches_dom(path, style, parser):
+    markup = read_page(path)
+    tags, separator = STYLES[style]
+    assert scan_article(markup, parser, tags, separator) == extract_article_dom(markup, parser, tags, separator)
+
+
+@pytest.mark.parametrize("style", sorted(STYLES))
+@pytest.mark.parametrize("path", PAGES, ids=os.path.basename)
+def test_default_parser_matches_baseline(path, style):
+    markup = read_page(path)
+    tags, separator = STYLES[style]
+    assert scan_article(markup, content_tags=tags, separator=separator) == baseline_extract(markup, tags, separator)
+
+
+@pytest.mark.parametrize("path", PAGES, ids=os.path.basename)
+def test_default_extract_article_matches_baseline(path):
+    markup = read_page(path)
+    title, date, blocks = baseline_extract(markup, CONTENT_TAGS, "")
+    expected = (title, date, "\n\n".join(block for block in blocks or () if block))
+    assert extract_article(markup.encode("utf-8")) == expected
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_site_layout_fields(parser):
+    title, date, blocks = scan_article(read_page(os.path.join(FIXTURES, "site-layout.html")), parser)
+    assert title == "ครม. อนุมัติงบประมาณ & มาตรการใหม่ล่าสุด"
+    assert date == "17 ต.ค. 2568"
+    assert "ไม่ควรถูกดึงมา" not in blocks  # Only the first rich-text <div>
+    assert "มาตรการหลัก" in blocks
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_missing_fields(parser):
+    assert scan_article(read_page(os.path.join(FIXTURES, "edge-no-article.html")), parser) == (None, None, None)
+    title, date, blocks = scan_article(read_page(os.path.join(FIXTURES, "edge-no-title.html")), parser)
+    assert (title, date, blocks) == (None, None, ["no title"])
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+@pytest.mark.parametrize("path", PAGES, ids=os.path.basename)
+def test_extract_article_joins_dom_blocks(path, parser):
+    markup = read_page(path)
+    title, date, blocks = extract_article_dom(markup, parser)
+    expected = (title, date, "\n\n".join(block for block in blocks or () if block))
+    assert extract_article(markup.encode("utf-8"), parser) == expected
+
+
+def test_make_record_falls_back_only_for_missing_tags():
+    # As the original scraper: an empty <h1>/<p> is kept as "", only a missing one falls back
+    assert make_record(("", "", "c"), "headline", "u")["หัวข้อ"] == ""
+    assert make_record(("", "", "c"), "headline", "u")["วันที่"] == ""
+    assert make_record((None, None, "c"), "headline", "u")["หัวข้อ"] == "headline"
+    assert make_record((None, None, "c"), "headline", "u")["วันที่"] == "-"
@@ -0,0 +1,58 @@
+import queue
+import re
+
+import pytest
+
+import spacebar_pipeline
+from benchmarks.fake_spacebar import SiteConfig, start_server
+from spacebar_core import SpacebarScraper
+from spacebar_pipeline import DEFAULT_PAGE_RETRIES, DEFAULT_TRIP_AFTER
+from spacebar_ratelimit import RateLimiter
+
+# --- Constants & Configuration ---
+LISTING_PATH = re.compile(r"^/category/politics(/page/\d+)?$")
+
+
+@pytest.fixture
+def site():
+    config = SiteConfig(pages=3, per_page=2, paragraphs=1, latency=0.0)
+    server, base_url = start_server(config)
+    yield config, base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    # Page retries and breaker probes return at once; the number of requests is what is tested
+    monkeypatch.setattr(spacebar_pipeline, "wait_or_cancel", lambda seconds, cancelled: not cancelled())
+
+
+def listing_requests(config: SiteConfig) -> int:
+    return sum(count for path, count in config.hits.items() if LISTING_PATH.match(path))
+
+
+# 503 is left to the walk by the rate limiter; 502 is one of the statuses it retries itself
+@pytest.mark.parametrize("status", [503, 502])
+def test_requests_before_trip(site, no_backoff, tmp_path, status):
+    config, base_url = site
+    config.down_status = status
+    config.down.set()
+    scraper = SpacebarScraper(queue.Queue(), rate_limiter=RateLimiter(rate=1000, burst=1000, min_rate=1000),
+                              base_url=base_url)
+    scraper.run("politics", 1, 0, str(tmp_path / "news.csv"))
+
+    assert scraper.tripped == {"politics"}
+    # Every failed page is requested 1 + DEFAULT_PAGE_RETRIES times, by the walk only (not by the limiter too)
+    assert listing_requests(config) == DEFAULT_TRIP_AFTER * (1 + DEFAULT_PAGE_RETRIES)
+    assert sum(config.hits.values()) == listing_requests(config)
+
+
+def test_trip_after_counts_pages(site, no_backoff, tmp_path):
+    config, base_url = site
+    config.down.set()
+    scraper = SpacebarScraper(queue.Queue(), rate_limiter=RateLimiter(rate=1000, burst=1000, min_rate=1000),
+                              base_url=base_url, trip_after=1)
+    scraper.run("politics", 1, 0, str(tmp_path / "news.csv"))
+
+    assert scraper.tripped == {"politics"}
+    assert listing_requests(config) == 1 + DEFAULT_PAGE_RETRIES